@@ -0,0 +1,261 @@
+"""
+Bulk bank clearance of Expense Entries from a bank statement file.
+
+Uncleared posted entries paid from the bank account are loaded once, with the
+amount they credited to it in the account currency, and indexed by payment
+reference and by (amount, posting date). Every statement
+line is then matched with dictionary lookups in a single pass, matched entries
+get their clearance_date in a few bulk updates, and lines without a match are
+written to Expense Clearance Review for manual follow-up.
+"""
+
+import time
+from datetime import timedelta
+
+import frappe
+from frappe import _
+from frappe.query_builder import functions as fn
+from frappe.utils import cint, getdate, now_datetime
+
+from journal_plus.importer import iter_file_rows
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import normalize_reference
+from journal_plus.money import MoneyEngine
+
+REVIEW_DOCTYPE = "Expense Clearance Review"
+DEFAULT_DATE_WINDOW = 3
+UPDATE_CHUNK_SIZE = 1000
+
+# accepted statement columns for each value, first non-empty one wins
+STATEMENT_COLUMNS = {
+    "date": ("date", "posting_date", "transaction_date", "value_date"),
+    "reference": ("reference", "payment_reference", "reference_no", "cheque_no"),
+    # signed: negative is money leaving the account
+    "amount": ("amount",),
+    # always outgoing, whatever the sign
+    "withdrawal": ("withdrawal", "debit"),
+    "description": ("description", "narration", "remarks"),
+}
+
+
+@frappe.whitelist()
+def start_expense_clearance(file_url, account, date_window=DEFAULT_DATE_WINDOW):
+    """
+    Queue clearance matching of an uploaded CSV/XLSX bank statement against `account`.
+    """
+    frappe.has_permission("Expense Entry", "write", throw=True)
+    frappe.get_doc("File", {"file_url": file_url}).check_permission("read")
+    frappe.has_permission("Account", "read", doc=account, throw=True)
+    frappe.has_permission(
+        "Company", "read", doc=frappe.get_cached_value("Account", account, "company"), throw=True
+    )
+
+    frappe.enqueue(
+        clear_expense_entries_from_statement,
+        queue="long",
+        timeout=3600,
+        file_url=file_url,
+        account=account,
+        date_window=cint(date_window),
+        enqueue_after_commit=True,
+    )
+
+
+def clear_expense_entries_from_statement(file_url, account, date_window=DEFAULT_DATE_WINDOW):
+    """
+    Match every line of the statement and set clearance dates in bulk.
+    Returns a summary with the batch id of the review rows.
+    """
+    started = time.monotonic()
+    path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+    lines = [parse_statement_line(row_no, row) for row_no, row in iter_file_rows(path)]
+    lines = [line for line in lines if line.amount]
+
+    money = MoneyEngine(frappe.get_cached_value("Account", account, "account_currency"))
+    matcher = ClearanceMatcher(
+        get_uncleared_entries(account, lines, date_window), money, date_window
+    )
+
+    matched, unmatched = {}, []
+    for line in lines:
+        name = matcher.match(line)
+        if name:
+            matched[name] = line.date
+        else:
+            unmatched.append(line)
+
+    set_clearance_dates(matched)
+
+    batch_id = frappe.generate_hash(length=12)
+    _create_reviews(batch_id, account, unmatched)
+    frappe.db.commit()
+
+    summary = {
+        "batch_id": batch_id,
+        "account": account,
+        "lines": len(lines),
+        "matched": len(matched),
+        "unmatched": len(unmatched),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    frappe.publish_realtime("journal_plus_expense_clearance", summary, user=frappe.session.user)
+    return summary
+
+
+def parse_statement_line(row_no, row):
+    """
+    One statement row; `amount` is the withdrawn amount, 0 for deposits and refunds
+    so they can never clear an outgoing Expense Entry.
+    """
+    values = {
+        key: next((row.get(c) for c in columns if row.get(c) not in (None, "")), None)
+        for key, columns in STATEMENT_COLUMNS.items()
+    }
+    return frappe._dict(
+        row_no=row_no,
+        date=getdate(values["date"]) if values["date"] else None,
+        reference=normalize_reference(values["reference"]),
+        amount=_get_withdrawn_amount(values),
+        description=values["description"],
+    )
+
+
+def _get_withdrawn_amount(values):
+    if values["withdrawal"] not in (None, ""):
+        return abs(frappe.utils.flt(values["withdrawal"]))
+    amount = frappe.utils.flt(values["amount"])
+    return -amount if amount < 0 else 0
+
+
+def get_uncleared_entries(account, lines, date_window):
+    """
+    Posted, uncleared Expense Entries paid from `account` that fall inside the
+    statement's date range (widened by the date window), each with the `amount`
+    it credited to the account, in the account currency the statement is in.
+    """
+    dates = [line.date for line in lines if line.date]
+    if not dates:
+        return []
+
+    window = timedelta(days=cint(date_window))
+    ee = frappe.qb.DocType("Expense Entry")
+    gle = frappe.qb.DocType("GL Entry")
+    return (
+        frappe.qb.from_(ee)
+        .inner_join(gle)
+        .on(
+            (gle.voucher_type == "Expense Entry")
+            & (gle.voucher_no == ee.name)
+            & (gle.account == account)
+            & (gle.is_cancelled == 0)
+        )
+        .select(
+            ee.name,
+            ee.payment_reference,
+            ee.posting_date,
+            fn.Sum(gle.credit_in_account_currency - gle.debit_in_account_currency).as_("amount"),
+        )
+        .where(ee.docstatus == 1)
+        # not in the bank ledger until the GL posting went through
+        .where(ee.posted_to_gl == 1)
+        .where(ee.account_paid_from == account)
+        .where(ee.clearance_date.isnull())
+        .where(ee.posting_date.between(min(dates) - window, max(dates) + window))
+        .groupby(ee.name, ee.payment_reference, ee.posting_date)
+        .orderby(ee.posting_date)
+        .orderby(ee.name)
+    ).run(as_dict=True)
+
+
+class ClearanceMatcher:
+    """
+    Hash indexes over uncleared entries: payment reference -> entries and
+    amount (minor units) -> posting date -> entries. An entry is claimed by the
+    first statement line that matches it.
+    """
+
+    def __init__(self, entries, money, date_window=DEFAULT_DATE_WINDOW):
+        self.money = money
+        self.date_window = cint(date_window)
+        self.claimed = set()
+        self.by_reference = {}
+        self.by_amount = {}
+
+        for entry in entries:
+            amount = money.to_minor(entry.amount)
+            posting_date = getdate(entry.posting_date)
+            reference = normalize_reference(entry.payment_reference)
+            if reference:
+                self.by_reference.setdefault(reference, []).append((amount, entry.name))
+            self.by_amount.setdefault(amount, {}).setdefault(posting_date, []).append(entry.name)
+
+    def match(self, line):
+        """
+        Name of the entry matched by a statement line, or None.
+        A reference match must agree on the amount; otherwise the unclaimed entry
+        with the same amount closest in date (earlier first on ties) wins.
+        Lines without a date are left for review: there is no clearance date to set.
+        """
+        if not line.date:
+            return None
+
+        amount = self.money.to_minor(line.amount)
+
+        for entry_amount, name in self.by_reference.get(line.reference) or ():
+            if entry_amount == amount and name not in self.claimed:
+                return self._claim(name)
+
+        by_date = self.by_amount.get(amount)
+        if not by_date:
+            return None
+
+        for offset in range(self.date_window + 1):
+            for delta in (-offset, offset) if offset else (0,):
+                for name in by_date.get(line.date + timedelta(days=delta)) or ():
+                    if name not in self.claimed:
+                        return self._claim(name)
+        return None
+
+    def _claim(self, name):
+        self.claimed.add(name)
+        return name
+
+
+def set_clearance_dates(matched):
+    """
+    Set clearance_date for {expense_entry: date} with one UPDATE per date and chunk.
+    """
+    by_date = {}
+    for name, clearance_date in matched.items():
+        by_date.setdefault(clearance_date, []).append(name)
+
+    ee = frappe.qb.DocType("Expense Entry")
+    now = now_datetime()
+    for clearance_date, names in by_date.items():
+        for chunk in frappe.utils.create_batch(names, UPDATE_CHUNK_SIZE):
+            (
+                frappe.qb.update(ee)
+                .set(ee.clearance_date, clearance_date)
+                .set(ee.modified, now)
+                .set(ee.modified_by, frappe.session.user)
+                .where(ee.name.isin(chunk))
+                .where(ee.clearance_date.isnull())
+            ).run()
+
+
+def _create_reviews(batch_id, account, lines):
+    now = now_datetime()
+    user = frappe.session.user
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "batch_id", "account", "row_no", "status",
+        "statement_date", "reference", "amount", "description",
+    ]
+    values = [
+        (
+            frappe.generate_hash(length=10), now, now, user, user,
+            batch_id, account, line.row_no, "Open",
+            line.date, line.reference, line.amount, line.description,
+        )
+        for line in lines
+    ]
+    frappe.db.bulk_insert(REVIEW_DOCTYPE, fields, values)
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for the per-row cost of accounting dimension resolution.
+
+Run on a bench site:
+
+    bench --site <site> execute journal_plus.benchmarks.dimension_resolver.run
+    bench --site <site> execute journal_plus.benchmarks.dimension_resolver.run --kwargs "{'sizes': [1000, 10000]}"
+"""
+
+import time
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    get_accounting_dimensions,
+)
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import DimensionResolver
+
+
+def _legacy_apply(gl_entry, row, doc):
+    """
+    Reference copy of the original per-entry implementation, kept for comparison.
+    """
+    for dim in get_accounting_dimensions():
+        if hasattr(row, dim) and getattr(row, dim):
+            gl_entry[dim] = getattr(row, dim)
+        elif hasattr(doc, dim) and getattr(doc, dim):
+            gl_entry[dim] = getattr(doc, dim)
+
+
+def _make_rows(size, dimensions):
+    """
+    Synthetic detail rows: every other row carries its own dimension values,
+    the rest fall back to the parent.
+    """
+    rows = []
+    for idx in range(size):
+        row = frappe._dict(name=f"row-{idx}")
+        if idx % 2:
+            for dim in dimensions:
+                row[dim] = f"{dim}-{idx % 7}"
+        rows.append(row)
+    return rows
+
+
+def _time_per_row(fn, rows):
+    start = time.perf_counter()
+    for row in rows:
+        fn({}, row)
+    return (time.perf_counter() - start) / len(rows) * 1e6
+
+
+def run(sizes=(1000, 10000)):
+    """
+    Time legacy vs compiled resolution and check both produce the same GL dimensions.
+    Returns {size: {"legacy_us_per_row": .., "resolver_us_per_row": ..}}.
+    """
+    dimensions = get_accounting_dimensions()
+    doc = frappe._dict({dim: f"{dim}-parent" for dim in dimensions})
+    results = {}
+
+    for size in sizes:
+        rows = _make_rows(int(size), dimensions)
+
+        resolver = DimensionResolver(doc, dimensions)
+        for row in rows[:50]:
+            legacy_entry, resolver_entry = {}, {}
+            _legacy_apply(legacy_entry, row, doc)
+            resolver.apply(resolver_entry, row)
+            if legacy_entry != resolver_entry:
+                frappe.throw(f"Resolver output differs for {row.name}: {resolver_entry} != {legacy_entry}")
+
+        legacy = _time_per_row(lambda entry, row: _legacy_apply(entry, row, doc), rows)
+        compiled = _time_per_row(DimensionResolver(doc, dimensions).apply, rows)
+
+        results[size] = {
+            "dimensions": len(dimensions),
+            "legacy_us_per_row": round(legacy, 3),
+            "resolver_us_per_row": round(compiled, 3),
+        }
+        print(
+            f"{size:>6} rows, {len(dimensions)} dimensions: "
+            f"legacy {legacy:.3f} us/row, resolver {compiled:.3f} us/row"
+        )
+
+    return results
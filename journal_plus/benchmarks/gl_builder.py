@@ -0,0 +1,226 @@
+"""
+Benchmark of the GL map builder: integer minor-unit engine vs the previous
+Decimal/float implementation.
+
+Run on a bench site:
+
+    bench --site <site> execute journal_plus.benchmarks.gl_builder.run
+    bench --site <site> execute journal_plus.benchmarks.gl_builder.run --kwargs "{'rows': 10000, 'repeat': 5}"
+"""
+
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+import frappe
+from frappe import _
+
+from journal_plus.benchmarks.utils import make_synthetic_entry
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import (
+    DimensionResolver,
+    _to_decimal,
+)
+
+
+def _float_safe(d: Decimal) -> float:
+    return float(d.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def _legacy_build_gl_map(self):
+    """
+    Reference copy of the Decimal/float GL builder, kept for comparison.
+    """
+    details = getattr(self, "details", []) or []
+    if not details:
+        frappe.throw(_("No detail lines found"))
+
+    credit_account = self.account_paid_from
+    if not credit_account:
+        frappe.throw(_("Account Paid From is required"))
+
+    # Company fallback logic
+    company = self.company or frappe.get_cached_value(
+        "Global Defaults", None, "default_company"
+    )
+    if not company:
+        frappe.throw(_("Company is required"))
+
+    # Currency and exchange rate
+    currency = (
+        self.currency
+        or frappe.get_cached_value("Company", company, "default_currency")
+        or getattr(self, "company_currency", None)
+        or "IDR"
+    )
+    exchange_rate = getattr(self, "exchange_rate", 1.0)
+
+    posting_date = (
+        getattr(self, "posting_date", None)
+        or getattr(self, "required_date", None)
+        or frappe.utils.nowdate()
+    )
+
+    dimensions = DimensionResolver(self)
+
+    gl_entries = []
+    total_debit = Decimal("0.0")
+
+    for idx, row in enumerate(details, start=1):
+        acct = row.get("expense_account")
+        if not acct:
+            frappe.throw(_("Expense Account is required for row {0}").format(idx))
+
+        amt_dec = _to_decimal(row.get("amount"))
+        if amt_dec <= 0:
+            frappe.throw(_("Amount must be positive for row {0}").format(idx))
+
+        total_debit += amt_dec
+        amt = _float_safe(amt_dec)
+
+        # Use unique marker in 'against' or 'remarks' to avoid merging
+        marker = row.get("name") or str(idx)
+        remarks = row.get("remarks") or self.remarks or _("Expense")
+        remarks_with_marker = f"{remarks} [{marker}]"
+
+        gl_entry = {
+            "posting_date": posting_date,
+            "account": acct,
+            "party_type": row.get("party_type"),
+            "party": row.get("party"),
+            "against": f"{credit_account}|{marker}",
+            "debit": amt,
+            "credit": 0.0,
+            "debit_in_account_currency": amt,
+            "credit_in_account_currency": 0.0,
+            "account_currency": currency,
+            "exchange_rate": exchange_rate,
+            "company": company,
+            "voucher_type": self.doctype,
+            "voucher_no": self.name,
+            "remarks": remarks_with_marker,
+            "cost_center": row.get("cost_center") or self.cost_center,
+            "project": row.get("project") or self.project,
+            "is_opening": getattr(self, "is_opening", 0)
+        }
+
+        dimensions.apply(gl_entry, row)
+        gl_entries.append(gl_entry)
+
+
+    # Single credit entry
+    total_credit_amt = _float_safe(total_debit)
+    # Combine detail expense accounts for the 'against' field
+    against_list = ", ".join([row.get("expense_account", "") for row in details])
+
+    credit_entry = {
+        "posting_date": posting_date,
+        "account": credit_account,
+        "party_type": None,
+        "party": None,
+        "against": against_list,
+        "debit": 0.0,
+        "credit": total_credit_amt,
+        "debit_in_account_currency": 0.0,
+        "credit_in_account_currency": total_credit_amt,
+        "account_currency": currency,
+        "exchange_rate": exchange_rate,
+        "company": company,
+        "voucher_type": self.doctype,
+        "voucher_no": self.name,
+        "remarks": self.remarks or _("Payment/Clearing"),
+        "cost_center": self.cost_center,
+        "project": self.project,
+        "is_opening": getattr(self, "is_opening", 0)
+    }
+
+    dimensions.apply(credit_entry, self)
+    gl_entries.append(credit_entry)
+
+    # Validate balance
+    total_debit_dec = sum(_to_decimal(e.get("debit", 0)) for e in gl_entries)
+    total_credit_dec = sum(_to_decimal(e.get("credit", 0)) for e in gl_entries)
+
+    if total_debit_dec != total_credit_dec:
+        diff = (total_debit_dec - total_credit_dec).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        rounding_account = (
+            getattr(self, "rounding_account", None)
+            or frappe.get_cached_value("Company", company, "rounding_account")
+        )
+        if rounding_account:
+            # Create adjustment entry
+            if diff > 0:
+                adj = {
+                    "posting_date": posting_date,
+                    "account": rounding_account,
+                    "debit": 0.0,
+                    "credit": _float_safe(diff),
+                    "debit_in_account_currency": 0.0,
+                    "credit_in_account_currency": _float_safe(diff),
+                    "account_currency": currency,
+                    "exchange_rate": exchange_rate,
+                    "company": company,
+                    "voucher_type": self.doctype,
+                    "voucher_no": self.name,
+                    "remarks": _("Rounding adjustment"),
+                }
+            else:
+                adj = {
+                    "posting_date": posting_date,
+                    "account": rounding_account,
+                    "debit": _float_safe(-diff),
+                    "credit": 0.0,
+                    "debit_in_account_currency": _float_safe(-diff),
+                    "credit_in_account_currency": 0.0,
+                    "account_currency": currency,
+                    "exchange_rate": exchange_rate,
+                    "company": company,
+                    "voucher_type": self.doctype,
+                    "voucher_no": self.name,
+                    "remarks": _("Rounding adjustment"),
+                }
+            gl_entries.append(adj)
+
+            # recalc
+            total_debit_dec = sum(_to_decimal(e.get("debit", 0)) for e in gl_entries)
+            total_credit_dec = sum(_to_decimal(e.get("credit", 0)) for e in gl_entries)
+
+    if total_debit_dec != total_credit_dec:
+        frappe.throw(_(
+            "GL entries are not balanced: debit {0} != credit {1}"
+        ).format(total_debit_dec, total_credit_dec))
+
+    return gl_entries
+
+
+def _best_of(fn, repeat):
+    best = None
+    for _i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(rows=10000, repeat=3):
+    """
+    Time both builders on the same synthetic entry and check they agree.
+    """
+    doc = make_synthetic_entry(rows)
+    doc.name = "EE-BENCHMARK"
+
+    legacy_map = _legacy_build_gl_map(doc)
+    engine_map = doc._build_gl_map_for_expense()
+    if legacy_map != engine_map:
+        frappe.throw(_("Minor-unit builder output differs from the legacy builder"))
+
+    legacy = _best_of(lambda: _legacy_build_gl_map(doc), int(repeat))
+    engine = _best_of(doc._build_gl_map_for_expense, int(repeat))
+
+    result = {
+        "rows": int(rows),
+        "legacy_ms": round(legacy * 1000, 2),
+        "engine_ms": round(engine * 1000, 2),
+        "speedup": round(legacy / engine, 2) if engine else None,
+    }
+    print(result)
+    return result
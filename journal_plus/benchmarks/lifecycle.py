@@ -0,0 +1,155 @@
+"""
+Expense Entry lifecycle benchmark.
+
+Generates synthetic Expense Entries for every (rows, dimensions) combination,
+times each phase of the document lifecycle, counts the SQL statements it
+issues and writes the results to JSON so runs from different commits can be
+compared. Every case is rolled back; only the synthetic dimensions persist.
+
+Run on a local bench site (no outside services needed):
+
+    bench --site <site> execute journal_plus.benchmarks.lifecycle.run
+    bench --site <site> execute journal_plus.benchmarks.lifecycle.run \
+        --kwargs "{'rows': [1, 100, 10000], 'dimensions': [0, 10], 'output': '/tmp/after.json'}"
+    bench --site <site> execute journal_plus.benchmarks.lifecycle.compare \
+        --kwargs "{'baseline': '/tmp/before.json', 'current': '/tmp/after.json'}"
+"""
+
+import json
+import os
+import subprocess
+
+import frappe
+
+from journal_plus.benchmarks.utils import (
+    ensure_dimensions,
+    get_benchmark_company,
+    make_synthetic_entry,
+    measure,
+)
+
+DEFAULT_ROWS = (1, 10, 100, 1000, 10000)
+DEFAULT_DIMENSIONS = (0, 2, 5, 10)
+PHASES = ("validate", "build_gl_map", "insert", "on_submit", "on_cancel", "delete")
+
+
+def run(rows=DEFAULT_ROWS, dimensions=DEFAULT_DIMENSIONS, output=None):
+    """
+    Benchmark every combination and write the results to `output`
+    (default: <site>/journal_plus_benchmarks/lifecycle-<commit>.json).
+    """
+    setup = get_benchmark_company()
+    available = ensure_dimensions(max(dimensions or (0,)))
+
+    cases = []
+    for dimension_count in dimensions:
+        for row_count in rows:
+            case = run_case(int(row_count), available[: int(dimension_count)], setup)
+            cases.append(case)
+            print(_format_case(case))
+
+    result = {
+        "commit": _get_commit(),
+        "timestamp": frappe.utils.now(),
+        "site": frappe.local.site,
+        "cases": cases,
+    }
+
+    output = output or _default_output(result["commit"])
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=1)
+
+    print(f"Results written to {output}")
+    return output
+
+
+def run_case(rows, dimensions, setup):
+    """
+    Run one synthetic entry through validate, GL map build, insert, submit,
+    cancel and delete, then roll everything back.
+    """
+    phases = {}
+    doc = make_synthetic_entry(rows, dimensions, setup)
+
+    try:
+        with measure(phases, "validate"):
+            doc.run_method("validate")
+
+        with measure(phases, "build_gl_map"):
+            doc._build_gl_map_for_expense()
+
+        with measure(phases, "insert"):
+            doc.insert(ignore_permissions=True)
+
+        with measure(phases, "on_submit"):
+            doc.submit()
+
+        with measure(phases, "on_cancel"):
+            doc.cancel()
+
+        with measure(phases, "delete"):
+            frappe.delete_doc(doc.doctype, doc.name, ignore_permissions=True)
+    finally:
+        frappe.db.rollback()
+
+    return {"rows": rows, "dimensions": len(dimensions), "phases": phases}
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Print phases whose time or query count grew by more than `threshold`
+    between two result files. Returns the list of regressions.
+    """
+    with open(baseline) as f:
+        before = {(c["rows"], c["dimensions"]): c["phases"] for c in json.load(f)["cases"]}
+    with open(current) as f:
+        after = {(c["rows"], c["dimensions"]): c["phases"] for c in json.load(f)["cases"]}
+
+    regressions = []
+    for key in sorted(before.keys() & after.keys()):
+        for phase in PHASES:
+            old, new = before[key].get(phase), after[key].get(phase)
+            if not old or not new:
+                continue
+            for metric in ("ms", "queries"):
+                if old[metric] and new[metric] > old[metric] * (1 + threshold):
+                    regressions.append({
+                        "rows": key[0],
+                        "dimensions": key[1],
+                        "phase": phase,
+                        "metric": metric,
+                        "before": old[metric],
+                        "after": new[metric],
+                    })
+
+    for r in regressions:
+        print(
+            f"{r['rows']:>6} rows / {r['dimensions']:>2} dims  {r['phase']:<12} "
+            f"{r['metric']}: {r['before']} -> {r['after']}"
+        )
+    if not regressions:
+        print("No regressions")
+    return regressions
+
+
+def _format_case(case):
+    parts = [f"{p} {v['ms']:.1f}ms/{v['queries']}q" for p, v in case["phases"].items()]
+    return f"{case['rows']:>6} rows / {case['dimensions']:>2} dims: " + ", ".join(parts)
+
+
+def _get_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=frappe.get_app_path("journal_plus"),
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except Exception:
+        return None
+
+
+def _default_output(commit):
+    name = f"lifecycle-{commit or frappe.utils.now_datetime().strftime('%Y%m%d%H%M%S')}.json"
+    return frappe.get_site_path("journal_plus_benchmarks", name)
@@ -0,0 +1,137 @@
+"""
+Shared helpers for the journal_plus benchmarks: synthetic Expense Entries,
+synthetic accounting dimensions and per-phase measurement.
+
+Everything here is meant for a local, throwaway bench site.
+"""
+
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+
+from journal_plus.instrumentation import count_queries
+
+BENCHMARK_DIMENSION_PREFIX = "Benchmark Dimension"
+BENCHMARK_EXPENSE_LABEL = "Benchmark Expense"
+
+
+@contextmanager
+def measure(results, phase):
+    """
+    Record wall time (ms) and query count of the block into results[phase].
+    """
+    with count_queries() as counter:
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+    results[phase] = {"ms": round(elapsed * 1000, 3), "queries": counter.count}
+
+
+def get_benchmark_company():
+    """
+    Company and ledger accounts the synthetic entries post against.
+    """
+    company = frappe.defaults.get_user_default("Company") or frappe.get_default("company")
+    cash = frappe.db.get_value(
+        "Account", {"company": company, "account_type": ["in", ["Bank", "Cash"]], "is_group": 0}
+    )
+    expense = frappe.db.get_value("Account", {"company": company, "root_type": "Expense", "is_group": 0})
+    if not (company and cash and expense):
+        frappe.throw(_("The benchmark needs a company with a Cash/Bank and an Expense ledger account"))
+
+    if not frappe.db.exists("Expense Label", BENCHMARK_EXPENSE_LABEL):
+        frappe.get_doc({
+            "doctype": "Expense Label",
+            "title": BENCHMARK_EXPENSE_LABEL,
+            "accounts": [{"company": company, "account": expense}],
+        }).insert(ignore_permissions=True)
+        frappe.db.commit()
+
+    return frappe._dict(
+        company=company,
+        cash_account=cash,
+        expense_account=expense,
+        expense_label=BENCHMARK_EXPENSE_LABEL,
+        currency=frappe.get_cached_value("Company", company, "default_currency"),
+        mode_of_payment=frappe.db.get_value("Mode of Payment", {"enabled": 1}),
+    )
+
+
+def ensure_dimensions(count):
+    """
+    Make sure `count` synthetic accounting dimensions exist (one custom DocType with a
+    single value each) and return [(fieldname, value), ...] for them.
+    """
+    from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+        make_dimension_in_accounting_doctypes,
+    )
+
+    dimensions = []
+    for idx in range(1, int(count) + 1):
+        doctype = f"{BENCHMARK_DIMENSION_PREFIX} {idx}"
+        if not frappe.db.exists("DocType", doctype):
+            frappe.get_doc({
+                "doctype": "DocType",
+                "name": doctype,
+                "module": "Journal Plus",
+                "custom": 1,
+                "autoname": "Prompt",
+                "fields": [{"fieldname": "title", "fieldtype": "Data", "label": "Title"}],
+                "permissions": [{"role": "System Manager", "read": 1, "write": 1, "create": 1}],
+            }).insert(ignore_permissions=True)
+
+        value = f"{doctype} Value"
+        if not frappe.db.exists(doctype, value):
+            frappe.get_doc({"doctype": doctype, "__newname": value, "title": value}).insert(
+                ignore_permissions=True
+            )
+
+        if not frappe.db.exists("Accounting Dimension", {"document_type": doctype}):
+            dimension = frappe.get_doc({"doctype": "Accounting Dimension", "document_type": doctype})
+            dimension.insert(ignore_permissions=True)
+            make_dimension_in_accounting_doctypes(doc=dimension)
+
+        fieldname = frappe.db.get_value("Accounting Dimension", {"document_type": doctype}, "fieldname")
+        dimensions.append((fieldname, value))
+
+    frappe.db.commit()
+    frappe.flags.accounting_dimensions = None
+    frappe.flags.accounting_dimensions_details = None
+    return dimensions
+
+
+def make_synthetic_entry(rows, dimensions=(), setup=None):
+    """
+    Build an unsaved Expense Entry with `rows` detail lines. Every other line
+    carries its own dimension values, the rest inherit them from the header.
+    Nothing is written to the database.
+    """
+    setup = setup or get_benchmark_company()
+    header_dimensions = dict(dimensions)
+
+    details = []
+    for idx in range(int(rows)):
+        row = {
+            "expense_label": setup.expense_label,
+            "expense_account": setup.expense_account,
+            "amount": 1000 + (idx % 97) / 100,
+            "remarks": f"Benchmark line {idx}",
+        }
+        if idx % 2:
+            row.update(header_dimensions)
+        details.append(row)
+
+    return frappe.get_doc({
+        "doctype": "Expense Entry",
+        "title": f"Benchmark {rows} lines",
+        "company": setup.company,
+        "currency": setup.currency,
+        "mode_of_payment": setup.mode_of_payment,
+        "posting_date": frappe.utils.nowdate(),
+        "account_paid_from": setup.cash_account,
+        "remarks": "Benchmark",
+        "details": details,
+        **header_dimensions,
+    })
@@ -0,0 +1,309 @@
+"""
+Document-level budget check for Expense Entries.
+
+ERPNext validates budgets once per GL entry, re-reading the budget and the
+actual expense for every line. Here the whole Expense Entry is checked up front:
+rows are grouped per budget and account, the applicable budgets come from one
+query, tree bounds from one query per tree doctype and the actual expense from
+one grouped GL Entry query per budget dimension. Every breach is reported with
+the rows that cause it. Once the document has passed, ERPNext's own per-entry
+check is skipped while its GL Entries are saved (see gl_budget_checked).
+"""
+
+from contextlib import contextmanager
+
+import erpnext.accounts.general_ledger as general_ledger
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    get_accounting_dimensions,
+)
+from erpnext.accounts.doctype.budget.budget import get_accumulated_monthly_budget
+from erpnext.accounts.utils import get_fiscal_year
+from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder import functions as fn
+from frappe.utils import flt, fmt_money, get_last_day, getdate
+
+BUDGET_ACTIONS = ("Stop", "Warn")
+
+
+@contextmanager
+def gl_budget_checked():
+    """
+    Save GL Entries of a document whose budget validate_expense_budget already
+    checked: ERPNext's per-entry check (one budget lookup and one actual expense
+    query per GL Entry, plus a second Warn message) is swapped out for the block
+    only and restored when it ends, so every other GL posting is checked as usual.
+    """
+    original = general_ledger.validate_expense_against_budget
+    general_ledger.validate_expense_against_budget = _budget_already_checked
+    try:
+        yield
+    finally:
+        general_ledger.validate_expense_against_budget = original
+
+
+def _budget_already_checked(*args, **kwargs):
+    pass
+
+
+def validate_expense_budget(doc, context=None):
+    """
+    Compare the document's expense rows (plus what is already booked) with every
+    applicable Budget. "Stop" breaches throw, "Warn" breaches show a message.
+    """
+    rows = get_budget_rows(doc, context)
+    if not rows:
+        return
+
+    posting_date = getdate(doc.posting_date)
+    fiscal_year = get_fiscal_year(posting_date, company=doc.company)[0]
+    against_fields = get_budget_against_fields()
+
+    budgets = get_budgets(doc.company, fiscal_year, {row.account for row in rows}, against_fields)
+    if not budgets:
+        return
+
+    bounds = get_tree_bounds(budgets, rows, against_fields)
+    # budgets on tree nodes that no longer exist cannot apply
+    budgets = [
+        b for b in budgets
+        if against_fields[b.budget_against] not in bounds
+        or b.against_value in bounds[against_fields[b.budget_against]]
+    ]
+    actuals = get_actual_expenses(doc.company, fiscal_year, posting_date, budgets, bounds, against_fields)
+
+    currency = frappe.get_cached_value("Company", doc.company, "default_currency")
+    stop, warn = [], []
+    exception_role = frappe.get_cached_value("Company", doc.company, "exception_budget_approver_role")
+    can_override = exception_role and exception_role in frappe.get_roles()
+
+    for budget in budgets:
+        fieldname = against_fields[budget.budget_against]
+        matching = [
+            row for row in rows
+            if row.account == budget.account and _covers(budget, row.values.get(fieldname), fieldname, bounds)
+        ]
+        if not matching:
+            continue
+
+        amount = sum(row.amount for row in matching)
+        row_numbers = sorted({idx for row in matching for idx in row.idx})
+        actual = actuals.get((budget.name, budget.account), (0, 0))
+
+        checks = (
+            (_("Annual"), budget.action_if_annual_budget_exceeded, flt(budget.budget_amount), actual[0]),
+            (
+                _("Accumulated Monthly"),
+                budget.action_if_accumulated_monthly_budget_exceeded,
+                get_accumulated_monthly_budget(
+                    budget.monthly_distribution, posting_date, fiscal_year, budget.budget_amount
+                ) if budget.action_if_accumulated_monthly_budget_exceeded in BUDGET_ACTIONS else 0,
+                actual[1],
+            ),
+        )
+        for label, action, budget_amount, booked in checks:
+            if action not in BUDGET_ACTIONS or not budget_amount:
+                continue
+            total = flt(booked) + amount
+            if total <= budget_amount:
+                continue
+
+            message = _(
+                "{0} Budget for Account {1} against {2} {3} is {4}. Rows {5} take the expense to {6}, {7} over budget."
+            ).format(
+                label,
+                frappe.bold(budget.account),
+                budget.budget_against,
+                frappe.bold(budget.against_value),
+                fmt_money(budget_amount, currency=currency),
+                ", ".join(f"#{idx}" for idx in row_numbers),
+                fmt_money(total, currency=currency),
+                fmt_money(total - budget_amount, currency=currency),
+            )
+            (stop if action == "Stop" and not can_override else warn).append(message)
+
+    if warn:
+        frappe.msgprint("<br>".join(warn), title=_("Budget Exceeded"), indicator="orange")
+    if stop:
+        frappe.throw("<br>".join(stop), title=_("Budget Exceeded"))
+
+
+def get_budget_rows(doc, context=None):
+    """
+    Expense rows grouped by (account, cost center, project, dimensions), amounts in
+    company currency. Each group keeps the row numbers it came from.
+    """
+    # imported here: expense_entry imports this module
+    from journal_plus.journal_plus.doctype.expense_entry.expense_entry import get_account_details
+
+    dimensions = list(context.dimensions) if context else get_accounting_dimensions()
+    fields = ["cost_center", "project", *dimensions]
+    details = doc.get("details") or []
+    account_details = get_account_details([row.get("expense_account") for row in details])
+    rate = flt(doc.get("exchange_rate")) or 1
+
+    groups = {}
+    for idx, row in enumerate(details, start=1):
+        account = row.get("expense_account")
+        if (account_details.get(account) or {}).get("root_type") != "Expense":
+            continue
+
+        values = {f: row.get(f) or doc.get(f) for f in fields}
+        key = (account, *(values[f] for f in fields))
+        group = groups.setdefault(key, frappe._dict(account=account, values=values, amount=0, idx=[]))
+        group.amount += flt(row.get("amount")) * rate
+        group.idx.append(idx)
+
+    return list(groups.values())
+
+
+def get_budget_against_fields():
+    """
+    {budget_against: fieldname} for Cost Center, Project and every accounting dimension.
+    """
+    fields = {"Cost Center": "cost_center", "Project": "project"}
+    for dimension in get_accounting_dimensions(as_list=False):
+        fields[dimension.document_type] = dimension.fieldname
+    return fields
+
+
+def get_budgets(company, fiscal_year, accounts, against_fields):
+    """
+    Submitted budget lines of the fiscal year for the given accounts, with the
+    value they are set against in `against_value`.
+    """
+    budget = frappe.qb.DocType("Budget")
+    budget_account = frappe.qb.DocType("Budget Account")
+    dimension_fields = [f for f in against_fields.values() if f not in ("cost_center", "project")]
+
+    rows = (
+        frappe.qb.from_(budget)
+        .inner_join(budget_account)
+        .on(budget_account.parent == budget.name)
+        .select(
+            budget.name,
+            budget.budget_against,
+            budget.cost_center,
+            budget.project,
+            *[budget[f] for f in dimension_fields],
+            budget.monthly_distribution,
+            budget.action_if_annual_budget_exceeded,
+            budget.action_if_accumulated_monthly_budget_exceeded,
+            budget_account.account,
+            budget_account.budget_amount,
+        )
+        .where(budget.company == company)
+        .where(budget.fiscal_year == fiscal_year)
+        .where(budget.docstatus == 1)
+        .where(budget.applicable_on_booking_actual_expenses == 1)
+        .where(budget_account.account.isin(list(accounts)))
+    ).run(as_dict=True)
+
+    budgets = []
+    for row in rows:
+        fieldname = against_fields.get(row.budget_against)
+        if fieldname and row.get(fieldname):
+            row.against_value = row[fieldname]
+            budgets.append(row)
+    return budgets
+
+
+def get_tree_bounds(budgets, rows, against_fields):
+    """
+    {fieldname: {value: (lft, rgt)}} for budget and row values of tree doctypes,
+    one query per doctype. Budgets on a tree node cover all of its descendants.
+    """
+    bounds = {}
+    for doctype in {b.budget_against for b in budgets}:
+        if not frappe.get_meta(doctype).is_tree:
+            continue
+        fieldname = against_fields[doctype]
+        values = {b.against_value for b in budgets if b.budget_against == doctype}
+        values.update(row.values.get(fieldname) for row in rows)
+        values.discard(None)
+        bounds[fieldname] = {
+            name: (lft, rgt)
+            for name, lft, rgt in frappe.get_all(
+                doctype, filters={"name": ["in", list(values)]}, fields=["name", "lft", "rgt"], as_list=True
+            )
+        }
+    return bounds
+
+
+def get_actual_expenses(company, fiscal_year, posting_date, budgets, bounds, against_fields):
+    """
+    {(budget, account): (booked in fiscal year, booked up to the posting month end)}
+    from one grouped GL Entry query per budget dimension.
+    """
+    gle = frappe.qb.DocType("GL Entry")
+    month_end = get_last_day(posting_date)
+    actuals = {}
+
+    by_field = {}
+    for budget in budgets:
+        by_field.setdefault(against_fields[budget.budget_against], []).append(budget)
+
+    for fieldname, field_budgets in by_field.items():
+        doctype = field_budgets[0].budget_against
+        balance = gle.debit - gle.credit
+        query = (
+            frappe.qb.from_(gle)
+            .select(
+                gle.account,
+                fn.Sum(balance).as_("annual"),
+                fn.Sum(Case().when(gle.posting_date <= month_end, balance).else_(0)).as_("monthly"),
+            )
+            .where(gle.company == company)
+            .where(gle.fiscal_year == fiscal_year)
+            .where(gle.is_cancelled == 0)
+            .where(gle.account.isin(list({b.account for b in field_budgets})))
+            .groupby(gle.account)
+        )
+
+        if fieldname in bounds:
+            # every node under the budgeted ones, summed per node with its tree bounds
+            tree = frappe.qb.DocType(doctype)
+            query = (
+                query.inner_join(tree)
+                .on(tree.name == gle[fieldname])
+                .select(tree.lft, tree.rgt)
+                .where(tree.lft >= min(bounds[fieldname][b.against_value][0] for b in field_budgets))
+                .where(tree.rgt <= max(bounds[fieldname][b.against_value][1] for b in field_budgets))
+                .groupby(tree.lft, tree.rgt)
+            )
+        else:
+            query = (
+                query.select(gle[fieldname].as_("against_value"))
+                .where(gle[fieldname].isin(list({b.against_value for b in field_budgets})))
+                .groupby(gle[fieldname])
+            )
+
+        booked = query.run(as_dict=True)
+        for budget in field_budgets:
+            annual = monthly = 0
+            for row in booked:
+                if row.account != budget.account:
+                    continue
+                if fieldname in bounds:
+                    lft, rgt = bounds[fieldname][budget.against_value]
+                    if not (lft <= row.lft and row.rgt <= rgt):
+                        continue
+                elif row.against_value != budget.against_value:
+                    continue
+                annual += flt(row.annual)
+                monthly += flt(row.monthly)
+            actuals[(budget.name, budget.account)] = (annual, monthly)
+
+    return actuals
+
+
+def _covers(budget, value, fieldname, bounds):
+    if not value:
+        return False
+    if fieldname not in bounds:
+        return value == budget.against_value
+
+    node = bounds[fieldname].get(value)
+    lft, rgt = bounds[fieldname][budget.against_value]
+    return bool(node) and lft <= node[0] and node[1] <= rgt
@@ -0,0 +1,204 @@
+import time
+
+import frappe
+from frappe import _
+from frappe.utils import create_batch, now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import get_account_details
+
+LOG_DOCTYPE = "Expense Entry Submission Log"
+DEFAULT_CHUNK_SIZE = 50
+SAVEPOINT = "journal_plus_bulk_submit"
+
+
+@frappe.whitelist()
+def bulk_submit_expense_entries(entries, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Queue a bulk submission of Expense Entries.
+
+    `entries` is a list of draft Expense Entry names and/or Expense Entry payloads (dicts).
+    One Submission Log row is created per item, then a background job submits them.
+    Returns the batch id used to track (and resume) the run.
+    """
+    frappe.has_permission("Expense Entry", "submit", throw=True)
+
+    entries = frappe.parse_json(entries) or []
+    if not entries:
+        frappe.throw(_("No Expense Entries to submit"))
+
+    batch_id = frappe.generate_hash(length=12)
+    _create_logs(batch_id, entries)
+
+    _enqueue(batch_id, chunk_size)
+    return batch_id
+
+
+@frappe.whitelist()
+def resume_bulk_submission(batch_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Re-queue every item of `batch_id` that is not submitted yet.
+    """
+    frappe.has_permission("Expense Entry", "submit", throw=True)
+
+    if not frappe.db.exists(LOG_DOCTYPE, {"batch_id": batch_id}):
+        frappe.throw(_("Bulk submission batch {0} not found").format(batch_id))
+    if is_job_enqueued(get_job_id(batch_id)):
+        frappe.throw(_("Bulk submission batch {0} is still running").format(batch_id))
+
+    _enqueue(batch_id, chunk_size)
+    return batch_id
+
+
+def get_job_id(batch_id):
+    return f"expense_bulk_submit::{batch_id}"
+
+
+def _enqueue(batch_id, chunk_size):
+    # one job per batch: a second worker would insert the payload items again
+    frappe.enqueue(
+        process_bulk_submission,
+        queue="long",
+        timeout=6000,
+        job_id=get_job_id(batch_id),
+        deduplicate=True,
+        batch_id=batch_id,
+        chunk_size=frappe.utils.cint(chunk_size) or DEFAULT_CHUNK_SIZE,
+        enqueue_after_commit=True,
+    )
+
+
+def _create_logs(batch_id, entries):
+    """
+    Insert one Queued log row per item with a single bulk insert.
+    """
+    now = now_datetime()
+    user = frappe.session.user
+    fields = [
+        "name", "creation", "modified", "owner", "modified_by",
+        "batch_id", "item_no", "expense_entry", "payload", "status",
+    ]
+    values = []
+    for item_no, entry in enumerate(entries, start=1):
+        if isinstance(entry, dict):
+            name, payload = None, frappe.as_json(entry)
+        else:
+            name, payload = entry, None
+        values.append((
+            frappe.generate_hash(length=10), now, now, user, user,
+            batch_id, item_no, name, payload, "Queued",
+        ))
+
+    frappe.db.bulk_insert(LOG_DOCTYPE, fields, values)
+
+
+def process_bulk_submission(batch_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Submit every pending item of a batch, committing after each chunk.
+
+    Each document runs inside its own savepoint so a failure only rolls back that
+    document. Items already marked Submitted are skipped, which makes the job safe
+    to resume after a crash or a worker timeout.
+    """
+    pending = frappe.get_all(
+        LOG_DOCTYPE,
+        filters={"batch_id": batch_id, "status": ["!=", "Submitted"]},
+        fields=["name", "expense_entry", "payload"],
+        order_by="item_no asc",
+    )
+
+    _prefetch_shared_metadata(pending)
+
+    started = time.monotonic()
+    submitted = failed = 0
+
+    for chunk in create_batch(pending, chunk_size):
+        for log in chunk:
+            result = _submit_one(log)
+            frappe.db.set_value(LOG_DOCTYPE, log.name, result)
+            if result["status"] == "Submitted":
+                submitted += 1
+            else:
+                failed += 1
+
+        frappe.db.commit()
+
+    elapsed = time.monotonic() - started
+    summary = {
+        "batch_id": batch_id,
+        "submitted": submitted,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round((submitted + failed) / elapsed, 2) if elapsed else 0,
+    }
+
+    frappe.logger("journal_plus").info(f"Expense Entry bulk submission finished: {summary}")
+    frappe.publish_realtime("journal_plus_bulk_submit", summary, user=frappe.session.user)
+    return summary
+
+
+def _submit_one(log):
+    """
+    Insert (for payloads) and submit a single document, returning the log update.
+    """
+    started = time.monotonic()
+    frappe.db.savepoint(SAVEPOINT)
+    try:
+        if log.expense_entry:
+            doc = frappe.get_doc("Expense Entry", log.expense_entry)
+        else:
+            doc = frappe.get_doc(dict(frappe.parse_json(log.payload), doctype="Expense Entry"))
+            doc.insert()
+
+        if doc.docstatus == 0:
+            doc.submit()
+        elif doc.docstatus == 2:
+            frappe.throw(_("Expense Entry {0} is cancelled").format(doc.name))
+
+        return {
+            "status": "Submitted",
+            "expense_entry": doc.name,
+            "error": None,
+            "duration": time.monotonic() - started,
+        }
+    except Exception:
+        frappe.db.rollback(save_point=SAVEPOINT)
+        return {
+            "status": "Failed",
+            "error": frappe.get_traceback(),
+            "duration": time.monotonic() - started,
+        }
+    finally:
+        frappe.clear_messages()
+
+
+def _prefetch_shared_metadata(logs):
+    """
+    Warm the request-level account cache with every account the batch touches,
+    so documents share one lookup instead of one per document.
+    """
+    names = [log.expense_entry for log in logs if log.expense_entry]
+    accounts = set()
+
+    for chunk in create_batch(names, 1000):
+        accounts.update(frappe.get_all(
+            "Expense Entry Detail",
+            filters={"parenttype": "Expense Entry", "parent": ["in", chunk]},
+            pluck="expense_account",
+            distinct=True,
+        ))
+        accounts.update(frappe.get_all(
+            "Expense Entry",
+            filters={"name": ["in", chunk]},
+            pluck="account_paid_from",
+        ))
+
+    for log in logs:
+        if log.payload:
+            payload = frappe.parse_json(log.payload)
+            accounts.add(payload.get("account_paid_from"))
+            accounts.update(row.get("expense_account") for row in payload.get("details") or [])
+
+    accounts.discard(None)
+    if accounts:
+        get_account_details(list(accounts))
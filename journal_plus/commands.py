@@ -0,0 +1,50 @@
+import click
+import frappe
+from frappe.commands import pass_context
+from frappe.exceptions import SiteNotSpecifiedError
+
+
+@click.command("sync-expense-dimensions")
+@pass_context
+def sync_expense_dimensions(context):
+    "Sync Accounting Dimension fields on Expense Entry and Expense Entry Detail"
+    from journal_plus.migration import sync_accounting_dimensions
+
+    if not context.sites:
+        raise SiteNotSpecifiedError
+
+    for site in context.sites:
+        frappe.init(site=site)
+        frappe.connect()
+        try:
+            changes = sync_accounting_dimensions()
+            frappe.db.commit()
+            for action, fields in changes.items():
+                click.echo(f"{site}: {action} {len(fields)} field(s) {', '.join(fields)}".rstrip())
+        finally:
+            frappe.destroy()
+
+
+@click.command("rebuild-expense-summary")
+@click.option("--company", help="Only rebuild this company")
+@pass_context
+def rebuild_expense_summary(context, company=None):
+    "Rebuild the Expense Summary table from submitted Expense Entries"
+    from journal_plus.journal_plus.doctype.expense_summary.expense_summary import (
+        rebuild_expense_summary,
+    )
+
+    if not context.sites:
+        raise SiteNotSpecifiedError
+
+    for site in context.sites:
+        frappe.init(site=site)
+        frappe.connect()
+        try:
+            rows = rebuild_expense_summary(company=company)
+            click.echo(f"{site}: {rows} summary row(s) rebuilt")
+        finally:
+            frappe.destroy()
+
+
+commands = [sync_expense_dimensions, rebuild_expense_summary]
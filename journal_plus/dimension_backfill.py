@@ -0,0 +1,225 @@
+"""
+Backfill an accounting dimension onto existing Expense Entries.
+
+A new Accounting Dimension only adds empty fields; entries posted before it keep
+no value, so dimension reports miss them. An Expense Dimension Backfill maps the
+values of a source field (cost center or project) to dimension values and writes
+them to the Expense Entry, its detail rows and its GL Entries.
+
+Expense Entries are walked by name in chunks. Each chunk reads its rows with a
+few indexed queries, writes each table with one CASE UPDATE per batch of rows
+and commits, so GL Entry rows stay locked only for the length of one chunk. The
+cursor and counters are saved with every commit, so a paused, failed or
+timed-out run resumes where it stopped.
+"""
+
+import time
+
+import frappe
+from frappe import _
+from frappe.query_builder import Case
+from frappe.utils import cint, create_batch, now_datetime
+
+from journal_plus.journal_plus.doctype.expense_summary.expense_summary import rebuild_expense_summary
+
+BACKFILL_DOCTYPE = "Expense Dimension Backfill"
+SOURCE_FIELDS = {"Cost Center": "cost_center", "Project": "project"}
+DEFAULT_CHUNK_SIZE = 500
+UPDATE_CHUNK_SIZE = 1000
+# stay well inside the long queue timeout; the rest of the run is re-enqueued
+TIME_BUDGET = 20 * 60
+
+
+class DimensionMapper:
+    """
+    Source value -> dimension value lookups of one backfill rule.
+    """
+
+    __slots__ = ("fieldname", "overwrite", "source_field", "values")
+
+    def __init__(self, source_field, fieldname, mappings, overwrite=False):
+        self.source_field = source_field
+        self.fieldname = fieldname
+        self.values = {row.source_value: row.dimension_value for row in mappings}
+        self.overwrite = bool(overwrite)
+
+    @classmethod
+    def from_backfill(cls, backfill):
+        return cls(
+            SOURCE_FIELDS[backfill.source_field],
+            backfill.dimension_fieldname,
+            backfill.mappings,
+            backfill.overwrite_existing,
+        )
+
+    def get(self, source_value, current=None):
+        """
+        Dimension value to write, or None when the row is left as it is.
+        """
+        value = self.values.get(source_value)
+        if not value or value == current or (current and not self.overwrite):
+            return None
+        return value
+
+
+def enqueue_dimension_backfill(name, deduplicate=True):
+    """
+    Queue a run of the backfill. Follow-up runs of a job that is still finishing
+    are queued without deduplication, which would otherwise drop them.
+    """
+    frappe.enqueue(
+        run_dimension_backfill,
+        queue="long",
+        timeout=3600,
+        job_id=f"expense_dimension_backfill::{name}" if deduplicate else None,
+        deduplicate=deduplicate,
+        enqueue_after_commit=True,
+        name=name,
+    )
+
+
+def run_dimension_backfill(name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Background job: backfill chunk after chunk from the saved cursor until done,
+    paused or out of time. A failing chunk is rolled back and the run is marked
+    "Failed"; chunks committed before it are kept. The Expense Summary of the
+    backfilled company is rebuilt once the last chunk is written.
+    """
+    backfill = frappe.get_doc(BACKFILL_DOCTYPE, name)
+    if backfill.status not in ("Queued", "Running"):
+        return
+
+    mapper = DimensionMapper.from_backfill(backfill)
+    started = time.monotonic()
+    backfill.db_set(
+        {"status": "Running", "started_on": backfill.started_on or now_datetime(), "last_error": None},
+        commit=True,
+    )
+
+    try:
+        while True:
+            status = frappe.db.get_value(BACKFILL_DOCTYPE, name, "status")
+            if status == "Queued":
+                # paused and started again while this job was still writing a
+                # chunk: start()'s deduplicated enqueue was dropped, so carry on
+                # here with the saved rule, cursor and counters
+                backfill.reload()
+                mapper = DimensionMapper.from_backfill(backfill)
+                backfill.db_set("status", "Running", commit=True)
+            elif status != "Running":
+                # paused from the form
+                break
+
+            entries = get_expense_entries(backfill, mapper, backfill.cursor, chunk_size)
+            if not entries:
+                # summary rows are keyed by dimension values
+                rebuild_expense_summary(backfill.company)
+                backfill.db_set({"status": "Completed", "completed_on": now_datetime()})
+                break
+
+            detail_rows, gl_entries = backfill_expense_entries(entries, mapper)
+            backfill.db_set({
+                "cursor": entries[-1].name,
+                "entries_processed": cint(backfill.entries_processed) + len(entries),
+                "detail_rows_updated": cint(backfill.detail_rows_updated) + detail_rows,
+                "gl_entries_updated": cint(backfill.gl_entries_updated) + gl_entries,
+            })
+            frappe.db.commit()
+            backfill.notify_update()
+
+            if time.monotonic() - started > TIME_BUDGET:
+                enqueue_dimension_backfill(name, deduplicate=False)
+                break
+    except Exception:
+        frappe.db.rollback()
+        backfill.log_error(_("Expense dimension backfill failed"))
+        backfill.db_set({"status": "Failed", "last_error": frappe.get_traceback()})
+
+    frappe.db.commit()
+    backfill.notify_update()
+
+    if frappe.db.get_value(BACKFILL_DOCTYPE, name, "status") == "Queued":
+        # started again between the last status check and the end of this job
+        enqueue_dimension_backfill(name, deduplicate=False)
+
+
+def get_backfill_filters(backfill):
+    filters = {"docstatus": ["<", 2]}
+    if backfill.company:
+        filters["company"] = backfill.company
+    if backfill.from_date and backfill.to_date:
+        filters["posting_date"] = ["between", [backfill.from_date, backfill.to_date]]
+    elif backfill.from_date:
+        filters["posting_date"] = [">=", backfill.from_date]
+    elif backfill.to_date:
+        filters["posting_date"] = ["<=", backfill.to_date]
+    return filters
+
+
+def get_expense_entries(backfill, mapper, after, limit):
+    filters = get_backfill_filters(backfill)
+    if after:
+        filters["name"] = [">", after]
+
+    return frappe.get_all(
+        "Expense Entry",
+        filters=filters,
+        fields=["name", mapper.source_field, mapper.fieldname],
+        order_by="name asc",
+        limit=limit,
+    )
+
+
+def backfill_expense_entries(entries, mapper):
+    """
+    Write the mapped dimension to one chunk of Expense Entries, their detail rows
+    and their GL Entries. Detail rows without their own source value use the
+    Expense Entry's. Returns (detail rows updated, GL Entries updated).
+    """
+    source, fieldname = mapper.source_field, mapper.fieldname
+    names = [entry.name for entry in entries]
+    header_sources = {entry.name: entry.get(source) for entry in entries}
+
+    _set_values("Expense Entry", fieldname, {
+        entry.name: value
+        for entry in entries
+        if (value := mapper.get(entry.get(source), entry.get(fieldname)))
+    })
+
+    details = frappe.get_all(
+        "Expense Entry Detail",
+        filters={"parenttype": "Expense Entry", "parent": ["in", names]},
+        fields=["name", "parent", source, fieldname],
+    )
+    detail_rows = _set_values("Expense Entry Detail", fieldname, {
+        row.name: value
+        for row in details
+        if (value := mapper.get(row.get(source) or header_sources[row.parent], row.get(fieldname)))
+    })
+
+    # GL Entries carry the cost center / project they were posted with
+    gl_entries = frappe.get_all(
+        "GL Entry",
+        filters={"voucher_type": "Expense Entry", "voucher_no": ["in", names]},
+        fields=["name", source, fieldname],
+    )
+    gl_updated = _set_values("GL Entry", fieldname, {
+        row.name: value
+        for row in gl_entries
+        if (value := mapper.get(row.get(source), row.get(fieldname)))
+    })
+
+    return detail_rows, gl_updated
+
+
+def _set_values(doctype, fieldname, values):
+    """
+    Write {name: value} with one CASE UPDATE per batch of names; returns the row count.
+    """
+    table = frappe.qb.DocType(doctype)
+    for names in create_batch(list(values), UPDATE_CHUNK_SIZE):
+        value = Case()
+        for name in names:
+            value = value.when(table.name == name, values[name])
+        frappe.qb.update(table).set(table[fieldname], value).where(table.name.isin(names)).run()
+    return len(values)
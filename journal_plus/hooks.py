@@ -83,7 +83,7 @@ app_license = "mit"
 # ------------
 
 # before_install = "journal_plus.install.before_install"
-# after_install = "journal_plus.install.after_install"
+after_install = "journal_plus.install.after_install"
 
 # Uninstallation
 # ------------
@@ -91,6 +91,11 @@ app_license = "mit"
 # before_uninstall = "journal_plus.uninstall.before_uninstall"
 # after_uninstall = "journal_plus.uninstall.after_uninstall"
 
+# Migration
+# ------------
+
+after_migrate = ["journal_plus.migration.sync_accounting_dimensions"]
+
 # Integration Setup
 # ------------------
 # To set up dependencies/integrations with other apps
@@ -139,14 +144,38 @@ app_license = "mit"
 
 doc_events = {
 	"Accounting Dimension": {
-		"on_update": "journal_plus.migration.create_accounting_dimensions",
+		"on_update": [
+			"journal_plus.migration.create_accounting_dimensions",
+			"journal_plus.posting_context.clear_posting_context",
+		],
+		"after_delete": [
+			"journal_plus.migration.create_accounting_dimensions",
+			"journal_plus.posting_context.clear_posting_context",
+		],
         # "validate": "journal_plus.validations.validate_mandatory_dimensions",
-	}
+	},
+	"Company": {
+		"on_update": "journal_plus.posting_context.clear_posting_context",
+		"on_trash": "journal_plus.posting_context.clear_posting_context",
+	},
+	"Currency": {
+		"on_update": "journal_plus.posting_context.clear_posting_context",
+	},
+	"Currency Exchange": {
+		"on_update": "journal_plus.money.clear_exchange_rate_cache",
+		"on_trash": "journal_plus.money.clear_exchange_rate_cache",
+	},
 }
 
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"daily_long": [
+		"journal_plus.tasks.generate_recurring_expense_entries",
+	],
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"journal_plus.tasks.all"
@@ -192,6 +221,13 @@ doc_events = {
 # -----------------------------------------------------------
 
 # ignore_links_on_delete = ["Communication", "ToDo"]
+# logs and work records that point at Expense Entries must not block deleting a draft
+ignore_links_on_delete = [
+	"Expense Posting Log",
+	"Expense Entry Submission Log",
+	"Expense Clearance Review",
+	"Expense Ingestion Key",
+]
 
 # Request Events
 # ----------------
@@ -237,7 +273,8 @@ doc_events = {
 # Automatically update python controller files with type annotations for this app.
 # export_python_type_annotations = True
 
-# default_log_clearing_doctypes = {
-# 	"Logging DocType Name": 30  # days to retain logs
-# }
+default_log_clearing_doctypes = {
+	"Expense Posting Log": 30,  # days to retain logs
+	"Expense Ingestion Key": 90,  # how long a retried request is recognised
+}
 
@@ -0,0 +1,320 @@
+"""
+Streaming importer for Expense Entries.
+
+The file is read row by row, consecutive rows sharing the same key column are
+grouped into one Expense Entry with its Expense Entry Detail lines, and entries
+are validated and inserted in batches. Only one batch is held in memory at a time,
+so the file has to be sorted (or at least grouped) by the key column.
+"""
+
+import csv
+import math
+import os
+import time
+from itertools import groupby
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    get_accounting_dimensions,
+)
+from frappe import _
+from frappe.utils import cint, flt, getdate
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import get_account_details
+from journal_plus.journal_plus.doctype.expense_label.expense_label import get_label_account_map
+
+DEFAULT_KEY_COLUMN = "entry_key"
+DEFAULT_BATCH_SIZE = 500
+SAVEPOINT = "journal_plus_expense_import"
+
+# file column -> Expense Entry field, read from the first line of each group
+HEADER_COLUMNS = {
+    "title": "title",
+    "posting_date": "posting_date",
+    "payment_to": "payment_to",
+    "mode_of_payment": "mode_of_payment",
+    "account_paid_from": "account_paid_from",
+    "currency": "currency",
+    "payment_reference": "payment_reference",
+    "remarks": "remarks",
+    "cost_center": "cost_center",
+    "project": "project",
+}
+
+# file column -> Expense Entry Detail field, read from every line
+DETAIL_COLUMNS = {
+    "expense_label": "expense_label",
+    "expense_account": "expense_account",
+    "amount": "amount",
+    "description": "description",
+    "reference": "reference",
+    "line_remarks": "remarks",
+    "line_cost_center": "cost_center",
+    "line_project": "project",
+}
+
+
+@frappe.whitelist()
+def start_expense_import(file_url, company, key_column=DEFAULT_KEY_COLUMN, submit=0):
+    """
+    Queue a streaming import of an uploaded CSV/XLSX file.
+    """
+    frappe.has_permission("Expense Entry", "create", throw=True)
+    if cint(submit):
+        frappe.has_permission("Expense Entry", "submit", throw=True)
+    frappe.get_doc("File", {"file_url": file_url}).check_permission("read")
+    frappe.has_permission("Company", "read", doc=company, throw=True)
+
+    frappe.enqueue(
+        import_expense_entries,
+        queue="long",
+        timeout=14400,
+        file_url=file_url,
+        company=company,
+        key_column=key_column,
+        submit=cint(submit),
+        enqueue_after_commit=True,
+    )
+
+
+def import_expense_entries(
+    file_url, company, key_column=DEFAULT_KEY_COLUMN, submit=0, batch_size=DEFAULT_BATCH_SIZE
+):
+    """
+    Import every entry in the file. Row-level errors are collected and reported
+    at the end; a bad entry never aborts the rest of the import.
+    """
+    path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+    label_accounts = get_label_account_map(company)
+    dimensions = set(get_accounting_dimensions())
+
+    started = time.monotonic()
+    imported = 0
+    errors = []
+
+    rows = iter_file_rows(path)
+    groups = group_rows(rows, key_column)
+    entries = build_entries(groups, company, label_accounts, dimensions, errors)
+
+    for batch in batched(entries, batch_size):
+        imported += insert_batch(batch, cint(submit), errors)
+        frappe.db.commit()
+
+    summary = {
+        "file_url": file_url,
+        "imported": imported,
+        "errors": len(errors),
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    if errors:
+        summary["error_report"] = _save_error_report(errors)
+
+    frappe.publish_realtime("journal_plus_expense_import", summary, user=frappe.session.user)
+    return summary
+
+
+def iter_file_rows(path):
+    """
+    Yield (row_no, {column: value}) for a CSV or XLSX file without loading it whole.
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row_no, row in enumerate(csv.DictReader(f), start=2):
+                yield row_no, {_column(k): v for k, v in row.items() if k}
+
+    elif extension == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            values = workbook.active.iter_rows(values_only=True)
+            header = [_column(h) for h in next(values, ())]
+            for row_no, row in enumerate(values, start=2):
+                if any(v not in (None, "") for v in row):
+                    yield row_no, {h: v for h, v in zip(header, row, strict=False) if h}
+        finally:
+            workbook.close()
+
+    else:
+        frappe.throw(_("Only CSV and XLSX files can be imported"))
+
+
+def group_rows(rows, key_column):
+    """
+    Yield (key, [(row_no, row), ...]) for each run of consecutive rows with the same key.
+    """
+    for key, lines in groupby(rows, key=lambda line: line[1].get(key_column)):
+        yield key, list(lines)
+
+
+def build_entries(groups, company, label_accounts, dimensions, errors):
+    """
+    Turn grouped lines into Expense Entry payloads, yielding (key, row_nos, payload).
+    Groups with unresolvable lines are reported in `errors` and skipped.
+    """
+    for key, lines in groups:
+        row_nos = [row_no for row_no, _row in lines]
+        if not key:
+            errors.extend(_error(row_no, key, _("Missing entry key")) for row_no in row_nos)
+            continue
+
+        try:
+            payload = build_entry(key, lines, company, label_accounts, dimensions, errors)
+        except Exception as e:
+            # a malformed group is reported like any other row error
+            errors.extend(_error(row_no, key, _error_message(e)) for row_no in row_nos)
+            continue
+
+        if payload:
+            yield key, row_nos, payload
+
+
+def build_entry(key, lines, company, label_accounts, dimensions, errors):
+    """
+    Expense Entry payload of one group, or None when a line was reported in `errors`.
+    """
+    first = lines[0][1]
+    payload = {"doctype": "Expense Entry", "company": company}
+    for column, fieldname in HEADER_COLUMNS.items():
+        if first.get(column) not in (None, ""):
+            payload[fieldname] = first[column]
+    payload["title"] = payload.get("title") or str(key)
+
+    try:
+        payload["posting_date"] = getdate(payload.get("posting_date"))
+    except (frappe.ValidationError, ValueError, TypeError, OverflowError):
+        errors.extend(
+            _error(row_no, key, _("Invalid posting date {0}").format(payload["posting_date"]))
+            for row_no, _row in lines
+        )
+        return None
+
+    details, failed = [], False
+    for row_no, row in lines:
+        detail = {column: row.get(column) for column in dimensions if row.get(column)}
+        for column, fieldname in DETAIL_COLUMNS.items():
+            if row.get(column) not in (None, ""):
+                detail[fieldname] = row[column]
+
+        amount = _get_amount(detail.get("amount"))
+        if amount is None:
+            errors.append(_error(row_no, key, _("Invalid amount {0}").format(detail.get("amount") or "-")))
+            failed = True
+        detail["amount"] = amount
+
+        if not detail.get("expense_account") and detail.get("expense_label"):
+            detail["expense_account"] = label_accounts.get(detail["expense_label"])
+
+        if not detail.get("expense_account"):
+            errors.append(_error(row_no, key, _("No expense account for label {0}").format(
+                detail.get("expense_label") or "-"
+            )))
+            failed = True
+        details.append(detail)
+
+    if failed:
+        return None
+
+    payload["details"] = details
+    return payload
+
+
+def insert_batch(batch, submit, errors):
+    """
+    Validate a batch of payloads against shared metadata, then insert (and optionally
+    submit) each one in its own savepoint. Returns the number of imported entries.
+    """
+    accounts = {p.get("account_paid_from") for _key, _rows, p in batch}
+    for _key, _rows, payload in batch:
+        accounts.update(d["expense_account"] for d in payload["details"])
+    accounts.discard(None)
+    known_accounts = get_account_details(list(accounts))
+
+    imported = 0
+    for key, row_nos, payload in batch:
+        unknown = sorted({
+            d["expense_account"] for d in payload["details"] if d["expense_account"] not in known_accounts
+        })
+        if unknown:
+            errors.extend(
+                _error(row_no, key, _("Account {0} does not exist").format(", ".join(unknown)))
+                for row_no in row_nos
+            )
+            continue
+
+        frappe.db.savepoint(SAVEPOINT)
+        try:
+            doc = frappe.get_doc(payload)
+            doc.insert()
+            if submit:
+                doc.submit()
+            imported += 1
+        except Exception as e:
+            frappe.db.rollback(save_point=SAVEPOINT)
+            errors.extend(_error(row_no, key, _error_message(e)) for row_no in row_nos)
+        finally:
+            frappe.clear_messages()
+
+    return imported
+
+
+def batched(iterable, size):
+    """
+    Yield lists of at most `size` items from any iterable.
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _column(header):
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def _error(row_no, key, message):
+    return {"row": row_no, "key": key, "error": message}
+
+
+def _error_message(e):
+    return frappe.utils.strip_html(str(e)) or e.__class__.__name__
+
+
+def _get_amount(value):
+    """
+    Line amount as a float, or None when the cell is empty or not a number
+    (flt would silently book it as 0).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int | float):
+        amount = float(value)
+    else:
+        try:
+            amount = float(str(value or "").replace(",", "").strip())
+        except ValueError:
+            return None
+    return flt(amount) if math.isfinite(amount) else None
+
+
+def _save_error_report(errors):
+    """
+    Attach the collected errors as a private CSV and return its URL.
+    """
+    from frappe.utils.csvutils import to_csv
+
+    content = to_csv([["Row", "Entry Key", "Error"]] + [[e["row"], e["key"], e["error"]] for e in errors])
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": f"expense-import-errors-{frappe.generate_hash(length=8)}.csv",
+        "is_private": 1,
+        "content": content,
+    })
+    file_doc.save(ignore_permissions=True)
+    return file_doc.file_url
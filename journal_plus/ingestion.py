@@ -0,0 +1,169 @@
+"""
+Idempotent batch ingestion of Expense Entries for external systems.
+
+Every item carries an idempotency key. The key is claimed in Expense Ingestion
+Key (its primary key) before the Expense Entry is created, inside the same
+savepoint, so a retried or concurrent request with the same key can never post
+twice: it gets the entry created the first time instead. The whole batch is one
+request transaction.
+
+    POST /api/method/journal_plus.ingestion.ingest_expense_entries
+    {"entries": [{"idempotency_key": "card-4711", "company": ..., "details": [...]}, ...],
+     "submit": 1, "source": "card-spend"}
+"""
+
+import hashlib
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import get_account_details
+
+KEY_DOCTYPE = "Expense Ingestion Key"
+MAX_BATCH_SIZE = 500
+MAX_KEY_LENGTH = 140
+SAVEPOINT = "journal_plus_ingestion"
+
+
+@frappe.whitelist(methods=["POST"])
+def ingest_expense_entries(entries, submit=0, source=None):
+    """
+    Create (and optionally submit) a batch of Expense Entries.
+
+    Returns one result per item, in order, with status:
+    created / submitted - the entry was made by this call,
+    duplicate - the key was already used for the same payload (expense_entry is the original),
+    conflict - the key was already used for a different payload,
+    failed - the entry could not be made (error says why); the key stays free for a retry.
+    """
+    submit = cint(submit)
+    frappe.has_permission("Expense Entry", "create", throw=True)
+    if submit:
+        frappe.has_permission("Expense Entry", "submit", throw=True)
+
+    entries = frappe.parse_json(entries) or []
+    if len(entries) > MAX_BATCH_SIZE:
+        frappe.throw(_("At most {0} Expense Entries per request").format(MAX_BATCH_SIZE))
+
+    items = [_prepare(item) for item in entries]
+    existing = _get_existing_keys([i.key for i in items if i.key])
+    _prefetch_accounts(items)
+
+    results, seen = [], {}
+    for item in items:
+        if not item.key or len(item.key) > MAX_KEY_LENGTH:
+            results.append(_result(
+                item, "failed", error=_("idempotency_key is required (at most {0} characters)").format(MAX_KEY_LENGTH)
+            ))
+        elif item.key in existing or item.key in seen:
+            results.append(_replay(item, existing.get(item.key) or seen[item.key]))
+        else:
+            result = _ingest_one(item, submit, source)
+            if result["status"] != "failed":
+                seen[item.key] = frappe._dict(
+                    payload_hash=item.payload_hash, expense_entry=result["expense_entry"]
+                )
+            results.append(result)
+
+    return {"results": results}
+
+
+def _prepare(item):
+    payload = dict(item or {})
+    key = str(payload.pop("idempotency_key", None) or "").strip() or None
+    payload["doctype"] = "Expense Entry"
+    return frappe._dict(
+        key=key,
+        payload=payload,
+        payload_hash=hashlib.sha1(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest(),
+    )
+
+
+def _get_existing_keys(keys):
+    """
+    {key: row} for keys already claimed, in one primary-key lookup.
+    """
+    if not keys:
+        return {}
+    return {
+        row.name: row
+        for row in frappe.get_all(
+            KEY_DOCTYPE,
+            filters={"name": ["in", keys]},
+            fields=["name", "payload_hash", "expense_entry"],
+        )
+    }
+
+
+def _prefetch_accounts(items):
+    accounts = set()
+    for item in items:
+        accounts.add(item.payload.get("account_paid_from"))
+        accounts.update(row.get("expense_account") for row in item.payload.get("details") or [])
+    accounts.discard(None)
+    if accounts:
+        get_account_details(list(accounts))
+
+
+def _ingest_one(item, submit, source):
+    frappe.db.savepoint(SAVEPOINT)
+    claim = frappe.get_doc({
+        "doctype": KEY_DOCTYPE,
+        "idempotency_key": item.key,
+        "source": source,
+        "payload_hash": item.payload_hash,
+    })
+    claim.name = item.key
+    try:
+        claim.db_insert()
+    except (frappe.DuplicateEntryError, frappe.UniqueValidationError):
+        # claimed by a concurrent request after our lookup
+        frappe.db.rollback(save_point=SAVEPOINT)
+        existing = _get_existing_keys([item.key]).get(item.key)
+        if existing:
+            return _replay(item, existing)
+        return _result(item, "failed", error=_("Idempotency key is being processed, retry later"))
+
+    try:
+        doc = frappe.get_doc(item.payload)
+        doc.insert()
+        if submit:
+            doc.submit()
+
+        status = "submitted" if submit else "created"
+        claim.db_set(
+            {"expense_entry": doc.name, "status": "Submitted" if submit else "Draft"},
+            update_modified=False,
+        )
+        return _result(item, status, expense_entry=doc.name)
+
+    except Exception as e:
+        frappe.db.rollback(save_point=SAVEPOINT)
+        return _result(item, "failed", error=frappe.utils.strip_html(str(e)) or e.__class__.__name__)
+
+    finally:
+        frappe.clear_messages()
+
+
+def _replay(item, existing):
+    if existing.payload_hash != item.payload_hash:
+        return _result(
+            item,
+            "conflict",
+            expense_entry=existing.expense_entry,
+            error=_("Idempotency key was already used for a different payload"),
+        )
+    return _result(item, "duplicate", expense_entry=existing.expense_entry)
+
+
+def _result(item, status, expense_entry=None, error=None):
+    return {
+        "idempotency_key": item.key,
+        "status": status,
+        "expense_entry": expense_entry,
+        "error": error,
+    }
@@ -0,0 +1,34 @@
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def after_install():
+    make_custom_fields()
+
+
+def get_custom_fields():
+    """
+    Custom fields journal_plus adds to standard ERPNext doctypes.
+    """
+    return {
+        "Company": [
+            {
+                "fieldname": "journal_plus_section",
+                "fieldtype": "Section Break",
+                "label": "Journal Plus",
+                "insert_after": "round_off_cost_center",
+                "collapsible": 1,
+            },
+            {
+                "fieldname": "consolidate_expense_gl_entries",
+                "fieldtype": "Check",
+                "label": "Consolidate Expense Entry GL Entries",
+                "description": "Post one GL Entry per account, cost center, project, party and "
+                "accounting dimension instead of one per Expense Entry line.",
+                "insert_after": "journal_plus_section",
+            },
+        ],
+    }
+
+
+def make_custom_fields():
+    create_custom_fields(get_custom_fields(), update=True)
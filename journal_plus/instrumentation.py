@@ -0,0 +1,129 @@
+"""
+Opt-in timing and query-count instrumentation for Expense Entry posting.
+
+Enabled and sampled from Journal Plus Settings. Each sampled validate, submit or
+cancel writes one Expense Posting Log row per phase (plus a "total" row) with a
+single bulk insert; unsampled events only pay for reading the cached settings.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+LOG_DOCTYPE = "Expense Posting Log"
+
+
+@contextmanager
+def count_queries():
+    """
+    Count SQL statements issued inside the block.
+
+        with count_queries() as counter:
+            ...
+        counter.count
+    """
+    counter = frappe._dict(count=0)
+    db = frappe.db
+    patched = db.__dict__.get("sql")
+    original = db.sql
+
+    def sql(*args, **kwargs):
+        counter.count += 1
+        return original(*args, **kwargs)
+
+    db.sql = sql
+    try:
+        yield counter
+    finally:
+        if patched is None:
+            del db.sql
+        else:
+            db.sql = patched
+
+
+def is_sampled():
+    """
+    Whether the current event should be recorded, per Journal Plus Settings.
+    """
+    from journal_plus.journal_plus.doctype.journal_plus_settings.journal_plus_settings import (
+        get_settings,
+    )
+
+    settings = get_settings()
+    if not cint(settings.enable_posting_instrumentation):
+        return False
+    return random.random() * 100 < flt(settings.instrumentation_sample_rate)
+
+
+class PostingProfiler:
+    """
+    Collects per-phase timings for one document event.
+
+        profiler = PostingProfiler(doc, "on_submit")
+        with profiler.phase("build_gl_map"):
+            ...
+        profiler.save()
+    """
+
+    def __init__(self, doc, event, dimension_count=None):
+        self.doc = doc
+        self.event = event
+        self.enabled = is_sampled()
+        self.dimension_count = dimension_count
+        self.phases = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        with count_queries() as counter:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.phases.append((name, (time.perf_counter() - start) * 1000, counter.count))
+
+    def save(self):
+        """
+        Write the collected phases plus a "total" row; a no-op for unsampled events.
+        """
+        if not self.enabled or not self.phases:
+            return
+
+        total_ms = (time.perf_counter() - self.started) * 1000
+        total_queries = sum(queries for _name, _ms, queries in self.phases)
+        self.phases.append(("total", total_ms, total_queries))
+
+        if self.dimension_count is None:
+            from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+                get_accounting_dimensions,
+            )
+
+            self.dimension_count = len(get_accounting_dimensions())
+
+        now = now_datetime()
+        user = frappe.session.user
+        row_count = len(self.doc.get("details") or [])
+        frappe.db.bulk_insert(
+            LOG_DOCTYPE,
+            [
+                "name", "creation", "modified", "owner", "modified_by",
+                "reference_name", "event", "phase", "duration_ms", "query_count",
+                "row_count", "dimension_count",
+            ],
+            [
+                (
+                    frappe.generate_hash(length=10), now, now, user, user,
+                    self.doc.name, self.event, name, round(ms, 3), queries,
+                    row_count, self.dimension_count,
+                )
+                for name, ms, queries in self.phases
+            ],
+        )
+        self.phases = []
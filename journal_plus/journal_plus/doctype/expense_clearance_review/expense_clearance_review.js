@@ -0,0 +1,8 @@
+// Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("Expense Clearance Review", {
+// 	refresh(frm) {
+
+// 	},
+// });
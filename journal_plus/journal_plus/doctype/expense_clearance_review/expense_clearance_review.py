@@ -0,0 +1,29 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+
+class ExpenseClearanceReview(Document):
+	def validate(self):
+		if self.status != "Matched":
+			return
+
+		if not self.expense_entry:
+			frappe.throw(_("Select the Expense Entry this statement line clears"))
+
+		entry = frappe.db.get_value(
+			"Expense Entry", self.expense_entry, ["docstatus", "account_paid_from"], as_dict=True
+		)
+		if not entry or entry.docstatus != 1:
+			frappe.throw(_("Expense Entry {0} is not submitted").format(self.expense_entry))
+		if entry.account_paid_from != self.account:
+			frappe.throw(
+				_("Expense Entry {0} is not paid from {1}").format(self.expense_entry, self.account)
+			)
+
+	def on_update(self):
+		if self.status == "Matched" and self.has_value_changed("status"):
+			frappe.db.set_value("Expense Entry", self.expense_entry, "clearance_date", self.statement_date)
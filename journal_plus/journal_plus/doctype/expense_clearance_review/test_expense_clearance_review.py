@@ -0,0 +1,88 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, getdate, nowdate
+
+from journal_plus.bank_clearance import ClearanceMatcher, get_uncleared_entries, parse_statement_line
+from journal_plus.money import MoneyEngine
+from journal_plus.tests.fixtures import get_expense_fixtures, make_expense_entry
+
+
+class TestExpenseClearanceReview(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def _matcher(self, entries, date_window=3):
+		return ClearanceMatcher(
+			[frappe._dict(zip(("name", "payment_reference", "posting_date", "amount"), e, strict=True)) for e in entries],
+			MoneyEngine(None, precision=2),
+			date_window,
+		)
+
+	def _line(self, date, reference, amount):
+		return parse_statement_line(2, {"date": date, "reference": reference, "withdrawal": amount})
+
+	def test_reference_match_needs_same_amount(self):
+		matcher = self._matcher([
+			("EE-1", "TRF 001", "2026-05-01", 100),
+			("EE-2", None, "2026-05-20", 250),
+		])
+		self.assertIsNone(matcher.match(self._line("2026-05-01", "trf001", 99)))
+		self.assertEqual(matcher.match(self._line("2026-05-20", "trf001", "-100.00")), "EE-1")
+
+	def test_line_without_date_is_left_for_review(self):
+		matcher = self._matcher([("EE-1", "TRF 001", "2026-05-01", 100)])
+		# there would be no clearance date to set
+		self.assertIsNone(matcher.match(self._line(None, "trf001", 100)))
+		self.assertEqual(matcher.match(self._line("2026-05-02", "trf001", 100)), "EE-1")
+
+	def test_foreign_currency_entry_matches_on_the_account_amount(self):
+		fixtures = get_expense_fixtures()
+		foreign = "EUR" if fixtures.currency == "USD" else "USD"
+		doc = make_expense_entry(fixtures, rows=2, amount=10.25, currency=foreign, exchange_rate=15000)
+		doc.insert(ignore_permissions=True)
+		doc.submit()
+
+		line = self._line(nowdate(), None, 307500)
+		entries = get_uncleared_entries(fixtures.cash_account, [line], 3)
+		self.assertEqual(flt(next(e.amount for e in entries if e.name == doc.name)), 307500)
+
+		matcher = ClearanceMatcher(entries, MoneyEngine(fixtures.currency), 3)
+		self.assertEqual(matcher.match(line), doc.name)
+
+	def test_only_withdrawals_can_clear_an_entry(self):
+		matcher = self._matcher([("EE-1", None, "2026-05-01", 100)])
+
+		def signed(amount):
+			return parse_statement_line(2, {"date": "2026-05-01", "amount": amount})
+
+		# a deposit or refund of the same amount is not a payment
+		self.assertEqual(signed("100.00").amount, 0)
+		self.assertIsNone(matcher.match(signed("100.00")))
+		self.assertEqual(matcher.match(signed("-100.00")), "EE-1")
+
+	def test_amount_match_takes_closest_unclaimed_date(self):
+		matcher = self._matcher([
+			("EE-1", None, "2026-05-01", 75.5),
+			("EE-2", None, "2026-05-04", 75.5),
+			("EE-3", None, "2026-05-10", 75.5),
+		])
+		self.assertEqual(matcher.match(self._line("2026-05-03", None, 75.5)), "EE-2")
+		self.assertEqual(matcher.match(self._line("2026-05-03", None, 75.5)), "EE-1")
+		# EE-3 is outside the window
+		self.assertIsNone(matcher.match(self._line("2026-05-03", None, 75.5)))
+
+	def test_single_pass_over_thousands_of_lines(self):
+		entries = [
+			(f"EE-{i}", f"REF{i}" if i % 2 else None, getdate("2026-01-01"), 1000 + i)
+			for i in range(5000)
+		]
+		matcher = self._matcher(entries)
+		lines = [self._line("2026-01-02", f"REF{i}" if i % 2 else None, 1000 + i) for i in range(5000)]
+		lines.append(self._line("2026-01-02", None, 1))
+
+		matched = [matcher.match(line) for line in lines]
+		self.assertEqual(matched[:-1], [f"EE-{i}" for i in range(5000)])
+		self.assertIsNone(matched[-1])
@@ -0,0 +1,33 @@
+// Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Expense Dimension Backfill", {
+	refresh(frm) {
+		if (frm.is_new()) return;
+
+		const status = frm.doc.status;
+		const call = (method, args) => frm.call(method, args).then(() => frm.reload_doc());
+
+		if (["Queued", "Running"].includes(status)) {
+			frm.add_custom_button(__("Pause"), () => call("pause"));
+		} else if (status !== "Completed") {
+			frm.add_custom_button(frm.doc.cursor ? __("Resume") : __("Start"), () => call("start"));
+		}
+		if (frm.doc.cursor || status === "Completed") {
+			frm.add_custom_button(__("Restart"), () =>
+				frappe.confirm(__("Backfill every matching Expense Entry again from the start?"), () =>
+					call("start", { restart: 1 })
+				)
+			);
+		}
+
+		if (frm.doc.total_entries && status !== "Draft") {
+			const percent = Math.min(100, (frm.doc.entries_processed / frm.doc.total_entries) * 100);
+			frm.dashboard.add_progress(
+				__("Backfill Progress"),
+				percent,
+				__("{0} of {1} Expense Entries", [frm.doc.entries_processed, frm.doc.total_entries])
+			);
+		}
+	},
+});
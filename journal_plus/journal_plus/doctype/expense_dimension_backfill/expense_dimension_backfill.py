@@ -0,0 +1,86 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint
+
+from journal_plus.dimension_backfill import enqueue_dimension_backfill, get_backfill_filters
+
+RULE_FIELDS = ("accounting_dimension", "source_field", "company", "from_date", "to_date", "overwrite_existing")
+
+
+class ExpenseDimensionBackfill(Document):
+	def validate(self):
+		if not self.is_new() and self.status in ("Queued", "Running"):
+			if any(self.has_value_changed(f) for f in RULE_FIELDS):
+				frappe.throw(_("Pause the backfill before changing its rule"))
+
+		dimension = frappe.db.get_value(
+			"Accounting Dimension", self.accounting_dimension, ["fieldname", "document_type"], as_dict=True
+		)
+		self.dimension_fieldname = dimension.fieldname or frappe.scrub(self.accounting_dimension)
+		self.document_type = dimension.document_type
+
+		for doctype in ("Expense Entry", "Expense Entry Detail", "GL Entry"):
+			if not frappe.get_meta(doctype).has_field(self.dimension_fieldname):
+				frappe.throw(
+					_("{0} has no field for Accounting Dimension {1}; sync the dimension first").format(
+						doctype, self.accounting_dimension
+					)
+				)
+
+		self.validate_mappings()
+
+	def validate_mappings(self):
+		seen = set()
+		for row in self.mappings:
+			if row.source_value in seen:
+				frappe.throw(_("Row {0}: {1} is mapped twice").format(row.idx, frappe.bold(row.source_value)))
+			seen.add(row.source_value)
+
+		# one existence query per side instead of one per row
+		for doctype, field in ((self.source_field, "source_value"), (self.document_type, "dimension_value")):
+			values = {row.get(field) for row in self.mappings}
+			found = set(frappe.get_all(doctype, filters={"name": ["in", list(values)]}, pluck="name"))
+			for row in self.mappings:
+				if row.get(field) not in found:
+					frappe.throw(
+						_("Row {0}: {1} {2} does not exist").format(row.idx, _(doctype), frappe.bold(row.get(field)))
+					)
+
+	@frappe.whitelist()
+	def start(self, restart=False):
+		"""
+		Queue the backfill, resuming from the saved cursor unless `restart` is set.
+		"""
+		self.check_permission("write")
+		if self.status in ("Queued", "Running"):
+			frappe.throw(_("The backfill is already running"))
+		if self.status == "Completed" and not cint(restart):
+			frappe.throw(_("The backfill is complete; restart it to run it again"))
+
+		values = {"status": "Queued", "last_error": None, "completed_on": None}
+		if cint(restart) or not self.cursor:
+			values.update({
+				"cursor": None,
+				"started_on": None,
+				"entries_processed": 0,
+				"detail_rows_updated": 0,
+				"gl_entries_updated": 0,
+				"total_entries": frappe.db.count("Expense Entry", get_backfill_filters(self)),
+			})
+		self.db_set(values)
+		enqueue_dimension_backfill(self.name)
+
+	@frappe.whitelist()
+	def pause(self):
+		"""
+		Stop after the chunk in progress; start() resumes from there.
+		"""
+		self.check_permission("write")
+		if self.status not in ("Queued", "Running"):
+			frappe.throw(_("The backfill is not running"))
+		self.db_set("status", "Paused")
+
@@ -0,0 +1,103 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_first_day, nowdate
+
+from journal_plus.dimension_backfill import DimensionMapper, run_dimension_backfill
+from journal_plus.tests.fixtures import get_expense_fixtures, make_expense_entry
+
+BACKFILL_MODULE = "journal_plus.dimension_backfill"
+
+
+class TestExpenseDimensionBackfill(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def _mapper(self, overwrite=False):
+		mappings = [
+			frappe._dict(source_value="Main - JP", dimension_value="Jakarta"),
+			frappe._dict(source_value="Sales - JP", dimension_value="Surabaya"),
+		]
+		return DimensionMapper("cost_center", "branch", mappings, overwrite)
+
+	def test_only_empty_values_are_filled(self):
+		mapper = self._mapper()
+		self.assertEqual(mapper.get("Main - JP"), "Jakarta")
+		self.assertEqual(mapper.get("Sales - JP", ""), "Surabaya")
+		self.assertIsNone(mapper.get("Sales - JP", "Bandung"))
+		self.assertIsNone(mapper.get("Unmapped - JP"))
+		self.assertIsNone(mapper.get(None))
+
+	def test_overwrite_replaces_other_values_only(self):
+		mapper = self._mapper(overwrite=True)
+		self.assertEqual(mapper.get("Sales - JP", "Bandung"), "Surabaya")
+		# rows that already hold the mapped value are not rewritten
+		self.assertIsNone(mapper.get("Sales - JP", "Surabaya"))
+
+	def test_backfill_resumes_from_cursor_and_rebuilds_summary(self):
+		fixtures = get_expense_fixtures()
+		fieldname, values = next(iter(fixtures.dimensions.items()))
+		posting_date = get_first_day(nowdate())
+
+		names = []
+		for _i in range(3):
+			doc = make_expense_entry(fixtures, rows=2, posting_date=posting_date)
+			for row in doc.details:
+				row.set(fieldname, None)
+			doc.insert(ignore_permissions=True)
+			doc.submit()
+			names.append(doc.name)
+
+		backfill = frappe.get_doc({
+			"doctype": "Expense Dimension Backfill",
+			"accounting_dimension": frappe.db.get_value("Accounting Dimension", {"fieldname": fieldname}),
+			"source_field": "Cost Center",
+			"company": fixtures.company,
+			"from_date": posting_date,
+			"to_date": posting_date,
+			"mappings": [
+				{"source_value": cost_center, "dimension_value": value}
+				for cost_center, value in zip(fixtures.cost_centers, values, strict=True)
+			],
+		}).insert(ignore_permissions=True)
+		backfill.db_set("status", "Queued")
+
+		# the job commits every chunk; keep everything inside the test transaction
+		with patch.object(frappe.db, "commit"), \
+			patch(BACKFILL_MODULE + ".TIME_BUDGET", -1), \
+			patch(BACKFILL_MODULE + ".enqueue_dimension_backfill") as enqueue:
+			run_dimension_backfill(backfill.name, chunk_size=2)
+
+		enqueue.assert_called_once_with(backfill.name, deduplicate=False)
+		backfill.reload()
+		self.assertEqual(backfill.status, "Running")
+		self.assertEqual(backfill.cursor, sorted(names)[1])
+		self.assertEqual((backfill.entries_processed, backfill.detail_rows_updated), (2, 4))
+
+		# the follow-up run picks up after the cursor
+		with patch.object(frappe.db, "commit"):
+			run_dimension_backfill(backfill.name, chunk_size=2)
+
+		backfill.reload()
+		self.assertEqual(backfill.status, "Completed")
+		self.assertEqual(backfill.entries_processed, 3)
+		self.assertEqual(backfill.detail_rows_updated, 6)
+		self.assertEqual(backfill.gl_entries_updated, 6)
+
+		mapping = dict(zip(fixtures.cost_centers, values, strict=True))
+		for doctype, filters in (
+			("Expense Entry Detail", {"parent": ["in", names]}),
+			("GL Entry", {"voucher_no": ["in", names], "account": ["in", fixtures.expense_accounts]}),
+		):
+			for row in frappe.get_all(doctype, filters=filters, fields=["cost_center", fieldname]):
+				self.assertEqual(row.get(fieldname), mapping[row.cost_center])
+
+		self.assertTrue(
+			frappe.db.exists(
+				"Expense Summary", {"company": fixtures.company, "posting_month": posting_date, fieldname: values[0]}
+			)
+		)
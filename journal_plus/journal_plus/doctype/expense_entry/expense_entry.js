@@ -3,6 +3,7 @@
 
 frappe.ui.form.on("Expense Entry", {
 	refresh(frm) {
+        setup_large_grid(frm);
         if (frm.doc.docstatus === 1) {
                     frm.add_custom_button("View Ledger", function() {
                         // buka report General Ledger dengan filter voucher_no & voucher_type
@@ -13,22 +14,38 @@ frappe.ui.form.on("Expense Entry", {
                         });
                     }, "View");
                 }
+        if (frm.doc.docstatus === 1 && frm.doc.status === "Posting") {
+            frm.dashboard.set_headline(__("Ledger entries are being posted in the background."), "orange");
+        }
+        if (frm.doc.docstatus === 1 && frm.doc.status === "Failed") {
+            frm.dashboard.set_headline(__("Posting to the ledger failed, see the Error Log."), "red");
+            frm.add_custom_button(__("Retry Posting"), () => {
+                frappe.call({
+                    method: "journal_plus.journal_plus.doctype.expense_entry.expense_entry.retry_gl_posting",
+                    args: { name: frm.doc.name },
+                    freeze: true,
+                }).then(() => frm.reload_doc());
+            });
+        }
 	},
-    cost_center(frm){
-        if (!frm.doc.cost_center) return;
-        (frm.doc.details || []).forEach(row => {
-            if (!row.cost_center) {
-                frappe.model.set_value(row.doctype, row.name, 'cost_center', frm.doc.cost_center);
-            }
+    onload(frm) {
+        frappe.realtime.off("journal_plus_gl_posting");
+        frappe.realtime.on("journal_plus_gl_posting", (data) => {
+            if (data.name !== frm.doc.name) return;
+            frappe.show_alert({
+                message: data.status === "Submitted"
+                    ? __("{0} posted to the ledger", [data.name])
+                    : __("Posting {0} to the ledger failed", [data.name]),
+                indicator: data.status === "Submitted" ? "green" : "red",
+            });
+            frm.reload_doc();
         });
     },
+    cost_center(frm){
+        propagate_header_value(frm, 'cost_center');
+    },
     project(frm){
-        if (!frm.doc.project) return;
-        (frm.doc.details || []).forEach(row => {
-            if (!row.project) {
-                frappe.model.set_value(row.doctype, row.name, 'project', frm.doc.project);
-            }
-        });
+        propagate_header_value(frm, 'project');
     },
     setup(frm) {
         frm.set_query("expense_account", 'details', () => {
@@ -40,6 +57,12 @@ frappe.ui.form.on("Expense Entry", {
 				]
 			}
 		});
+        frm.set_query("expense_label", 'details', () => {
+			return {
+				query: "journal_plus.journal_plus.doctype.expense_label.expense_label.expense_label_query",
+				filters: { company: frm.doc.company }
+			}
+		});
         frm.set_query("cost_center", 'details', () => {
 			return {
 				filters: [
@@ -64,22 +87,95 @@ frappe.ui.form.on("Expense Entry", {
     
 });
 
+// detail tables above this size only render a small window of rows at a time
+const LARGE_GRID_ROWS = 300;
+const LARGE_GRID_PAGE_LENGTH = 20;
+
+// Fill `fieldname` on every detail row that has none and redraw the grid once.
+// Rows are written directly instead of through frappe.model.set_value, which
+// would fire triggers and a grid refresh per row; validate fills the same
+// blanks on the server.
+function propagate_header_value(frm, fieldname) {
+    const value = frm.doc[fieldname];
+    if (!value) return;
+
+    let changed = 0;
+    (frm.doc.details || []).forEach(row => {
+        if (!row[fieldname]) {
+            row[fieldname] = value;
+            changed++;
+        }
+    });
+    if (changed) {
+        frm.dirty();
+        frm.refresh_field('details');
+    }
+}
+
+// Large table mode: render the detail grid a short page at a time so the DOM
+// stays small however many rows the entry has.
+// This is not a virtualised (scroll-windowed) grid: Frappe's Grid has no hook
+// for rendering rows on scroll, and replacing its renderer would break row
+// editing, the grid form and other apps' grid events. Paging through the Grid's
+// own pagination keeps at most LARGE_GRID_PAGE_LENGTH rows in the DOM instead,
+// at the cost of paging rather than scrolling through the lines.
+function setup_large_grid(frm) {
+    const grid = frm.fields_dict.details && frm.fields_dict.details.grid;
+    if (!grid || !grid.grid_pagination) return;
+
+    const large = (frm.doc.details || []).length > LARGE_GRID_ROWS;
+    if (large === !!frm.__large_grid) return;
+    frm.__large_grid = large;
+
+    const pagination = grid.grid_pagination;
+    pagination.page_length = large ? LARGE_GRID_PAGE_LENGTH : 50;
+    pagination.update_page_numbers && pagination.update_page_numbers();
+    pagination.go_to_page(1);
+    if (large) {
+        frm.dashboard.add_comment(
+            __('Large table mode: {0} detail lines, shown {1} at a time.', [frm.doc.details.length, LARGE_GRID_PAGE_LENGTH]),
+            'blue',
+            true
+        );
+    }
+}
+
+// rows whose expense_label changed, resolved together in one server call
+const pending_label_rows = new Set();
+
+const resolve_expense_accounts = frappe.utils.debounce((frm) => {
+    const rows = Array.from(pending_label_rows)
+        .map(cdn => locals["Expense Entry Detail"][cdn])
+        .filter(row => row && row.expense_label);
+    pending_label_rows.clear();
+    if (!rows.length) return;
+
+    frappe.call({
+        method: "journal_plus.journal_plus.doctype.expense_label.expense_label.get_expense_accounts",
+        args: {
+            pairs: rows.map(row => [row.expense_label, frm.doc.company])
+        }
+    }).then(r => {
+        const missing = [];
+        (r.message || []).forEach((res, i) => {
+            const row = rows[i];
+            row.expense_account = res.account || '';
+            if (!res.account) missing.push(row.idx);
+        });
+        frm.dirty();
+        frm.refresh_field('details');
+        if (missing.length) {
+            frappe.msgprint(__('No expense account found for this company in the selected Expense Label (rows {0}).', [missing.join(', ')]));
+        }
+    });
+}, 150);
+
 frappe.ui.form.on("Expense Entry Detail", {
     expense_label(frm, cdt, cdn){
         const row = locals[cdt][cdn];
-        // console.log(row);
-        const company = frm.doc.company;
-        frappe.db.get_doc('Expense Label', row.expense_label).then(doc => {
-            const accountRow = doc.accounts.find(a => a.company === company);
-            console.log(accountRow);
-            if (accountRow && accountRow.account) {
-                frappe.model.set_value(cdt, cdn, 'expense_account', accountRow.account);
-            } else {
-                alert('No expense account found for this company in the selected Expense Label.');
-            }
-        }).catch(() => {
-            frappe.model.set_value(cdt, cdn, 'expense_account', '');
-        });
+        if (!row.expense_label) return;
+        pending_label_rows.add(cdn);
+        resolve_expense_accounts(frm);
     },
     details_add(frm, cdt, cdn){
         const row = locals[cdt][cdn];
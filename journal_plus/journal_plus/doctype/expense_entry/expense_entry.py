@@ -1,15 +1,29 @@
 # journal_plus/journal_plus/doctype/expense_entry/expense_entry.py
 
+import hashlib
+
 import frappe
 from frappe.model.document import Document
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 from frappe import _
 
-from erpnext.accounts.general_ledger import make_gl_entries
+from erpnext.accounts.general_ledger import make_gl_entries, make_reverse_gl_entries
 from erpnext.controllers.accounts_controller import AccountsController  # path sesuai versi kamu
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
     get_accounting_dimensions,
+    get_checks_for_pl_and_bs_accounts,
+)
+
+from journal_plus.journal_plus.doctype.expense_label.expense_label import (
+    get_label_account_map,
+    record_recent_expense_labels,
 )
+from journal_plus.journal_plus.doctype.journal_plus_settings.journal_plus_settings import get_settings
+from journal_plus.journal_plus.doctype.expense_summary.expense_summary import update_expense_summary
+from journal_plus.budget import gl_budget_checked, validate_expense_budget
+from journal_plus.instrumentation import PostingProfiler
+from journal_plus.posting_context import get_posting_context
+from journal_plus.money import MoneyEngine, get_exchange_rate
 
 def _to_decimal(val):
     """
@@ -20,46 +34,242 @@ def _to_decimal(val):
     except Exception:
         return Decimal("0.0")
 
-def _float_safe(d: Decimal) -> float:
+GL_POSTING_SAVEPOINT = "journal_plus_gl_posting"
+
+# header fields copied onto detail rows that leave them empty
+HEADER_DEFAULT_FIELDS = ("cost_center", "project")
+
+# GL Entry fields that make two detail lines postable as one consolidated entry,
+# together with every accounting dimension.
+GL_GROUP_FIELDS = ("account", "party_type", "party", "cost_center", "project")
+
+
+def get_gl_group_key(gl_entry, dimensions=()):
     """
-    Quantize decimal to 2 places (for currency) and return float.
+    Short deterministic key of a GL entry's account, party, cost center,
+    project and accounting dimensions.
     """
-    return float(d.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    values = [gl_entry.get(f) or "" for f in GL_GROUP_FIELDS]
+    values.extend(gl_entry.get(dim) or "" for dim in dimensions)
+    return hashlib.sha1("\x1f".join(map(str, values)).encode()).hexdigest()[:12]
+
+
+class DimensionResolver:
+    """
+    Accounting dimension filler compiled once per posting.
+    Holds the dimension fieldnames and the parent's default values, so each
+    GL entry is filled without re-reading the dimension list or probing the parent.
+    Row has priority over parent.
+    """
+
+    __slots__ = ("defaults", "fieldnames")
+
+    def __init__(self, doc, dimensions=None):
+        if dimensions is None:
+            dimensions = get_accounting_dimensions()
+        self.fieldnames = tuple(dimensions)
+        self.defaults = {
+            dim: getattr(doc, dim) for dim in self.fieldnames if getattr(doc, dim, None)
+        }
+
+    def apply(self, gl_entry, row):
+        defaults = self.defaults
+        for dim in self.fieldnames:
+            value = getattr(row, dim, None)
+            if value:
+                gl_entry[dim] = value
+            elif dim in defaults:
+                gl_entry[dim] = defaults[dim]
+
 
 def apply_accounting_dimensions(gl_entry, row, doc):
     """
     Copy accounting dimensions from row or parent doc to GL Entry.
-    Row has priority over parent.
+    Row has priority over parent. Prefer a DimensionResolver when filling many entries.
     """
-    for dim in get_accounting_dimensions():
-        if hasattr(row, dim) and getattr(row, dim):
-            gl_entry[dim] = getattr(row, dim)
-        elif hasattr(doc, dim) and getattr(doc, dim):
-            gl_entry[dim] = getattr(doc, dim)
+    DimensionResolver(doc).apply(gl_entry, row)
 
 
-def validate_mandatory_accounting_dimensions(doc):
-    dimensions = get_accounting_dimensions()
+def get_account_details(accounts):
+    """
+    Return {account: frappe._dict(root_type=..., account_currency=...)} for the given accounts.
+    Accounts not seen yet in this request are loaded with a single query and
+    kept in frappe.flags, so repeated validations reuse them.
+    """
+    if frappe.flags.journal_plus_account_details is None:
+        frappe.flags.journal_plus_account_details = {}
+
+    cache = frappe.flags.journal_plus_account_details
+    missing = [a for a in set(accounts) if a and a not in cache]
+    if missing:
+        for acc in frappe.get_all(
+            "Account",
+            filters={"name": ["in", missing]},
+            fields=["name", "root_type", "account_currency"],
+        ):
+            cache[acc.name] = acc
+
+    return {a: cache[a] for a in accounts if a in cache}
+
+
+class AccountCurrencyConverter:
+    """
+    Amounts in each account's own currency for one posting.
+    Account currencies come from the prefetched account details and the rate of
+    each distinct currency to the company currency is resolved once.
+    """
+
+    __slots__ = ("_currencies", "account_details", "company_currency", "context", "currency", "doc_rate", "posting_date")
+
+    def __init__(self, context, account_details, currency, company_currency, doc_rate, posting_date):
+        self.context = context
+        self.account_details = account_details
+        self.currency = currency
+        self.company_currency = company_currency
+        self.doc_rate = doc_rate
+        self.posting_date = posting_date
+        self._currencies = {}
+
+    def get(self, account, doc_amount, company_amount):
+        """
+        (account_currency, exchange_rate, MoneyEngine, amount in account currency minor units)
+        for an amount given in document and company currency.
+        """
+        details = self.account_details.get(account)
+        account_currency = (details and details.account_currency) or self.company_currency
+        rate, money = self._get_currency(account_currency)
+
+        if account_currency == self.currency:
+            amount = money.to_minor(doc_amount)
+        elif account_currency == self.company_currency:
+            amount = money.to_minor(company_amount)
+        else:
+            amount = money.convert(company_amount, 1 / rate)
+        return account_currency, rate, money, amount
+
+    def _get_currency(self, account_currency):
+        if account_currency not in self._currencies:
+            if account_currency == self.company_currency:
+                rate = 1.0
+            elif account_currency == self.currency:
+                rate = self.doc_rate
+            else:
+                rate = get_exchange_rate(account_currency, self.company_currency, self.posting_date)
+            self._currencies[account_currency] = (
+                rate,
+                MoneyEngine(account_currency, self.context.get_precision(account_currency)),
+            )
+        return self._currencies[account_currency]
+
+
+def normalize_reference(reference):
+    return "".join(str(reference or "").split()).upper() or None
+
+
+def get_duplicate_fingerprint(company, payment_to, currency, total, precision=None):
+    """
+    Compact key of company, payee and amount (in minor units) used to find likely
+    duplicates with one indexed lookup; the posting date window and references
+    are checked against the few rows sharing it.
+    """
+    payee = " ".join(str(payment_to or "").split()).lower()
+    amount = MoneyEngine(currency, precision).to_minor(total)
+    key = "\x1f".join((company or "", payee, currency or "", str(amount)))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def find_duplicate_expense_entries(doc, date_window):
+    """
+    Names of draft or submitted Expense Entries that look like a duplicate of `doc`:
+    same fingerprint and a shared payment or line reference. Without a reference
+    same payee and amount is a normal repeat expense, not a duplicate.
+    """
+    references = doc.get_references()
+    if not references:
+        return []
+
+    posting_date = frappe.utils.getdate(doc.posting_date or frappe.utils.nowdate())
+    candidates = frappe.get_all(
+        "Expense Entry",
+        filters={
+            "duplicate_fingerprint": doc.duplicate_fingerprint,
+            "posting_date": [
+                "between",
+                [frappe.utils.add_days(posting_date, -date_window), frappe.utils.add_days(posting_date, date_window)],
+            ],
+            "docstatus": ["<", 2],
+            "name": ["!=", doc.name or ""],
+        },
+        fields=["name", "payment_reference"],
+        limit=20,
+    )
+    if not candidates:
+        return []
+
+    line_references = {}
+    for parent, reference in frappe.get_all(
+        "Expense Entry Detail",
+        filters={
+            "parenttype": "Expense Entry",
+            "parent": ["in", [c.name for c in candidates]],
+            "reference": ["is", "set"],
+        },
+        fields=["parent", "reference"],
+        as_list=True,
+    ):
+        line_references.setdefault(parent, set()).add(normalize_reference(reference))
+
+    duplicates = []
+    for candidate in candidates:
+        candidate_references = line_references.get(candidate.name, set())
+        candidate_references.add(normalize_reference(candidate.payment_reference))
+        candidate_references.discard(None)
+
+        if references & candidate_references:
+            duplicates.append(candidate.name)
+    return duplicates
+
+
+def get_mandatory_pl_dimensions(company):
+    """
+    Fieldnames of the accounting dimensions marked mandatory for P&L in `company`.
+    Backed by ERPNext's request-cached dimension defaults (one query).
+    """
+    return {
+        d.fieldname
+        for d in get_checks_for_pl_and_bs_accounts()
+        if d.mandatory_for_pl and d.company == company
+    }
+
+
+def validate_mandatory_accounting_dimensions(doc, context=None):
+    """
+    Ensure every P&L detail row carries the mandatory accounting dimensions.
+    Account and dimension metadata is prefetched up front (or taken from the
+    PostingContext when given), rows are checked in memory.
+    """
+    dimensions = context.dimensions if context else get_accounting_dimensions()
     if not dimensions:
         return
 
-    for idx, row in enumerate(doc.details or [], start=1):
+    mandatory = context.mandatory_pl_dimensions if context else get_mandatory_pl_dimensions(doc.company)
+    mandatory = [dim for dim in dimensions if dim in mandatory]
+    if not mandatory:
+        return
+
+    rows = doc.details or []
+    account_details = get_account_details([row.get("expense_account") for row in rows])
+
+    for idx, row in enumerate(rows, start=1):
         account = row.get("expense_account")
         if not account:
             continue
 
-        root_type = frappe.db.get_value("Account", account, "root_type")
-        if root_type != "Expense":
+        details = account_details.get(account)
+        if not details or details.root_type != "Expense":
             continue  # hanya enforce untuk P&L
 
-        for dim in dimensions:
-            mandatory = frappe.db.exists(
-                "Accounting Dimension Default",
-                {"parent": dim, "mandatory_for_pl": 1},
-            )
-            if not mandatory:
-                continue
-
+        for dim in mandatory:
             value = getattr(row, dim, None) or getattr(doc, dim, None)
             if not value:
                 frappe.throw(
@@ -81,36 +291,137 @@ class ExpenseEntry(AccountsController):
         Validate custom fields: compute total and qty from details.
         Then call parent validate (if exists) for further checks.
         """
-        total = Decimal("0.0")
-        qty = 0
-
-        for idx, row in enumerate(getattr(self, "details", []) or [], start=1):
-            amt_dec = _to_decimal(row.get("amount"))
-            if amt_dec < 0:
-                frappe.throw(_(
-                    "Amount must be non-negative for row {0} (account: {1})"
-                ).format(idx, row.get("expense_account", "")))
-            total += amt_dec
-            qty += 1
-
-        # Set fields
-        try:
-            self.total = float(total)
-        except Exception:
-            self.total = total
-        self.qty = qty
+        profiler = PostingProfiler(self, "validate")
+
+        with profiler.phase("label_accounts"):
+            self.set_expense_accounts_from_labels()
+            self.set_header_defaults()
+
+        if self.company:
+            company_currency = self.get_posting_context().default_currency
+            self.currency = self.currency or company_currency
+            self.exchange_rate = self.get_exchange_rate_to_company_currency(
+                company_currency, self.posting_date or frappe.utils.nowdate()
+            )
+
+        if self.docstatus == 0:
+            self.status = "Draft"
+
+        with profiler.phase("totals"):
+            total = Decimal("0.0")
+            qty = 0
+
+            for idx, row in enumerate(getattr(self, "details", []) or [], start=1):
+                amt_dec = _to_decimal(row.get("amount"))
+                if amt_dec < 0:
+                    frappe.throw(_(
+                        "Amount must be non-negative for row {0} (account: {1})"
+                    ).format(idx, row.get("expense_account", "")))
+                total += amt_dec
+                qty += 1
+
+            # Set fields
+            try:
+                self.total = float(total)
+            except Exception:
+                self.total = total
+            self.qty = qty
+
+        with profiler.phase("duplicate_check"):
+            self.set_duplicate_fingerprint()
+            self.check_duplicate()
 
         # Call parent validate if available
-        try:
-            super(ExpenseEntry, self).validate()
-        except AttributeError:
-            pass
+        with profiler.phase("accounts_controller"):
+            try:
+                super(ExpenseEntry, self).validate()
+            except AttributeError:
+                pass
+
+        profiler.save()
+
+    def set_duplicate_fingerprint(self):
+        precision = self.get_posting_context().get_precision(self.currency) if self.company else None
+        self.duplicate_fingerprint = get_duplicate_fingerprint(
+            self.company, self.payment_to, self.currency, self.total, precision
+        )
+
+    def get_references(self):
+        references = {normalize_reference(self.payment_reference)}
+        references.update(normalize_reference(row.get("reference")) for row in self.get("details") or [])
+        references.discard(None)
+        return references
+
+    def check_duplicate(self):
+        """
+        Warn about (or block, per Journal Plus Settings) another live Expense Entry
+        with the same fingerprint, a posting date inside the window and a shared
+        payment or line reference.
+        """
+        settings = get_settings()
+        mode = settings.duplicate_check or "Warn"
+        if mode == "Disabled" or not self.payment_to or not self.total:
+            return
+
+        duplicates = find_duplicate_expense_entries(
+            self, frappe.utils.cint(settings.duplicate_date_window)
+        )
+        if not duplicates:
+            return
+
+        message = _("Possible duplicate of {0}: same payee and amount with a shared payment or line reference, within {1} days.").format(
+            ", ".join(frappe.utils.get_link_to_form(self.doctype, name) for name in duplicates),
+            frappe.utils.cint(settings.duplicate_date_window),
+        )
+        if mode == "Block":
+            frappe.throw(message, title=_("Duplicate Expense"))
+        frappe.msgprint(message, title=_("Duplicate Expense"), indicator="orange", alert=True)
+
+    def set_header_defaults(self):
+        """
+        Copy the header cost center and project onto detail rows that have none,
+        so rows stay complete however the form filled them.
+        """
+        for fieldname in HEADER_DEFAULT_FIELDS:
+            value = self.get(fieldname)
+            if not value:
+                continue
+            for row in self.get("details") or []:
+                if not row.get(fieldname):
+                    row.set(fieldname, value)
+
+    def on_update(self):
+        # ranks the labels this user picks first in the Expense Label search
+        record_recent_expense_labels(
+            self.company, [row.get("expense_label") for row in self.get("details") or []]
+        )
+
+    def set_expense_accounts_from_labels(self):
+        """
+        Fill expense_account on rows that only carry an expense_label,
+        using the cached label -> account map of the document's company.
+        """
+        rows = [
+            row for row in (getattr(self, "details", []) or [])
+            if row.get("expense_label") and not row.get("expense_account")
+        ]
+        if not rows or not self.company:
+            return
+
+        label_accounts = get_label_account_map(self.company)
+        for row in rows:
+            account = label_accounts.get(row.expense_label)
+            if account:
+                row.expense_account = account
 
     def before_cancel(self):
         """
         Prepare for cancellation: define ignore linked doctypes so GL entries
         do not block cancel. Then call parent logic if any.
         """
+        if self.status == "Posting":
+            frappe.throw(_("{0} is still being posted to the ledger, try again once it finishes").format(self.name))
+
         self.ignore_linked_doctypes = ("GL Entry", "Stock Ledger Entry")
 
         try:
@@ -121,51 +432,174 @@ class ExpenseEntry(AccountsController):
     def on_submit(self):
         """
         When submitted: post GL entries (custom logic) and mark posted_to_gl.
+        Entries with more lines than the background posting threshold are marked
+        "Posting" and posted by a background job instead.
         Then call parent on_submit if exists.
         """
-        validate_mandatory_accounting_dimensions(self)
+        profiler = PostingProfiler(self, "on_submit")
+        context = self.get_posting_context()
+
+        with profiler.phase("dimension_validation"):
+            validate_mandatory_accounting_dimensions(self, context)
+
+        with profiler.phase("permission_check"):
+            if not context.has_posting_permission(self):
+                frappe.throw(_("You don’t have permission to post this document"))
 
-        if not frappe.has_permission(self.doctype, ptype="write", doc=self):
-            frappe.throw(_("You don’t have permission to post this document"))
+        with profiler.phase("budget_check"):
+            validate_expense_budget(self, context)
 
-        gl_map = self._build_gl_map_for_expense()
-        gl_map_dicts = [frappe._dict(e) for e in gl_map]
+        if self.should_post_in_background():
+            self.enqueue_gl_posting()
+        else:
+            self.post_to_gl(profiler)
+
+        with profiler.phase("accounts_controller"):
+            try:
+                super(ExpenseEntry, self).on_submit()
+            except AttributeError:
+                pass
+
+        profiler.save()
+
+    def get_posting_context(self):
+        """
+        Shared posting defaults of this document's company and posting date.
+        """
+        company = self.company or frappe.get_cached_value("Global Defaults", None, "default_company")
+        if not company:
+            frappe.throw(_("Company is required"))
+        return get_posting_context(company, self.posting_date)
+
+    def get_exchange_rate_to_company_currency(self, company_currency, posting_date):
+        """
+        Rate of the document currency to the company currency: 1 for the company
+        currency, the entered rate if any, else the Currency Exchange rate of the date.
+        """
+        if not self.currency or self.currency == company_currency:
+            return 1.0
+
+        rate = frappe.utils.flt(self.get("exchange_rate"))
+        if rate and rate != 1:
+            return rate
+        return get_exchange_rate(self.currency, company_currency, posting_date)
+
+    def should_post_in_background(self):
+        threshold = frappe.utils.cint(get_settings().async_posting_threshold)
+        return bool(threshold) and len(self.get("details") or []) > threshold
+
+    def enqueue_gl_posting(self):
+        self.db_set({"status": "Posting", "posted_to_gl": 0})
+        frappe.enqueue(
+            process_gl_posting,
+            queue="long",
+            timeout=3600,
+            job_id=f"expense_entry_gl_posting::{self.name}",
+            deduplicate=True,
+            enqueue_after_commit=True,
+            name=self.name,
+        )
+        frappe.msgprint(
+            _("{0} has {1} lines; its ledger entries are being posted in the background.").format(
+                self.name, len(self.details)
+            ),
+            alert=True,
+        )
+
+    def post_to_gl(self, profiler):
+        """
+        Build and post the GL map, then update allocations, the expense summary and status.
+        """
+        with profiler.phase("build_gl_map"):
+            gl_map = self._build_gl_map_for_expense()
+            gl_map_dicts = [frappe._dict(e) for e in gl_map]
 
         # Post GL entries. Use merge_entries=False to prevent internal aggregation.
-        make_gl_entries(gl_map_dicts, cancel=False, adv_adj=False, merge_entries=False)
+        # the whole document was budget-checked on submit
+        with profiler.phase("make_gl_entries"), gl_budget_checked():
+            make_gl_entries(gl_map_dicts, cancel=False, adv_adj=False, merge_entries=False)
+            self._save_gl_allocations()
 
-        # Mark as posted
-        if self.meta.has_field("posted_to_gl"):
-            self.db_set("posted_to_gl", 1)
+        with profiler.phase("expense_summary"):
+            update_expense_summary(self, 1)
 
-        try:
-            super(ExpenseEntry, self).on_submit()
-        except AttributeError:
-            pass
+        # Mark as posted
+        self.db_set({"posted_to_gl": 1, "status": "Submitted"})
 
     def on_cancel(self):
         """
         When cancelled: reverse GL entries (post reversal), optionally set status,
         then call parent on_cancel logic.
+
+        The reversal is built from the GL Entry rows already posted for this voucher,
+        not from a rebuilt map, so it always mirrors what was posted even if
+        accounts, labels or defaults changed after submit.
         """
-        gl_map = self._build_gl_map_for_expense()
-        gl_map_dicts = [frappe._dict(e) for e in gl_map]
+        profiler = PostingProfiler(self, "on_cancel")
+
+        # a failed background posting left nothing to reverse
+        if self.status != "Failed":
+            with profiler.phase("make_reverse_gl_entries"):
+                make_reverse_gl_entries(voucher_type=self.doctype, voucher_no=self.name, adv_adj=False)
+
+            with profiler.phase("expense_summary"):
+                update_expense_summary(self, -1)
 
-        make_gl_entries(gl_map_dicts, cancel=True, adv_adj=False, merge_entries=False)
+        self.db_set({"status": "Cancelled", "posted_to_gl": 0})
 
-        # Optionally update status field if available
-        if self.meta.has_field("status"):
-            self.db_set("status", "Cancelled")
+        with profiler.phase("accounts_controller"):
+            try:
+                super(ExpenseEntry, self).on_cancel()
+            except AttributeError:
+                pass
+
+        profiler.save()
+
+    def on_trash(self):
+        frappe.db.delete("Expense GL Allocation", {"expense_entry": self.name})
+        # a deleted entry no longer answers its idempotency key; a retry may create it again
+        frappe.db.delete("Expense Ingestion Key", {"expense_entry": self.name})
 
         try:
-            super(ExpenseEntry, self).on_cancel()
+            super().on_trash()
         except AttributeError:
             pass
 
+    def _save_gl_allocations(self):
+        """
+        Record which detail rows went into each consolidated GL entry.
+        Only set when the company posts Expense Entries consolidated.
+        """
+        allocations = self.flags.gl_allocations
+        if not allocations:
+            return
+
+        now = frappe.utils.now_datetime()
+        user = frappe.session.user
+        frappe.db.bulk_insert(
+            "Expense GL Allocation",
+            [
+                "name", "creation", "modified", "owner", "modified_by",
+                "expense_entry", "expense_entry_detail", "gl_key", "account", "amount",
+            ],
+            [
+                (
+                    frappe.generate_hash(length=10), now, now, user, user,
+                    self.name, a.expense_entry_detail, a.gl_key, a.account, a.amount,
+                )
+                for a in allocations
+            ],
+        )
+
     def _build_gl_map_for_expense(self):
         """
         Build the list of dict maps for GL posting based on detail lines.
         Debit per detail, one credit combining total.
+        Amounts are kept in integer minor units (see MoneyEngine) until written out.
+
+        When the company has `consolidate_expense_gl_entries` set, rows sharing account,
+        party, cost center, project and dimensions are posted as one debit entry and
+        the row-level split is left in self.flags.gl_allocations.
         """
         details = getattr(self, "details", []) or []
         if not details:
@@ -175,21 +609,10 @@ class ExpenseEntry(AccountsController):
         if not credit_account:
             frappe.throw(_("Account Paid From is required"))
 
-        # Company fallback logic
-        company = self.company or frappe.get_cached_value(
-            "Global Defaults", None, "default_company"
-        )
-        if not company:
-            frappe.throw(_("Company is required"))
-
-        # Currency and exchange rate
-        currency = (
-            self.currency
-            or frappe.get_cached_value("Company", company, "default_currency")
-            or getattr(self, "company_currency", None)
-            or "IDR"
-        )
-        exchange_rate = getattr(self, "exchange_rate", 1.0)
+        # Company (with Global Defaults fallback), currency defaults, rounding
+        # account and dimensions come from the shared posting context
+        context = self.get_posting_context()
+        company = context.company
 
         posting_date = (
             getattr(self, "posting_date", None)
@@ -197,20 +620,46 @@ class ExpenseEntry(AccountsController):
             or frappe.utils.nowdate()
         )
 
+        # Document currency -> company currency; GL debit/credit are in company currency
+        company_currency = context.default_currency or getattr(self, "company_currency", None) or "IDR"
+        currency = self.currency or company_currency
+        doc_rate = self.get_exchange_rate_to_company_currency(company_currency, posting_date)
+        doc_money = MoneyEngine(currency, context.get_precision(currency))
+        money = MoneyEngine(company_currency, context.get_precision(company_currency))
+
+        # every distinct account's currency in one query, every distinct rate once
+        account_details = get_account_details([credit_account, *(row.get("expense_account") for row in details)])
+        account_amounts = AccountCurrencyConverter(
+            context, account_details, currency, company_currency, doc_rate, posting_date
+        )
+
+        dimensions = DimensionResolver(self, context.dimensions)
+
+        consolidate = context.consolidate
+        groups = {}
+        allocations = []
+
         gl_entries = []
-        total_debit = Decimal("0.0")
+        doc_total = 0
 
         for idx, row in enumerate(details, start=1):
             acct = row.get("expense_account")
             if not acct:
                 frappe.throw(_("Expense Account is required for row {0}").format(idx))
 
-            amt_dec = _to_decimal(row.get("amount"))
-            if amt_dec <= 0:
+            doc_amount = doc_money.to_minor(row.get("amount"))
+            if doc_amount <= 0:
                 frappe.throw(_("Amount must be positive for row {0}").format(idx))
-
-            total_debit += amt_dec
-            amt = _float_safe(amt_dec)
+            doc_total += doc_amount
+
+            if currency == company_currency:
+                amount = doc_amount
+            else:
+                amount = money.convert(doc_money.to_float(doc_amount), doc_rate)
+            amt = money.to_float(money.add_debit(amount))
+            account_currency, account_rate, account_money, account_amount = account_amounts.get(
+                acct, doc_money.to_float(doc_amount), amt
+            )
 
             # Use unique marker in 'against' or 'remarks' to avoid merging
             marker = row.get("name") or str(idx)
@@ -225,10 +674,10 @@ class ExpenseEntry(AccountsController):
                 "against": f"{credit_account}|{marker}",
                 "debit": amt,
                 "credit": 0.0,
-                "debit_in_account_currency": amt,
+                "debit_in_account_currency": account_money.to_float(account_amount),
                 "credit_in_account_currency": 0.0,
-                "account_currency": currency,
-                "exchange_rate": exchange_rate,
+                "account_currency": account_currency,
+                "exchange_rate": account_rate,
                 "company": company,
                 "voucher_type": self.doctype,
                 "voucher_no": self.name,
@@ -238,12 +687,35 @@ class ExpenseEntry(AccountsController):
                 "is_opening": getattr(self, "is_opening", 0)
             }
 
-            apply_accounting_dimensions(gl_entry, row, self)
+            dimensions.apply(gl_entry, row)
+
+            if consolidate:
+                key = get_gl_group_key(gl_entry, dimensions.fieldnames)
+                allocations.append(frappe._dict(
+                    expense_entry_detail=marker, gl_key=key, account=acct, amount=amt
+                ))
+                if key in groups:
+                    groups[key][1] += amount
+                    groups[key][2] += account_amount
+                    continue
+
+                gl_entry["against"] = credit_account
+                gl_entry["remarks"] = f"{self.remarks or _('Expense')} [{key}]"
+                groups[key] = [gl_entry, amount, account_amount, account_money]
+
             gl_entries.append(gl_entry)
 
+        for gl_entry, amount, account_amount, account_money in groups.values():
+            gl_entry["debit"] = money.to_float(amount)
+            gl_entry["debit_in_account_currency"] = account_money.to_float(account_amount)
+
+        self.flags.gl_allocations = allocations
 
         # Single credit entry
-        total_credit_amt = _float_safe(total_debit)
+        total_credit_amt = money.to_float(money.add_credit(money.debit))
+        credit_currency, credit_rate, credit_money, credit_amount = account_amounts.get(
+            credit_account, doc_money.to_float(doc_total), total_credit_amt
+        )
         # Combine detail expense accounts for the 'against' field
         against_list = ", ".join([row.get("expense_account", "") for row in details])
 
@@ -256,9 +728,9 @@ class ExpenseEntry(AccountsController):
             "debit": 0.0,
             "credit": total_credit_amt,
             "debit_in_account_currency": 0.0,
-            "credit_in_account_currency": total_credit_amt,
-            "account_currency": currency,
-            "exchange_rate": exchange_rate,
+            "credit_in_account_currency": credit_money.to_float(credit_amount),
+            "account_currency": credit_currency,
+            "exchange_rate": credit_rate,
             "company": company,
             "voucher_type": self.doctype,
             "voucher_no": self.name,
@@ -268,60 +740,96 @@ class ExpenseEntry(AccountsController):
             "is_opening": getattr(self, "is_opening", 0)
         }
 
-        apply_accounting_dimensions(credit_entry, self, self)
+        dimensions.apply(credit_entry, self)
         gl_entries.append(credit_entry)
 
-        # Validate balance
-        total_debit_dec = sum(_to_decimal(e.get("debit", 0)) for e in gl_entries)
-        total_credit_dec = sum(_to_decimal(e.get("credit", 0)) for e in gl_entries)
-
-        if total_debit_dec != total_credit_dec:
-            diff = (total_debit_dec - total_credit_dec).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            rounding_account = (
-                getattr(self, "rounding_account", None)
-                or frappe.get_cached_value("Company", company, "rounding_account")
-            )
+        # Validate balance from the running totals
+        diff = money.difference
+        if diff:
+            rounding_account = getattr(self, "rounding_account", None) or context.rounding_account
             if rounding_account:
-                # Create adjustment entry
-                if diff > 0:
-                    adj = {
-                        "posting_date": posting_date,
-                        "account": rounding_account,
-                        "debit": 0.0,
-                        "credit": _float_safe(diff),
-                        "debit_in_account_currency": 0.0,
-                        "credit_in_account_currency": _float_safe(diff),
-                        "account_currency": currency,
-                        "exchange_rate": exchange_rate,
-                        "company": company,
-                        "voucher_type": self.doctype,
-                        "voucher_no": self.name,
-                        "remarks": _("Rounding adjustment"),
-                    }
-                else:
-                    adj = {
-                        "posting_date": posting_date,
-                        "account": rounding_account,
-                        "debit": _float_safe(-diff),
-                        "credit": 0.0,
-                        "debit_in_account_currency": _float_safe(-diff),
-                        "credit_in_account_currency": 0.0,
-                        "account_currency": currency,
-                        "exchange_rate": exchange_rate,
-                        "company": company,
-                        "voucher_type": self.doctype,
-                        "voucher_no": self.name,
-                        "remarks": _("Rounding adjustment"),
-                    }
-                gl_entries.append(adj)
-
-                # recalc
-                total_debit_dec = sum(_to_decimal(e.get("debit", 0)) for e in gl_entries)
-                total_credit_dec = sum(_to_decimal(e.get("credit", 0)) for e in gl_entries)
-
-        if total_debit_dec != total_credit_dec:
+                # Create adjustment entry on the short side
+                debit = money.to_float(money.add_debit(-diff)) if diff < 0 else 0.0
+                credit = money.to_float(money.add_credit(diff)) if diff > 0 else 0.0
+                gl_entries.append({
+                    "posting_date": posting_date,
+                    "account": rounding_account,
+                    "debit": debit,
+                    "credit": credit,
+                    "debit_in_account_currency": debit,
+                    "credit_in_account_currency": credit,
+                    "account_currency": company_currency,
+                    "exchange_rate": 1.0,
+                    "company": company,
+                    "voucher_type": self.doctype,
+                    "voucher_no": self.name,
+                    "remarks": _("Rounding adjustment"),
+                    "cost_center": context.round_off_cost_center or self.cost_center,
+                })
+
+        if money.difference:
             frappe.throw(_(
                 "GL entries are not balanced: debit {0} != credit {1}"
-            ).format(total_debit_dec, total_credit_dec))
+            ).format(money.to_float(money.debit), money.to_float(money.credit)))
 
         return gl_entries
+
+
+def process_gl_posting(name):
+    """
+    Background job: post the GL entries of a submitted Expense Entry left in "Posting".
+
+    The budget is checked again against what is booked by now. Everything the
+    posting wrote is rolled back on failure; the document is then marked
+    "Failed" so it can be retried (or cancelled). The submitting user gets
+    a realtime update either way.
+    """
+    doc = frappe.get_doc("Expense Entry", name)
+    if doc.docstatus != 1 or doc.status != "Posting":
+        return
+
+    profiler = PostingProfiler(doc, "gl_posting")
+    frappe.db.savepoint(GL_POSTING_SAVEPOINT)
+    try:
+        # budgets may have been used up since the entry was submitted
+        with profiler.phase("budget_check"):
+            validate_expense_budget(doc, doc.get_posting_context())
+        doc.post_to_gl(profiler)
+        profiler.save()
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback(save_point=GL_POSTING_SAVEPOINT)
+        doc.log_error(_("Expense Entry GL posting failed"))
+        doc.db_set({"status": "Failed", "posted_to_gl": 0})
+        frappe.db.commit()
+    finally:
+        frappe.clear_messages()
+
+    frappe.publish_realtime(
+        "journal_plus_gl_posting",
+        {"name": doc.name, "status": doc.status},
+        user=frappe.session.user,
+    )
+    doc.notify_update()
+
+
+@frappe.whitelist()
+def retry_gl_posting(name):
+    """
+    Re-queue the GL posting of an Expense Entry whose background posting failed.
+    """
+    doc = frappe.get_doc("Expense Entry", name)
+    doc.check_permission("submit")
+    if doc.docstatus != 1 or doc.status != "Failed":
+        frappe.throw(_("Only submitted Expense Entries whose posting failed can be retried"))
+
+    doc.enqueue_gl_posting()
+
+
+def on_doctype_update():
+    # keyset pagination of the Expense Register walks (company, posting_date, name)
+    frappe.db.add_index("Expense Entry", ["company", "posting_date", "name"])
+    # bank clearance loads uncleared entries of one paying account by date
+    frappe.db.add_index("Expense Entry", ["account_paid_from", "clearance_date", "posting_date"])
+    # duplicate detection looks up one fingerprint inside a posting date window
+    frappe.db.add_index("Expense Entry", ["duplicate_fingerprint", "posting_date"])
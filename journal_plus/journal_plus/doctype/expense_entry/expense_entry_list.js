@@ -0,0 +1,70 @@
+// Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Expense Entry"] = {
+	add_fields: ["status"],
+	onload(listview) {
+		listview.page.add_menu_item(__("Clear from Bank Statement"), () => {
+			const dialog = new frappe.ui.Dialog({
+				title: __("Clear from Bank Statement"),
+				fields: [
+					{
+						fieldname: "account",
+						label: __("Bank Account"),
+						fieldtype: "Link",
+						options: "Account",
+						reqd: 1,
+						get_query: () => ({ filters: { account_type: ["in", ["Bank", "Cash"]], is_group: 0 } }),
+					},
+					{
+						fieldname: "file_url",
+						label: __("Statement (CSV or XLSX)"),
+						fieldtype: "Attach",
+						reqd: 1,
+						description: __("Columns: date, reference, amount (or withdrawal), description"),
+					},
+					{
+						fieldname: "date_window",
+						label: __("Date Window (days)"),
+						fieldtype: "Int",
+						default: 3,
+					},
+				],
+				primary_action_label: __("Match"),
+				primary_action(values) {
+					frappe
+						.call("journal_plus.bank_clearance.start_expense_clearance", values)
+						.then(() => {
+							dialog.hide();
+							frappe.show_alert(__("Bank statement matching queued"));
+						});
+				},
+			});
+			dialog.show();
+		});
+
+		frappe.realtime.off("journal_plus_expense_clearance");
+		frappe.realtime.on("journal_plus_expense_clearance", (summary) => {
+			frappe.msgprint(
+				__("{0} of {1} statement lines matched. {2} left for review.", [
+					summary.matched,
+					summary.lines,
+					summary.unmatched,
+				])
+			);
+			listview.refresh();
+		});
+	},
+	get_indicator(doc) {
+		const colors = {
+			Draft: "red",
+			Posting: "orange",
+			Submitted: "blue",
+			Failed: "red",
+			Cancelled: "grey",
+		};
+		if (doc.status && colors[doc.status]) {
+			return [__(doc.status), colors[doc.status], "status,=," + doc.status];
+		}
+	},
+};
@@ -2,13 +2,39 @@
 # See license.txt
 
 import frappe
-import unittest
-from frappe.tests.utils import FrappeTestCase
+from unittest.mock import patch
 from frappe.utils import nowdate
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
 
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import (
+	DimensionResolver,
+	apply_accounting_dimensions,
+	find_duplicate_expense_entries,
+	get_account_details,
+	process_gl_posting,
+	validate_mandatory_accounting_dimensions,
+)
 
-class TestExpenseEntry(FrappeTestCase):
+from journal_plus.posting_context import clear_posting_context
+from journal_plus.tests.fixtures import make_expense_entry
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+EXPENSE_ENTRY_MODULE = "journal_plus.journal_plus.doctype.expense_entry.expense_entry"
+
+
+def _legacy_apply_accounting_dimensions(gl_entry, row, doc, dimensions):
+	"""
+	Frozen copy of the per-entry loop DimensionResolver replaced; the reference
+	its output is checked against.
+	"""
+	for dim in dimensions:
+		if hasattr(row, dim) and getattr(row, dim):
+			gl_entry[dim] = getattr(row, dim)
+		elif hasattr(doc, dim) and getattr(doc, dim):
+			gl_entry[dim] = getattr(doc, dim)
+
+
+class TestExpenseEntry(ExpenseEntryTestCase):
 	"""
 	Unit test untuk Expense Entry:
 	- submit -> GL entries dibuat dan seimbang
@@ -16,76 +42,15 @@ class TestExpenseEntry(FrappeTestCase):
 	- delete -> jika setting aktif, GL entries dihapus
 	"""
 
-	def setUp(self):
-		# Use existing default company
-		self.company = frappe.defaults.get_user_default("Company") or frappe.get_default("company")
-		if not self.company:
-			# nothing to test against — skip
-			self.skipTest("No default company configured on this site. Skipping ExpenseEntry tests.")
-
-		# Try to find existing ledger accounts in this company:
-		asset_accounts = frappe.get_all(
-			"Account",
-			filters={"company": self.company, "root_type": "Asset", "is_group": 0},
-			pluck="name",
-			limit_page_length=1,
-		)
-		expense_accounts = frappe.get_all(
-			"Account",
-			filters={"company": self.company, "root_type": "Expense", "is_group": 0},
-			pluck="name",
-			limit_page_length=1,
-		)
-
-		# If either account type missing, skip tests with instructive message.
-		if not asset_accounts or not expense_accounts:
-			msg = (
-				"Site does not have required ledger accounts for testing.\n"
-				"Need at least one Asset (ledger) account and one Expense (ledger) account "
-				"in company `{company}`.\n"
-				"Found Asset accounts: {asset}, Expense accounts: {expense}.\n"
-				"Please create chart of accounts or run tests on a site with COA."
-			).format(company=self.company, asset=asset_accounts, expense=expense_accounts)
-			self.skipTest(msg)
-
-		self.cash_account = asset_accounts[0]
-		self.expense_account = expense_accounts[0]
-
-	def tearDown(self):
-		# keep the DB clean for other tests
-		frappe.db.rollback()
-
-	def _make_expense_entry(self, amount=100000):
-		"""
-		Create (but do not submit) an Expense Entry doc with a single detail line.
+	def _set_consolidation(self, value):
 		"""
-		doc = frappe.get_doc({
-			"doctype": "Expense Entry",
-			"company": self.company,
-			"posting_date": nowdate(),
-			"remarks": "Testing Expense Entry",
-			"account_paid_from": self.cash_account,
-			"details": [
-				{
-					"expense_label": None,
-					"expense_account": self.expense_account,
-					"amount": amount,
-					"remarks": "Biaya perjalanan test"
-				}
-			]
-		})
-		doc.insert(ignore_permissions=True)
-		return doc
-
-	def _get_gl_entries(self, voucher_type, voucher_no):
+		Toggle consolidated GL posting for the test company.
 		"""
-		Helper to retrieve GL Entry rows for a voucher.
-		"""
-		return frappe.get_all(
-			"GL Entry",
-			filters={"voucher_type": voucher_type, "voucher_no": voucher_no},
-			fields=["account", "debit", "credit", "is_cancelled"]
-		)
+		frappe.db.set_value("Company", self.company, "consolidate_expense_gl_entries", value)
+		frappe.clear_document_cache("Company", self.company)
+		clear_posting_context()
+		self.addCleanup(clear_posting_context)
+		self.addCleanup(frappe.clear_document_cache, "Company", self.company)
 
 	def test_expense_entry_submission_creates_gl_entries(self):
 		expense = self._make_expense_entry(50000)
@@ -132,3 +97,354 @@ class TestExpenseEntry(FrappeTestCase):
 
 		gl_entries = self._get_gl_entries("Expense Entry", name)
 		self.assertFalse(gl_entries, "GL Entries not deleted after document deletion with setting enabled")
+
+	def test_dimension_validation_query_count_is_flat(self):
+		dimension = "jp_test_dimension"
+		checks = [frappe._dict(fieldname=dimension, company=self.company, mandatory_for_pl=1)]
+
+		def count_for(rows):
+			doc = self._make_unsaved_expense_entry(rows)
+			setattr(doc, dimension, "Test Value")
+			frappe.flags.journal_plus_account_details = None
+			return self._count_queries(lambda: validate_mandatory_accounting_dimensions(doc))
+
+		with patch(EXPENSE_ENTRY_MODULE + ".get_accounting_dimensions", return_value=[dimension]), \
+			patch(EXPENSE_ENTRY_MODULE + ".get_checks_for_pl_and_bs_accounts", return_value=checks):
+			single_row = count_for(1)
+			many_rows = count_for(400)
+
+		self.assertEqual(single_row, many_rows, "Dimension validation queries grow with row count")
+
+	def test_missing_mandatory_dimension_names_row(self):
+		dimension = "jp_test_dimension"
+		checks = [frappe._dict(fieldname=dimension, company=self.company, mandatory_for_pl=1)]
+		doc = self._make_unsaved_expense_entry(3)
+		for row in doc.details[:2]:
+			setattr(row, dimension, "Test Value")
+
+		with patch(EXPENSE_ENTRY_MODULE + ".get_accounting_dimensions", return_value=[dimension]), \
+			patch(EXPENSE_ENTRY_MODULE + ".get_checks_for_pl_and_bs_accounts", return_value=checks):
+			with self.assertRaisesRegex(frappe.ValidationError, "row #3"):
+				validate_mandatory_accounting_dimensions(doc)
+
+	def test_dimension_resolver_matches_apply_accounting_dimensions(self):
+		dimensions = ["jp_dim_a", "jp_dim_b", "jp_dim_c"]
+		doc = frappe._dict(jp_dim_a="Parent A", jp_dim_b="Parent B", jp_dim_c="")
+		rows = [
+			frappe._dict(),
+			frappe._dict(jp_dim_a="Row A"),
+			frappe._dict(jp_dim_b="", jp_dim_c="Row C"),
+			frappe._dict(jp_dim_a=None, jp_dim_b="Row B", jp_dim_c=""),
+		]
+
+		with patch(EXPENSE_ENTRY_MODULE + ".get_accounting_dimensions", return_value=dimensions):
+			resolver = DimensionResolver(doc)
+			for row in rows:
+				expected, actual, single = {}, {}, {}
+				_legacy_apply_accounting_dimensions(expected, row, doc, dimensions)
+				resolver.apply(actual, row)
+				apply_accounting_dimensions(single, row, doc)
+				self.assertEqual(actual, expected)
+				self.assertEqual(single, expected)
+
+		self.assertEqual(resolver.fieldnames, tuple(dimensions))
+
+	def test_cancel_reverses_posted_entries_after_master_data_changed(self):
+		other_account = self.fixtures.expense_accounts[1]
+
+		expense = self._make_expense_entry(80000)
+		expense.submit()
+
+		# the row is remapped and the amount edited behind the voucher's back
+		frappe.db.set_value(
+			"Expense Entry Detail",
+			expense.details[0].name,
+			{"expense_account": other_account, "amount": 1},
+		)
+		expense.reload()
+		expense.cancel()
+
+		gl_entries = self._get_gl_entries(expense.doctype, expense.name)
+		self.assertNotIn(other_account, {e.account for e in gl_entries})
+
+		net = {}
+		for e in gl_entries:
+			net[e.account] = net.get(e.account, Decimal("0")) + Decimal(str(e.debit or 0)) - Decimal(str(e.credit or 0))
+		self.assertTrue(all(v == 0 for v in net.values()), f"Reversal does not offset the posted entries: {net}")
+
+	def test_cancel_does_not_rebuild_gl_map(self):
+		expense = self._make_expense_entry(30000)
+		expense.submit()
+
+		with patch.object(type(expense), "_build_gl_map_for_expense") as build:
+			expense.cancel()
+
+		build.assert_not_called()
+		self.assertTrue(all(e.is_cancelled for e in self._get_gl_entries(expense.doctype, expense.name)))
+
+	def test_gl_map_balances_with_fractional_rows(self):
+		doc = self._make_unsaved_expense_entry(rows=1000, amount=0.015)
+		gl_map = doc._build_gl_map_for_expense()
+
+		total_debit = sum(Decimal(str(e["debit"])) for e in gl_map)
+		total_credit = sum(Decimal(str(e["credit"])) for e in gl_map)
+		self.assertEqual(total_debit, total_credit)
+		self.assertEqual(gl_map[-1]["credit"], 20.0)
+
+	def test_consolidated_posting_groups_rows_and_keeps_allocations(self):
+		self._set_consolidation(1)
+
+		expense = self._make_unsaved_expense_entry(rows=5, amount=100)
+		expense.insert(ignore_permissions=True)
+		expense.submit()
+
+		gl_entries = self._get_gl_entries(expense.doctype, expense.name)
+		debit_rows = [e for e in gl_entries if e.account == self.expense_account]
+		self.assertEqual(len(debit_rows), 1)
+		self.assertEqual(debit_rows[0].debit, 500)
+
+		allocations = frappe.get_all(
+			"Expense GL Allocation",
+			filters={"expense_entry": expense.name},
+			fields=["expense_entry_detail", "gl_key", "amount"],
+		)
+		self.assertEqual(
+			sorted(a.expense_entry_detail for a in allocations), sorted(d.name for d in expense.details)
+		)
+		self.assertEqual(len({a.gl_key for a in allocations}), 1)
+
+		expense.cancel()
+		gl_entries = self._get_gl_entries(expense.doctype, expense.name)
+		self.assertTrue(all(e.is_cancelled for e in gl_entries))
+		total_debit = sum(Decimal(str(e.debit or 0)) for e in gl_entries)
+		total_credit = sum(Decimal(str(e.credit or 0)) for e in gl_entries)
+		self.assertEqual(total_debit, total_credit)
+
+	def test_large_entry_is_posted_in_background(self):
+		expense = self._make_background_posted_entry()
+
+		self.assertEqual(frappe.db.get_value("Expense Entry", expense.name, "status"), "Posting")
+		self.assertFalse(self._get_gl_entries("Expense Entry", expense.name))
+
+		with patch.object(frappe.db, "commit"):
+			process_gl_posting(expense.name)
+
+		self.assertEqual(
+			frappe.db.get_value("Expense Entry", expense.name, ["status", "posted_to_gl"]),
+			("Submitted", 1),
+		)
+		gl_entries = self._get_gl_entries("Expense Entry", expense.name)
+		self.assertEqual(sum(e.debit for e in gl_entries), 1000)
+		self.assertEqual(sum(e.credit for e in gl_entries), 1000)
+
+	def test_failed_background_posting_rolls_back(self):
+		expense = self._make_background_posted_entry()
+
+		with patch.object(frappe.db, "commit"), \
+			patch(EXPENSE_ENTRY_MODULE + ".update_expense_summary", side_effect=Exception("boom")):
+			process_gl_posting(expense.name)
+
+		self.assertEqual(
+			frappe.db.get_value("Expense Entry", expense.name, ["status", "posted_to_gl"]),
+			("Failed", 0),
+		)
+		self.assertFalse(self._get_gl_entries("Expense Entry", expense.name))
+		self.assertFalse(frappe.db.exists("Expense GL Allocation", {"expense_entry": expense.name}))
+
+		expense.reload()
+		expense.cancel()
+		self.assertEqual(frappe.db.get_value("Expense Entry", expense.name, "status"), "Cancelled")
+
+	def _seed_foreign_account(self):
+		"""
+		Register a fake expense account in a foreign currency in the request account cache.
+		Returns (account, currency, company_currency).
+		"""
+		company_currency = frappe.get_cached_value("Company", self.company, "default_currency")
+		foreign = "EUR" if company_currency == "USD" else "USD"
+		account = "JP Foreign Expense - Test"
+		get_account_details([self.expense_account, self.cash_account])
+		frappe.flags.journal_plus_account_details[account] = frappe._dict(
+			name=account, root_type="Expense", account_currency=foreign
+		)
+		self.addCleanup(setattr, frappe.flags, "journal_plus_account_details", None)
+		return account, foreign, company_currency
+
+	def test_mixed_currency_lines_post_account_currency_amounts(self):
+		account, foreign, company_currency = self._seed_foreign_account()
+		doc = self._make_unsaved_expense_entry(rows=3000, amount=1000.5)
+		for row in doc.details[::2]:
+			row.expense_account = account
+
+		with patch(EXPENSE_ENTRY_MODULE + ".get_exchange_rate", return_value=15000.0) as rate:
+			gl_map = doc._build_gl_map_for_expense()
+
+		rate.assert_called_once_with(foreign, company_currency, doc.posting_date)
+		self.assertEqual(
+			sum(Decimal(str(e["debit"])) for e in gl_map),
+			sum(Decimal(str(e["credit"])) for e in gl_map),
+		)
+
+		foreign_entries = [e for e in gl_map if e["account"] == account]
+		self.assertEqual(len(foreign_entries), 1500)
+		for entry in foreign_entries:
+			self.assertEqual(entry["account_currency"], foreign)
+			self.assertEqual(entry["exchange_rate"], 15000.0)
+			self.assertEqual(entry["debit"], 1000.5)
+			self.assertEqual(entry["debit_in_account_currency"], 0.07)
+
+		local_entries = [e for e in gl_map if e["account"] == self.expense_account]
+		self.assertTrue(all(e["debit_in_account_currency"] == e["debit"] == 1000.5 for e in local_entries))
+
+	def test_foreign_document_currency_converts_to_company_currency(self):
+		account, foreign, _company_currency = self._seed_foreign_account()
+		doc = self._make_unsaved_expense_entry(rows=2000, amount=10.25)
+		doc.currency = foreign
+		doc.exchange_rate = 2
+		for row in doc.details[::2]:
+			row.expense_account = account
+
+		gl_map = doc._build_gl_map_for_expense()
+
+		foreign_entries = [e for e in gl_map if e["account"] == account]
+		self.assertTrue(all(e["debit_in_account_currency"] == 10.25 and e["debit"] == 20.5 for e in foreign_entries))
+		self.assertTrue(all(e["exchange_rate"] == 2 for e in foreign_entries))
+
+		local_entries = [e for e in gl_map if e["account"] == self.expense_account]
+		self.assertTrue(all(e["debit_in_account_currency"] == e["debit"] == 20.5 for e in local_entries))
+
+		credit = gl_map[-1]
+		self.assertEqual(credit["account"], self.cash_account)
+		self.assertEqual(credit["credit"], 41000.0)
+
+	def test_mixed_currency_query_count_is_flat(self):
+		account, _foreign, _company_currency = self._seed_foreign_account()
+
+		def count_for(rows):
+			doc = self._make_unsaved_expense_entry(rows=rows)
+			for row in doc.details[::2]:
+				row.expense_account = account
+			return self._count_queries(doc._build_gl_map_for_expense)
+
+		with patch(EXPENSE_ENTRY_MODULE + ".get_exchange_rate", return_value=15000.0):
+			self.assertEqual(count_for(2), count_for(4000))
+
+	def _make_receipt(self, payment_reference=None, line_reference=None, amount=125000):
+		expense = self._make_unsaved_expense_entry(amount=amount)
+		expense.payment_to = "Toko  Sumber Makmur"
+		expense.payment_reference = payment_reference
+		expense.details[0].reference = line_reference
+		return expense
+
+	def test_duplicate_receipt_is_blocked(self):
+		self._set_settings(duplicate_check="Block", duplicate_date_window=3)
+		self._make_receipt(payment_reference="INV-001").insert(ignore_permissions=True)
+
+		duplicate = self._make_receipt(payment_reference="inv 001")
+		duplicate.payment_to = "toko sumber makmur"
+		duplicate.posting_date = frappe.utils.add_days(nowdate(), 2)
+		with self.assertRaisesRegex(frappe.ValidationError, "Possible duplicate"):
+			duplicate.insert(ignore_permissions=True)
+
+		# a line reference counts as well
+		with self.assertRaisesRegex(frappe.ValidationError, "Possible duplicate"):
+			self._make_receipt(line_reference="INV-001").insert(ignore_permissions=True)
+
+		# another receipt, amount or date outside the window is not a duplicate
+		self._make_receipt(payment_reference="INV-002").insert(ignore_permissions=True)
+		self._make_receipt(payment_reference="INV-001", amount=125001).insert(ignore_permissions=True)
+		later = self._make_receipt(payment_reference="INV-001")
+		later.posting_date = frappe.utils.add_days(nowdate(), 10)
+		later.insert(ignore_permissions=True)
+
+	def test_repeat_expense_without_reference_is_not_a_duplicate(self):
+		self._set_settings(duplicate_check="Block", duplicate_date_window=3)
+		self._make_receipt().insert(ignore_permissions=True)
+
+		# same payee and amount, e.g. a recurring template run, without any reference
+		repeat = self._make_receipt()
+		repeat.insert(ignore_permissions=True)
+		self.assertFalse(find_duplicate_expense_entries(repeat, 3))
+
+		# a reference on one side only is not shared either
+		self._make_receipt(payment_reference="INV-777").insert(ignore_permissions=True)
+
+	def test_duplicate_lookup_is_a_single_query(self):
+		self._set_settings(duplicate_check="Warn", duplicate_date_window=3)
+		expense = self._make_receipt(payment_reference="INV-404")
+		expense.set_duplicate_fingerprint()
+
+		self.assertEqual(len(expense.duplicate_fingerprint), 16)
+		self.assertEqual(self._count_queries(lambda: find_duplicate_expense_entries(expense, 3)), 1)
+
+	def test_validate_fills_header_cost_center_and_project(self):
+		cost_center = frappe.get_cached_value("Company", self.company, "cost_center")
+		if not cost_center:
+			self.skipTest("Company has no default cost center")
+
+		expense = self._make_unsaved_expense_entry(rows=1000)
+		expense.cost_center = cost_center
+		expense.details[0].cost_center = "Explicit - Row"
+		expense.set_header_defaults()
+
+		self.assertEqual(expense.details[0].cost_center, "Explicit - Row")
+		self.assertTrue(all(row.cost_center == cost_center for row in expense.details[1:]))
+		self.assertTrue(all(not row.project for row in expense.details))
+
+	def _posting_key(self, entry):
+		return (entry["account"], entry["cost_center"], *(entry.get(f) for f in self.fixtures.dimensions))
+
+	def test_multi_row_multi_dimension_rows_keep_their_posting_keys(self):
+		expense = make_expense_entry(self.fixtures, rows=6, amount=250)
+		expense.insert(ignore_permissions=True)
+		expense.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			filters={"voucher_type": expense.doctype, "voucher_no": expense.name, "debit": [">", 0]},
+			fields=["account", "cost_center", "debit", *self.fixtures.dimensions],
+		)
+		self.assertEqual(
+			sorted(self._posting_key(e) for e in gl_entries),
+			sorted(self._posting_key(row.as_dict()) for row in expense.details),
+		)
+		self.assertTrue(all(e.debit == 250 for e in gl_entries))
+
+	def test_consolidation_keeps_rows_with_other_dimensions_apart(self):
+		self._set_consolidation(1)
+
+		# rows repeat every 6 lines (3 accounts x 2 cost centers x 2 dimension values)
+		expense = make_expense_entry(self.fixtures, rows=12, amount=100)
+		gl_map = expense._build_gl_map_for_expense()
+
+		debit_rows = [e for e in gl_map if e["debit"]]
+		self.assertEqual(len(debit_rows), 6)
+		self.assertEqual(len({self._posting_key(e) for e in debit_rows}), 6)
+		self.assertTrue(all(e["debit"] == 200 for e in debit_rows))
+		self.assertEqual(len(expense.flags.gl_allocations), 12)
+
+	def test_converted_rows_are_rounded_half_up_per_row(self):
+		foreign = "EUR" if self.fixtures.currency == "USD" else "USD"
+		expense = make_expense_entry(self.fixtures, rows=3, amount=1.01, currency=foreign, exchange_rate=1.5)
+		precision = expense.get_posting_context().get_precision(self.fixtures.currency)
+		row_amount = float(
+			(Decimal("1.01") * Decimal("1.5")).quantize(Decimal(1).scaleb(-precision), rounding=ROUND_HALF_UP)
+		)
+
+		gl_map = expense._build_gl_map_for_expense()
+
+		self.assertTrue(all(e["debit"] == row_amount for e in gl_map if e["debit"]))
+		self.assertEqual(gl_map[-1]["credit"], round(row_amount * 3, precision))
+		self.assertEqual(
+			sum(Decimal(str(e["debit"])) for e in gl_map), sum(Decimal(str(e["credit"])) for e in gl_map)
+		)
+
+	def test_large_multi_dimension_entry_builds_balanced_gl_map(self):
+		rows = 10000
+		expense = make_expense_entry(self.fixtures, rows=rows, amount=12.34)
+		gl_map = expense._build_gl_map_for_expense()
+
+		self.assertEqual(len(gl_map), rows + 1)
+		self.assertEqual(gl_map[-1]["credit"], 123400)
+		for fieldname, values in self.fixtures.dimensions.items():
+			self.assertEqual({e[fieldname] for e in gl_map[:-1]}, set(values))
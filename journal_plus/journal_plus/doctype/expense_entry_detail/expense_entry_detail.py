@@ -1,9 +1,19 @@
 # Copyright (c) 2025, PT Sopwer Teknologi Indonesia and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class ExpenseEntryDetail(Document):
 	pass
+
+
+def on_doctype_update():
+	# each filter column is paired with parent so the join to Expense Entry is index-only
+	frappe.db.add_index("Expense Entry Detail", ["expense_account", "parent"])
+	frappe.db.add_index("Expense Entry Detail", ["cost_center", "parent"])
+	frappe.db.add_index("Expense Entry Detail", ["project", "parent"])
+	frappe.db.add_index("Expense Entry Detail", ["expense_label", "parent"])
+	frappe.db.add_index("Expense Entry Detail", ["reference(100)"], "reference_index")
+	frappe.db.add_index("Expense Entry Detail", ["parent", "idx"])
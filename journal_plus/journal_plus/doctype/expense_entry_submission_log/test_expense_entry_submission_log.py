@@ -0,0 +1,35 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+import frappe
+
+from journal_plus.bulk_submit import _create_logs, process_bulk_submission
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestExpenseEntrySubmissionLog(ExpenseEntryTestCase):
+	def test_bulk_submission_records_per_document_results(self):
+		good = self._make_expense_entry(1000)
+		payload = self._make_unsaved_expense_entry(2).as_dict()
+		bad = self._make_unsaved_expense_entry(1).as_dict()
+		bad["account_paid_from"] = None
+
+		_create_logs("jp-test-batch", [good.name, payload, bad])
+		summary = process_bulk_submission("jp-test-batch", chunk_size=2)
+
+		self.assertEqual((summary["submitted"], summary["failed"]), (2, 1))
+		self.assertIn("docs_per_second", summary)
+		self.assertEqual(frappe.db.get_value("Expense Entry", good.name, "docstatus"), 1)
+
+		logs = frappe.get_all(
+			"Expense Entry Submission Log",
+			filters={"batch_id": "jp-test-batch"},
+			fields=["status", "expense_entry"],
+			order_by="item_no asc",
+		)
+		self.assertEqual([l.status for l in logs], ["Submitted", "Submitted", "Failed"])
+		self.assertTrue(logs[1].expense_entry)
+
+		# resuming only retries what did not go through
+		again = process_bulk_submission("jp-test-batch")
+		self.assertEqual((again["submitted"], again["failed"]), (0, 1))
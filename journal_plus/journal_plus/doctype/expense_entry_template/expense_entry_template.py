@@ -0,0 +1,100 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_days, add_months, getdate
+
+from journal_plus.journal_plus.doctype.expense_label.expense_label import get_label_account_map
+
+FREQUENCY_DAYS = {"Daily": 1, "Weekly": 7}
+FREQUENCY_MONTHS = {"Monthly": 1, "Quarterly": 3, "Half-yearly": 6, "Yearly": 12}
+
+# header fields copied from the template onto every generated Expense Entry
+HEADER_FIELDS = (
+	"title", "company", "currency", "payment_to", "mode_of_payment",
+	"account_paid_from", "project", "cost_center", "remarks",
+)
+DETAIL_FIELDS = (
+	"expense_label", "expense_account", "amount", "description",
+	"project", "cost_center", "remarks", "reference",
+)
+
+
+class ExpenseEntryTemplate(Document):
+	def validate(self):
+		if self.end_date and getdate(self.end_date) < getdate(self.start_date):
+			frappe.throw(_("End Date cannot be before Start Date"))
+
+		if self.is_new() or not self.last_generated_on or not self.next_date:
+			self.next_date = self.start_date
+		elif self.has_value_changed("frequency") or self.has_value_changed("start_date"):
+			self.next_date = get_next_schedule_date(self.start_date, self.frequency, self.last_generated_on)
+
+		self.set_expense_accounts_from_labels()
+
+	def set_expense_accounts_from_labels(self):
+		label_accounts = get_label_account_map(self.company)
+		for row in self.details:
+			if row.expense_label and not row.expense_account:
+				row.expense_account = label_accounts.get(row.expense_label)
+
+
+def get_next_schedule_date(start_date, frequency, after):
+	"""
+	First schedule date strictly after `after`. Month based schedules are counted
+	from start_date so a template starting on the 31st keeps month ends.
+	"""
+	start_date, after = getdate(start_date), getdate(after)
+	if after < start_date:
+		return start_date
+
+	if frequency in FREQUENCY_DAYS:
+		step = FREQUENCY_DAYS[frequency]
+		periods = (after - start_date).days // step + 1
+		return add_days(start_date, periods * step)
+
+	step = FREQUENCY_MONTHS.get(frequency)
+	if not step:
+		frappe.throw(_("Unsupported frequency {0}").format(frequency))
+
+	periods = ((after.year - start_date.year) * 12 + after.month - start_date.month) // step
+	next_date = getdate(add_months(start_date, periods * step))
+	while next_date <= after:
+		periods += 1
+		next_date = getdate(add_months(start_date, periods * step))
+	return next_date
+
+
+def get_due_dates(template, upto):
+	"""
+	Every schedule date of `template` from its next_date up to `upto` (inclusive),
+	bounded by end_date.
+	"""
+	upto = getdate(upto)
+	if template.end_date:
+		upto = min(upto, getdate(template.end_date))
+
+	dates = []
+	current = getdate(template.next_date or template.start_date)
+	while current <= upto:
+		dates.append(current)
+		current = get_next_schedule_date(template.start_date, template.frequency, current)
+	return dates
+
+
+def make_expense_entry(template, rows, posting_date, dimensions=()):
+	"""
+	Unsaved Expense Entry for one schedule date of `template`.
+	`template` and `rows` may be documents or plain dicts (as fetched in bulk by the
+	scheduler); `dimensions` are the accounting dimension fieldnames to carry over.
+	"""
+	return frappe.get_doc({
+		"doctype": "Expense Entry",
+		**{f: template.get(f) for f in (*HEADER_FIELDS, *dimensions)},
+		"expense_entry_template": template.get("name"),
+		"posting_date": posting_date,
+		"required_date": posting_date,
+		"details": [{f: row.get(f) for f in (*DETAIL_FIELDS, *dimensions)} for row in rows],
+	})
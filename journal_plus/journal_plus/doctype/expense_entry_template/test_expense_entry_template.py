@@ -0,0 +1,65 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from journal_plus.journal_plus.doctype.expense_entry_template.expense_entry_template import (
+	get_due_dates,
+	get_next_schedule_date,
+)
+from journal_plus.tasks import generate_recurring_expense_entries
+
+TASKS_MODULE = "journal_plus.tasks"
+
+
+class TestExpenseEntryTemplate(FrappeTestCase):
+	def test_monthly_schedule_keeps_month_end(self):
+		start = "2026-01-31"
+		self.assertEqual(get_next_schedule_date(start, "Monthly", "2026-01-31"), getdate("2026-02-28"))
+		self.assertEqual(get_next_schedule_date(start, "Monthly", "2026-02-28"), getdate("2026-03-31"))
+		self.assertEqual(get_next_schedule_date(start, "Quarterly", "2026-01-31"), getdate("2026-04-30"))
+
+	def test_day_based_schedule(self):
+		self.assertEqual(get_next_schedule_date("2026-03-02", "Weekly", "2026-03-02"), getdate("2026-03-09"))
+		self.assertEqual(get_next_schedule_date("2026-03-02", "Weekly", "2026-03-05"), getdate("2026-03-09"))
+		self.assertEqual(get_next_schedule_date("2026-03-02", "Daily", "2026-02-01"), getdate("2026-03-02"))
+
+	def test_due_dates_catch_up_until_end_date(self):
+		template = frappe._dict(
+			start_date="2026-01-15",
+			next_date="2026-01-15",
+			end_date="2026-03-20",
+			frequency="Monthly",
+		)
+		self.assertEqual(
+			get_due_dates(template, "2026-06-30"),
+			[getdate("2026-01-15"), getdate("2026-02-15"), getdate("2026-03-15")],
+		)
+		self.assertEqual(get_due_dates(template, "2026-01-14"), [])
+
+	def test_scheduler_run_bounds_lookups_and_queues_one_follow_up(self):
+		templates = [
+			frappe._dict(name="_T-1", next_date="2026-03-01", start_date="2026-01-01"),
+			frappe._dict(name="_T-2", next_date="2026-02-01", start_date="2026-01-01"),
+		]
+		with patch(TASKS_MODULE + "._get_due_templates", side_effect=[templates]), \
+			patch(TASKS_MODULE + "._get_template_rows", return_value={}), \
+			patch(TASKS_MODULE + "._prefetch_accounts"), \
+			patch(TASKS_MODULE + "._generate_for_template", return_value=0), \
+			patch(TASKS_MODULE + "._get_generated_dates", return_value={}) as generated_dates, \
+			patch(TASKS_MODULE + ".TIME_BUDGET", -1), \
+			patch.object(frappe.db, "commit"), \
+			patch(TASKS_MODULE + ".frappe.enqueue") as enqueue:
+			generate_recurring_expense_entries(upto="2026-03-31")
+
+		# only the dates still due are read back
+		generated_dates.assert_called_once_with(["_T-1", "_T-2"], getdate("2026-02-01"), getdate("2026-03-31"))
+
+		kwargs = enqueue.call_args.kwargs
+		self.assertEqual(kwargs["job_id"], "journal_plus_recurring_expense_entries::_T-2")
+		self.assertTrue(kwargs["deduplicate"])
+		self.assertEqual((kwargs["after"], kwargs["upto"]), ("_T-2", "2026-03-31"))
@@ -0,0 +1,32 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+import frappe
+
+from journal_plus.ingestion import ingest_expense_entries
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestExpenseIngestionKey(ExpenseEntryTestCase):
+	def test_ingestion_is_idempotent_per_key(self):
+		def payload(key, amount=1000):
+			entry = self._make_unsaved_expense_entry(amount=amount).as_dict(no_default_fields=True)
+			entry["idempotency_key"] = key
+			return entry
+
+		bad = payload("jp-test-bad")
+		bad["account_paid_from"] = None
+		first = ingest_expense_entries([payload("jp-test-1"), payload("jp-test-2"), bad, payload("jp-test-1")])["results"]
+
+		self.assertEqual([r["status"] for r in first], ["created", "created", "failed", "duplicate"])
+		self.assertEqual(first[3]["expense_entry"], first[0]["expense_entry"])
+		self.assertFalse(frappe.db.exists("Expense Ingestion Key", "jp-test-bad"))
+
+		# a retried request posts nothing new; a reused key with another payload is refused
+		retry = ingest_expense_entries([payload("jp-test-2"), payload("jp-test-1", amount=5)])["results"]
+		self.assertEqual([r["status"] for r in retry], ["duplicate", "conflict"])
+		self.assertEqual(retry[0]["expense_entry"], first[1]["expense_entry"])
+		self.assertEqual(
+			frappe.db.count("Expense Entry", {"name": ["in", [first[0]["expense_entry"], first[1]["expense_entry"]]]}),
+			2,
+		)
@@ -1,9 +1,144 @@
 # Copyright (c) 2025, PT Sopwer Teknologi Indonesia and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder import functions as fn
+
+LABEL_ACCOUNT_CACHE_KEY = "journal_plus_expense_label_accounts"
+RECENT_LABELS_CACHE_KEY = "journal_plus_recent_expense_labels"
+RECENT_LABEL_LIMIT = 20
 
 
 class ExpenseLabel(Document):
-	pass
+	def on_update(self):
+		clear_label_account_cache()
+
+	def on_trash(self):
+		clear_label_account_cache()
+
+	def after_rename(self, old, new, merge=False):
+		clear_label_account_cache()
+
+
+def clear_label_account_cache():
+	frappe.cache().delete_key(LABEL_ACCOUNT_CACHE_KEY)
+
+
+def get_label_account_map(company):
+	"""
+	{expense_label: account} for one company.
+	Built from Expense Label Account in a single query and kept in the site cache
+	until an Expense Label changes.
+	"""
+	return frappe.cache().hget(
+		LABEL_ACCOUNT_CACHE_KEY, company, lambda: _load_label_account_map(company)
+	)
+
+
+def _load_label_account_map(company):
+	# first row per label wins, as the label search and the form always did
+	accounts = {}
+	for label, account in frappe.get_all(
+		"Expense Label Account",
+		filters={"parenttype": "Expense Label", "company": company},
+		fields=["parent", "account"],
+		order_by="parent, idx",
+		as_list=True,
+	):
+		accounts.setdefault(label, account)
+	return accounts
+
+
+@frappe.whitelist()
+def get_expense_accounts(pairs):
+	"""
+	Resolve many (expense_label, company) pairs in one call.
+	Returns a list of {"expense_label", "company", "account"} in the same order,
+	with account None when the label has no account for that company.
+	"""
+	frappe.has_permission("Expense Entry", "read", throw=True)
+
+	result = []
+	maps = {}
+	for pair in frappe.parse_json(pairs) or []:
+		label, company = (pair.get("expense_label"), pair.get("company")) if isinstance(pair, dict) else pair
+		if company not in maps:
+			maps[company] = get_label_account_map(company) if company else {}
+		result.append({"expense_label": label, "company": company, "account": maps[company].get(label)})
+
+	return result
+
+
+def get_recent_expense_labels(company, user=None):
+	"""
+	Expense Labels `user` last used in `company`, most recent first.
+	"""
+	return frappe.cache().hget(RECENT_LABELS_CACHE_KEY, f"{user or frappe.session.user}::{company}") or []
+
+
+def record_recent_expense_labels(company, labels, user=None):
+	"""
+	Move `labels` to the front of the user's recent list for `company`
+	(one cache read and one write, capped at RECENT_LABEL_LIMIT).
+	"""
+	labels = list(dict.fromkeys(label for label in labels if label))
+	if not company or not labels:
+		return
+
+	user = user or frappe.session.user
+	recent = labels + [label for label in get_recent_expense_labels(company, user) if label not in labels]
+	frappe.cache().hset(RECENT_LABELS_CACHE_KEY, f"{user}::{company}", recent[:RECENT_LABEL_LIMIT])
+
+
+@frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
+def expense_label_query(doctype, txt, searchfield, start, page_len, filters):
+	"""
+	Link search for Expense Label. Only labels with an account for
+	filters["company"] are returned, with the account as description: the
+	user's recently used labels first, then prefix matches, then the rest by name.
+	Served from the (company, parent, account) index of Expense Label Account.
+	"""
+	frappe.has_permission("Expense Label", "select", throw=True)
+
+	company = (filters or {}).get("company")
+	if not company:
+		return frappe.get_all(
+			"Expense Label",
+			filters={"name": ["like", f"%{txt}%"]} if txt else None,
+			order_by="name asc",
+			limit_start=start,
+			limit_page_length=page_len,
+			as_list=True,
+		)
+
+	# Expense Label Account is only ever a child of Expense Label, so the
+	# parenttype is left out and the lookup stays inside the index
+	account = frappe.qb.DocType("Expense Label Account")
+	# a label with several rows for the company resolves to its first one
+	first = frappe.qb.DocType("Expense Label Account").as_("first")
+	first_idx = (
+		frappe.qb.from_(first)
+		.select(fn.Min(first.idx))
+		.where((first.parent == account.parent) & (first.company == company))
+	)
+	query = (
+		frappe.qb.from_(account)
+		.select(account.parent, account.account)
+		.where((account.company == company) & (account.idx == first_idx))
+	)
+	if txt:
+		query = query.where(account.parent.like(f"%{txt}%"))
+
+	recent = get_recent_expense_labels(company)
+	if recent or txt:
+		rank = Case()
+		for idx, label in enumerate(recent):
+			rank = rank.when(account.parent == label, idx)
+		if txt:
+			rank = rank.when(account.parent.like(f"{txt}%"), len(recent))
+		query = query.orderby(rank.else_(len(recent) + 1))
+
+	return query.orderby(account.parent).limit(page_len).offset(start).run()
@@ -1,9 +1,85 @@
 # Copyright (c) 2025, PT Sopwer Teknologi Indonesia and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from journal_plus.journal_plus.doctype.expense_label.expense_label import (
+	RECENT_LABELS_CACHE_KEY,
+	clear_label_account_cache,
+	expense_label_query,
+	get_expense_accounts,
+	get_label_account_map,
+	record_recent_expense_labels,
+)
+from journal_plus.tests.fixtures import get_expense_fixtures
+
 
 class TestExpenseLabel(FrappeTestCase):
-	pass
+	def setUp(self):
+		self.fixtures = get_expense_fixtures()
+		self.company = self.fixtures.company
+		self.expense_accounts = self.fixtures.expense_accounts[:2]
+
+	def tearDown(self):
+		frappe.db.rollback()
+		clear_label_account_cache()
+
+	def test_label_account_cache_is_invalidated_on_save(self):
+		label = frappe.get_doc({
+			"doctype": "Expense Label",
+			"title": "_Test Cached Label",
+			"accounts": [{"company": self.company, "account": self.expense_accounts[0]}],
+		}).insert(ignore_permissions=True)
+
+		self.assertEqual(get_label_account_map(self.company).get(label.name), self.expense_accounts[0])
+
+		label.accounts[0].account = self.expense_accounts[1]
+		label.save(ignore_permissions=True)
+
+		self.assertEqual(get_label_account_map(self.company).get(label.name), self.expense_accounts[1])
+
+	def test_get_expense_accounts_resolves_pairs_in_order(self):
+		frappe.get_doc({
+			"doctype": "Expense Label",
+			"title": "_Test Batch Label",
+			"accounts": [{"company": self.company, "account": self.expense_accounts[0]}],
+		}).insert(ignore_permissions=True)
+
+		result = get_expense_accounts([
+			["_Test Batch Label", self.company],
+			{"expense_label": "_Test Missing Label", "company": self.company},
+		])
+
+		self.assertEqual([r["account"] for r in result], [self.expense_accounts[0], None])
+
+	def test_label_search_only_returns_company_labels_and_ranks_recent_first(self):
+		frappe.get_doc({"doctype": "Expense Label", "title": "_Test JP Unmapped"}).insert(ignore_permissions=True)
+		frappe.cache().hdel(RECENT_LABELS_CACHE_KEY, f"{frappe.session.user}::{self.company}")
+		self.addCleanup(frappe.cache().hdel, RECENT_LABELS_CACHE_KEY, f"{frappe.session.user}::{self.company}")
+
+		def search(txt="_Test JP"):
+			return expense_label_query("Expense Label", txt, "name", 0, 20, {"company": self.company})
+
+		results = search()
+		self.assertEqual(sorted(r[0] for r in results), sorted(self.fixtures.labels))
+		self.assertTrue(all(account == self.fixtures.labels[label] for label, account in results))
+
+		labels = sorted(self.fixtures.labels)
+		record_recent_expense_labels(self.company, [labels[-1]])
+		record_recent_expense_labels(self.company, [labels[1], None])
+		self.assertEqual([r[0] for r in search()][:2], [labels[1], labels[-1]])
+		self.assertEqual([r[0] for r in search(labels[0])], [labels[0]])
+
+	def test_label_search_shows_first_account_of_the_company(self):
+		label = frappe.get_doc({
+			"doctype": "Expense Label",
+			"title": "_Test Twice Label",
+			"accounts": [
+				{"company": self.company, "account": account} for account in reversed(self.expense_accounts)
+			],
+		}).insert(ignore_permissions=True)
+
+		results = expense_label_query("Expense Label", "_Test Twice", "name", 0, 20, {"company": self.company})
+		self.assertEqual([tuple(r) for r in results], [(label.name, self.expense_accounts[1])])
+		self.assertEqual(get_label_account_map(self.company)[label.name], self.expense_accounts[1])
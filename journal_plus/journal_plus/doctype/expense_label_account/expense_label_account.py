@@ -1,9 +1,14 @@
 # Copyright (c) 2025, PT Sopwer Teknologi Indonesia and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
 
 class ExpenseLabelAccount(Document):
 	pass
+
+
+def on_doctype_update():
+	# Expense Label link search reads the labels of one company by name
+	frappe.db.add_index("Expense Label Account", ["company", "parent", "account"])
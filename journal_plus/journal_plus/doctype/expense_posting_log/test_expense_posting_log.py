@@ -0,0 +1,40 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+import frappe
+
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestExpensePostingLog(ExpenseEntryTestCase):
+	def test_sampled_submit_records_phase_timings(self):
+		self._set_settings(enable_posting_instrumentation=1, instrumentation_sample_rate=100)
+
+		expense = self._make_expense_entry(1000)
+		expense.submit()
+
+		logs = frappe.get_all(
+			"Expense Posting Log",
+			filters={"reference_name": expense.name, "event": "on_submit"},
+			fields=["phase", "duration_ms", "query_count", "row_count"],
+		)
+		phases = {l.phase for l in logs}
+		self.assertTrue({"build_gl_map", "make_gl_entries", "total"} <= phases)
+		self.assertTrue(all(l.row_count == 1 for l in logs))
+
+	def test_unsampled_submit_records_nothing(self):
+		self._set_settings(enable_posting_instrumentation=0)
+
+		expense = self._make_expense_entry(1000)
+		expense.submit()
+
+		self.assertFalse(frappe.db.exists("Expense Posting Log", {"reference_name": expense.name}))
+
+	def test_draft_with_posting_log_can_be_deleted(self):
+		self._set_settings(enable_posting_instrumentation=1, instrumentation_sample_rate=100)
+
+		expense = self._make_expense_entry(1000)
+		self.assertTrue(frappe.db.exists("Expense Posting Log", {"reference_name": expense.name}))
+
+		frappe.delete_doc("Expense Entry", expense.name, ignore_permissions=True)
+		self.assertFalse(frappe.db.exists("Expense Entry", expense.name))
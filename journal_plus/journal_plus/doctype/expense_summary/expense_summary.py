@@ -0,0 +1,211 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+	get_accounting_dimensions,
+)
+from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder import functions as fn
+from frappe.utils import flt, get_first_day, getdate, now_datetime
+
+from journal_plus.money import MoneyEngine
+
+SUMMARY_FIELDS = ("company", "posting_month", "expense_account", "expense_label", "cost_center", "project")
+SAVEPOINT = "journal_plus_expense_summary"
+
+
+class ExpenseSummary(Document):
+	pass
+
+
+def get_summary_key(values, dimensions):
+	"""
+	Hash of the summary fields and the dimensions that hold a value. Empty
+	dimensions are left out, so adding an Accounting Dimension keeps the keys of
+	existing rows.
+	"""
+	parts = [str(values.get(f) or "") for f in SUMMARY_FIELDS]
+	parts.extend(f"{dim}={values[dim]}" for dim in sorted(dimensions) if values.get(dim))
+	return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()
+
+
+def update_expense_summary(doc, sign=1):
+	"""
+	Add (sign=1, on submit) or remove (sign=-1, on cancel) an Expense Entry's
+	lines to/from the summary. Lines are grouped in memory first, so a document
+	costs one lookup plus one write per distinct summary row.
+
+	Amounts are summed in the document currency and each group is converted once
+	to the company currency, as rebuild_expense_summary does.
+	"""
+	dimensions = get_accounting_dimensions()
+	company_currency = frappe.get_cached_value("Company", doc.company, "default_currency")
+	doc_money = MoneyEngine(doc.currency or company_currency)
+	money = MoneyEngine(company_currency)
+	rate = flt(doc.get("exchange_rate")) or 1
+	posting_month = get_first_day(doc.posting_date)
+
+	groups = {}
+	for row in doc.details or []:
+		values = {
+			"company": doc.company,
+			"posting_month": posting_month,
+			"expense_account": row.expense_account,
+			"expense_label": row.expense_label,
+			"cost_center": row.cost_center or doc.cost_center,
+			"project": row.project or doc.project,
+		}
+		for dim in dimensions:
+			values[dim] = row.get(dim) or doc.get(dim)
+
+		key = get_summary_key(values, dimensions)
+		group = groups.setdefault(key, {"values": values, "amount": 0, "lines": 0})
+		group["amount"] += doc_money.to_minor(row.amount)
+		group["lines"] += 1
+
+	if not groups:
+		return
+
+	existing = set(
+		frappe.get_all("Expense Summary", filters={"summary_key": ["in", list(groups)]}, pluck="summary_key")
+	)
+
+	for key, group in groups.items():
+		amount = sign * money.to_float(money.convert(doc_money.to_float(group["amount"]), rate))
+		lines = sign * group["lines"]
+		if key in existing or not _insert_summary(key, group["values"], amount, lines):
+			_increment_summary(key, amount, lines)
+
+
+def _insert_summary(key, values, amount, lines):
+	"""
+	Insert a new summary row; returns False if another transaction created it first.
+	"""
+	doc = frappe.get_doc({
+		"doctype": "Expense Summary",
+		"name": frappe.generate_hash(length=10),
+		**values,
+		"summary_key": key,
+		"amount": amount,
+		"line_count": lines,
+	})
+	frappe.db.savepoint(SAVEPOINT)
+	try:
+		doc.db_insert()
+	except frappe.UniqueValidationError:
+		frappe.db.rollback(save_point=SAVEPOINT)
+		return False
+	return True
+
+
+def _increment_summary(key, amount, lines):
+	summary = frappe.qb.DocType("Expense Summary")
+	(
+		frappe.qb.update(summary)
+		.set(summary.amount, summary.amount + amount)
+		.set(summary.line_count, summary.line_count + lines)
+		.set(summary.modified, now_datetime())
+		.where(summary.summary_key == key)
+	).run()
+
+
+@frappe.whitelist()
+def enqueue_rebuild(company=None):
+	frappe.only_for(("System Manager", "Accounts Manager"))
+	frappe.enqueue(rebuild_expense_summary, queue="long", timeout=7200, company=company)
+
+
+def rebuild_expense_summary(company=None, chunk_size=5000):
+	"""
+	Recompute the summary from posted Expense Entries (optionally one company).
+	Aggregation happens in the database per posting date and is folded into months here.
+	Entries in a foreign currency are summed per entry and converted with its rate,
+	exactly as update_expense_summary posts them.
+	"""
+	dimensions = get_accounting_dimensions()
+	companies = [company] if company else frappe.get_all(
+		"Expense Entry", filters={"docstatus": 1, "posted_to_gl": 1}, pluck="company", distinct=True
+	)
+
+	groups = {}
+	for name in companies:
+		_collect_summary_groups(name, dimensions, groups)
+
+	frappe.db.delete("Expense Summary", {"company": company} if company else None)
+
+	now = now_datetime()
+	user = frappe.session.user
+	fields = [
+		"name", "creation", "modified", "owner", "modified_by",
+		*SUMMARY_FIELDS, *dimensions, "summary_key", "amount", "line_count",
+	]
+	values = [
+		(
+			frappe.generate_hash(length=10), now, now, user, user,
+			*[g["values"].get(f) for f in SUMMARY_FIELDS],
+			*[g["values"].get(dim) for dim in dimensions],
+			key, g["money"].to_float(g["amount"]), g["lines"],
+		)
+		for key, g in groups.items()
+	]
+	frappe.db.bulk_insert("Expense Summary", fields, values, chunk_size=chunk_size)
+	frappe.db.commit()
+
+	return len(values)
+
+
+def _collect_summary_groups(company, dimensions, groups):
+	ee = frappe.qb.DocType("Expense Entry")
+	eed = frappe.qb.DocType("Expense Entry Detail")
+	company_currency = frappe.get_cached_value("Company", company, "default_currency")
+	foreign = fn.Coalesce(ee.currency, company_currency) != company_currency
+
+	def inherit(fieldname):
+		return fn.Coalesce(fn.NullIf(eed[fieldname], ""), ee[fieldname])
+
+	group_fields = [
+		ee.posting_date,
+		ee.currency,
+		# company-currency entries are summed across entries, foreign ones per entry
+		Case().when(foreign, ee.name).else_("").as_("voucher"),
+		Case().when(foreign, ee.exchange_rate).else_(1).as_("rate"),
+		eed.expense_account,
+		eed.expense_label,
+		inherit("cost_center").as_("cost_center"),
+		inherit("project").as_("project"),
+		*[inherit(dim).as_(dim) for dim in dimensions],
+	]
+
+	query = (
+		frappe.qb.from_(eed)
+		.inner_join(ee)
+		.on((ee.name == eed.parent) & (eed.parenttype == "Expense Entry"))
+		.select(*group_fields, fn.Sum(eed.amount).as_("amount"), fn.Count("*").as_("lines"))
+		# entries still waiting for (or failed in) async GL posting are not in
+		# the summary until they post, as in update_expense_summary
+		.where(ee.docstatus == 1)
+		.where(ee.posted_to_gl == 1)
+		.where(ee.company == company)
+		.groupby(*group_fields)
+	)
+
+	money = MoneyEngine(company_currency)
+	engines = {}
+	for row in query.run(as_dict=True):
+		values = dict(row, company=company)
+		values["posting_month"] = get_first_day(getdate(row.posting_date))
+		key = get_summary_key(values, dimensions)
+
+		currency = row.currency or company_currency
+		if currency not in engines:
+			engines[currency] = MoneyEngine(currency)
+		doc_money = engines[currency]
+		amount = money.convert(doc_money.to_float(doc_money.to_minor(row.amount)), flt(row.rate) or 1)
+
+		group = groups.setdefault(key, {"values": values, "amount": 0, "lines": 0, "money": money})
+		group["amount"] += amount
+		group["lines"] += row.lines
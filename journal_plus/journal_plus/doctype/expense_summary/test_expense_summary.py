@@ -0,0 +1,92 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import get_first_day, nowdate
+
+from journal_plus.journal_plus.doctype.expense_summary.expense_summary import (
+	get_summary_key,
+	rebuild_expense_summary,
+)
+from journal_plus.tests.fixtures import make_expense_entry
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestExpenseSummary(ExpenseEntryTestCase):
+	def test_summary_key_ignores_empty_dimensions(self):
+		values = {"company": "_Test Company", "expense_account": "Travel - _TC", "branch": "Jakarta"}
+		key = get_summary_key(values, ["branch"])
+
+		# a dimension added later does not move existing rows
+		self.assertEqual(get_summary_key(values, ["branch", "region"]), key)
+		self.assertEqual(get_summary_key({**values, "region": ""}, ["region", "branch"]), key)
+		self.assertNotEqual(get_summary_key({**values, "region": "West"}, ["branch", "region"]), key)
+		self.assertNotEqual(get_summary_key(values, []), key)
+
+	def test_rebuild_leaves_out_entries_not_posted_to_gl(self):
+		def rebuilt_amount():
+			# the rebuild commits; keep it inside the test transaction
+			with patch.object(frappe.db, "commit"):
+				rebuild_expense_summary(self.company)
+			return frappe.db.get_value(
+				"Expense Summary",
+				{"company": self.company, "posting_month": get_first_day(nowdate())},
+				[{"SUM": "amount"}],
+			) or 0
+
+		pending = make_expense_entry(self.fixtures, amount=30000).insert(ignore_permissions=True)
+		pending.submit()
+		# as left by an async posting that has not run yet
+		pending.db_set({"status": "Posting", "posted_to_gl": 0})
+		before = rebuilt_amount()
+
+		pending.db_set({"status": "Submitted", "posted_to_gl": 1})
+		self.assertEqual(rebuilt_amount() - before, 30000)
+
+	def test_submit_and_cancel_maintain_expense_summary(self):
+		def summary_amount():
+			return frappe.db.get_value(
+				"Expense Summary",
+				{
+					"company": self.company,
+					"posting_month": get_first_day(nowdate()),
+					"expense_account": self.expense_account,
+				},
+				[{"SUM": "amount"}],
+			) or 0
+
+		before = summary_amount()
+		expense = self._make_expense_entry(45000)
+		expense.submit()
+		self.assertEqual(summary_amount() - before, 45000)
+
+		expense.cancel()
+		self.assertEqual(summary_amount(), before)
+
+	def test_foreign_currency_entry_is_summarised_in_company_currency(self):
+		company_currency = frappe.get_cached_value("Company", self.company, "default_currency")
+		foreign = "EUR" if company_currency == "USD" else "USD"
+
+		def summary_amount():
+			return frappe.db.get_value(
+				"Expense Summary",
+				{
+					"company": self.company,
+					"posting_month": get_first_day(nowdate()),
+					"expense_account": self.expense_account,
+				},
+				[{"SUM": "amount"}],
+			) or 0
+
+		before = summary_amount()
+		expense = self._make_unsaved_expense_entry(rows=3, amount=10.25)
+		expense.currency = foreign
+		expense.exchange_rate = 15000
+		expense.insert(ignore_permissions=True)
+		expense.submit()
+		self.assertEqual(summary_amount() - before, 461250)
+
+		expense.cancel()
+		self.assertEqual(summary_amount(), before)
@@ -0,0 +1,16 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class JournalPlusSettings(Document):
+	pass
+
+
+def get_settings():
+	"""
+	Cached Journal Plus Settings; the cache is cleared whenever the settings are saved.
+	"""
+	return frappe.get_cached_doc("Journal Plus Settings")
@@ -0,0 +1,62 @@
+// Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Expense Analysis"] = {
+	filters: [
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+			default: frappe.defaults.get_user_default("Company"),
+			reqd: 1,
+		},
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.year_start(),
+			reqd: 1,
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.year_end(),
+			reqd: 1,
+		},
+		{
+			fieldname: "group_by",
+			label: __("Group By"),
+			fieldtype: "Select",
+			options: ["Expense Account", "Expense Label", "Cost Center", "Project"],
+			default: "Expense Account",
+		},
+		{
+			fieldname: "expense_account",
+			label: __("Expense Account"),
+			fieldtype: "Link",
+			options: "Account",
+		},
+		{
+			fieldname: "expense_label",
+			label: __("Expense Label"),
+			fieldtype: "Link",
+			options: "Expense Label",
+		},
+		{
+			fieldname: "cost_center",
+			label: __("Cost Center"),
+			fieldtype: "Link",
+			options: "Cost Center",
+		},
+		{
+			fieldname: "project",
+			label: __("Project"),
+			fieldtype: "Link",
+			options: "Project",
+		},
+	],
+};
+
+erpnext.accounts.dimensions.add_dimensions("Expense Analysis", 8);
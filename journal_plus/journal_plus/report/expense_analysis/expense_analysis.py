@@ -0,0 +1,88 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+	get_accounting_dimensions,
+)
+from frappe import _
+from frappe.query_builder import functions as fn
+from frappe.utils import add_months, formatdate, get_first_day, getdate
+
+GROUP_BY_FIELDS = {
+	"Expense Account": ("expense_account", "Account"),
+	"Expense Label": ("expense_label", "Expense Label"),
+	"Cost Center": ("cost_center", "Cost Center"),
+	"Project": ("project", "Project"),
+}
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	months = get_months(filters)
+	return get_columns(filters, months), get_data(filters, months)
+
+
+def get_months(filters):
+	months = []
+	month = get_first_day(getdate(filters.from_date))
+	end = get_first_day(getdate(filters.to_date))
+	while month <= end:
+		months.append(month)
+		month = add_months(month, 1)
+	return months
+
+
+def get_columns(filters, months):
+	fieldname, options = GROUP_BY_FIELDS[filters.group_by or "Expense Account"]
+	columns = [
+		{
+			"fieldname": fieldname,
+			"label": _(filters.group_by or "Expense Account"),
+			"fieldtype": "Link",
+			"options": options,
+			"width": 240,
+		}
+	]
+	for month in months:
+		columns.append({
+			"fieldname": month_key(month),
+			"label": formatdate(month, "MMM YYYY"),
+			"fieldtype": "Currency",
+			"width": 130,
+		})
+	columns.append({"fieldname": "total", "label": _("Total"), "fieldtype": "Currency", "width": 150})
+	return columns
+
+
+def get_data(filters, months):
+	"""
+	Read the pre-aggregated Expense Summary only; never touches GL Entry or the detail lines.
+	"""
+	fieldname, _options = GROUP_BY_FIELDS[filters.group_by or "Expense Account"]
+	summary = frappe.qb.DocType("Expense Summary")
+
+	query = (
+		frappe.qb.from_(summary)
+		.select(summary[fieldname], summary.posting_month, fn.Sum(summary.amount).as_("amount"))
+		.where(summary.company == filters.company)
+		.where(summary.posting_month[months[0] : months[-1]] if months else summary.posting_month.isnull())
+		.groupby(summary[fieldname], summary.posting_month)
+	)
+
+	for field in ("expense_account", "expense_label", "cost_center", "project", *get_accounting_dimensions()):
+		if filters.get(field):
+			values = filters[field] if isinstance(filters[field], list) else [filters[field]]
+			query = query.where(summary[field].isin(values))
+
+	rows = {}
+	for r in query.run(as_dict=True):
+		row = rows.setdefault(r[fieldname], {fieldname: r[fieldname], "total": 0})
+		row[month_key(r.posting_month)] = r.amount
+		row["total"] += r.amount
+
+	return sorted(rows.values(), key=lambda r: r["total"], reverse=True)
+
+
+def month_key(month):
+	return getdate(month).strftime("m_%Y_%m")
@@ -0,0 +1,84 @@
+// Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+// For license information, please see license.txt
+
+frappe.query_reports["Expense Register"] = {
+	filters: [
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+			default: frappe.defaults.get_user_default("Company"),
+			reqd: 1,
+		},
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.add_months(frappe.datetime.get_today(), -1),
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			default: frappe.datetime.get_today(),
+		},
+		{
+			fieldname: "expense_account",
+			label: __("Expense Account"),
+			fieldtype: "Link",
+			options: "Account",
+		},
+		{
+			fieldname: "expense_label",
+			label: __("Expense Label"),
+			fieldtype: "Link",
+			options: "Expense Label",
+		},
+		{
+			fieldname: "cost_center",
+			label: __("Cost Center"),
+			fieldtype: "Link",
+			options: "Cost Center",
+		},
+		{
+			fieldname: "project",
+			label: __("Project"),
+			fieldtype: "Link",
+			options: "Project",
+		},
+		{
+			fieldname: "reference",
+			label: __("Reference"),
+			fieldtype: "Data",
+		},
+		{
+			fieldname: "page_length",
+			label: __("Rows per Page"),
+			fieldtype: "Int",
+			default: 500,
+		},
+		{
+			// "<posting_date>|<expense_entry>|<idx>" of the last row already shown
+			fieldname: "after",
+			label: __("After"),
+			fieldtype: "Data",
+			hidden: 1,
+		},
+	],
+
+	onload(report) {
+		report.page.add_inner_button(__("First Page"), () => {
+			report.set_filter_value("after", "");
+		});
+		report.page.add_inner_button(__("Next Page"), () => {
+			const rows = report.data || [];
+			const last = rows[rows.length - 1];
+			if (!last) {
+				frappe.show_alert(__("No more rows"));
+				return;
+			}
+			report.set_filter_value("after", [last.posting_date, last.expense_entry, last.idx].join("|"));
+		});
+	},
+};
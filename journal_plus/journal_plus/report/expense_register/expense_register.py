@@ -0,0 +1,100 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+
+DEFAULT_PAGE_LENGTH = 500
+MAX_PAGE_LENGTH = 5000
+DETAIL_FILTERS = ("expense_account", "cost_center", "project", "expense_label", "reference")
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	return get_columns(), get_data(filters)
+
+
+def get_columns():
+	return [
+		{"fieldname": "posting_date", "label": _("Posting Date"), "fieldtype": "Date", "width": 100},
+		{"fieldname": "expense_entry", "label": _("Expense Entry"), "fieldtype": "Link", "options": "Expense Entry", "width": 150},
+		{"fieldname": "idx", "label": _("Line"), "fieldtype": "Int", "width": 60},
+		{"fieldname": "title", "label": _("Title"), "fieldtype": "Data", "width": 160},
+		{"fieldname": "payment_to", "label": _("Payment To"), "fieldtype": "Data", "width": 140},
+		{"fieldname": "expense_label", "label": _("Expense Label"), "fieldtype": "Link", "options": "Expense Label", "width": 140},
+		{"fieldname": "expense_account", "label": _("Expense Account"), "fieldtype": "Link", "options": "Account", "width": 180},
+		{"fieldname": "cost_center", "label": _("Cost Center"), "fieldtype": "Link", "options": "Cost Center", "width": 140},
+		{"fieldname": "project", "label": _("Project"), "fieldtype": "Link", "options": "Project", "width": 120},
+		{"fieldname": "reference", "label": _("Reference"), "fieldtype": "Data", "width": 120},
+		{"fieldname": "remarks", "label": _("Remarks"), "fieldtype": "Data", "width": 180},
+		{"fieldname": "amount", "label": _("Amount"), "fieldtype": "Currency", "options": "currency", "width": 120},
+		{"fieldname": "currency", "label": _("Currency"), "fieldtype": "Link", "options": "Currency", "hidden": 1},
+	]
+
+
+def get_data(filters):
+	"""
+	One page of submitted detail lines ordered by (posting_date, expense_entry, idx).
+
+	Pages are addressed by the last row of the previous page (`after` filter,
+	"<posting_date>|<expense_entry>|<idx>") instead of an OFFSET, so deep pages
+	cost the same as the first one.
+	"""
+	ee = frappe.qb.DocType("Expense Entry")
+	eed = frappe.qb.DocType("Expense Entry Detail")
+	page_length = min(cint(filters.page_length) or DEFAULT_PAGE_LENGTH, MAX_PAGE_LENGTH)
+
+	query = (
+		frappe.qb.from_(ee)
+		.inner_join(eed)
+		.on((eed.parent == ee.name) & (eed.parenttype == "Expense Entry"))
+		.select(
+			ee.posting_date,
+			ee.name.as_("expense_entry"),
+			eed.idx,
+			ee.title,
+			ee.payment_to,
+			ee.currency,
+			eed.expense_label,
+			eed.expense_account,
+			eed.cost_center,
+			eed.project,
+			eed.reference,
+			eed.remarks,
+			eed.amount,
+		)
+		.where(ee.docstatus == 1)
+		.where(ee.company == filters.company)
+		.orderby(ee.posting_date)
+		.orderby(ee.name)
+		.orderby(eed.idx)
+		.limit(page_length)
+	)
+
+	if filters.from_date:
+		query = query.where(ee.posting_date >= getdate(filters.from_date))
+	if filters.to_date:
+		query = query.where(ee.posting_date <= getdate(filters.to_date))
+
+	for field in DETAIL_FILTERS:
+		if filters.get(field):
+			query = query.where(eed[field] == filters.get(field))
+
+	if filters.after:
+		posting_date, name, idx = parse_cursor(filters.after)
+		query = query.where(
+			(ee.posting_date > posting_date)
+			| ((ee.posting_date == posting_date) & (ee.name > name))
+			| ((ee.posting_date == posting_date) & (ee.name == name) & (eed.idx > idx))
+		)
+
+	return query.run(as_dict=True)
+
+
+def parse_cursor(cursor):
+	try:
+		posting_date, name, idx = cursor.rsplit("|", 2)
+		return getdate(posting_date), name, cint(idx)
+	except ValueError:
+		frappe.throw(_("Invalid page cursor {0}").format(cursor))
@@ -0,0 +1,86 @@
+# Copyright (c) 2026, PT Sopwer Teknologi Indonesia and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, getdate
+
+ROW_BUCKETS = ((10, "1-10"), (100, "11-100"), (1000, "101-1,000"), (10000, "1,001-10,000"))
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	group_by = filters.group_by or "Row Count"
+	return get_columns(group_by), get_data(filters, group_by)
+
+
+def get_columns(group_by):
+	return [
+		{"fieldname": "event", "label": _("Event"), "fieldtype": "Data", "width": 110},
+		{"fieldname": "phase", "label": _("Phase"), "fieldtype": "Data", "width": 180},
+		{"fieldname": "bucket", "label": _(group_by), "fieldtype": "Data", "width": 120},
+		{"fieldname": "samples", "label": _("Samples"), "fieldtype": "Int", "width": 90},
+		{"fieldname": "p50_ms", "label": _("p50 (ms)"), "fieldtype": "Float", "precision": 2, "width": 110},
+		{"fieldname": "p95_ms", "label": _("p95 (ms)"), "fieldtype": "Float", "precision": 2, "width": 110},
+		{"fieldname": "avg_queries", "label": _("Avg Queries"), "fieldtype": "Float", "precision": 1, "width": 110},
+	]
+
+
+def get_data(filters, group_by):
+	conditions = {
+		"creation": ["between", [getdate(filters.from_date), add_days(getdate(filters.to_date), 1)]],
+	}
+	if filters.event:
+		conditions["event"] = filters.event
+
+	logs = frappe.get_all(
+		"Expense Posting Log",
+		filters=conditions,
+		fields=["event", "phase", "duration_ms", "query_count", "row_count", "dimension_count"],
+		order_by="creation asc",
+	)
+
+	groups = defaultdict(list)
+	for log in logs:
+		bucket = row_bucket(log.row_count) if group_by == "Row Count" else str(log.dimension_count)
+		groups[(log.event, log.phase, bucket)].append(log)
+
+	data = []
+	for (event, phase, bucket), rows in sorted(groups.items(), key=sort_key):
+		durations = sorted(r.duration_ms for r in rows)
+		data.append({
+			"event": event,
+			"phase": phase,
+			"bucket": bucket,
+			"samples": len(rows),
+			"p50_ms": percentile(durations, 50),
+			"p95_ms": percentile(durations, 95),
+			"avg_queries": sum(r.query_count for r in rows) / len(rows),
+		})
+	return data
+
+
+def row_bucket(row_count):
+	for limit, label in ROW_BUCKETS:
+		if row_count <= limit:
+			return label
+	return "> 10,000"
+
+
+def percentile(sorted_values, pct):
+	"""
+	Nearest-rank percentile of an already sorted list.
+	"""
+	if not sorted_values:
+		return 0
+	rank = max(0, min(len(sorted_values) - 1, -(-pct * len(sorted_values) // 100) - 1))
+	return sorted_values[int(rank)]
+
+
+def sort_key(item):
+	(event, phase, bucket), _rows = item
+	bucket_order = [label for _limit, label in ROW_BUCKETS] + ["> 10,000"]
+	bucket_rank = bucket_order.index(bucket) if bucket in bucket_order else int(bucket or 0)
+	return (event, phase == "total", phase, bucket_rank)
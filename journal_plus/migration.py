@@ -2,68 +2,134 @@ import frappe
 from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
 from frappe import _
 
+# doctype -> where the dimension field goes, how it is labelled and whether
+# mandatory_for_pl makes it required
+DIMENSION_TARGETS = {
+    "Expense Entry": {"insert_after": "project", "label": "label", "reqd": True},
+    "Expense Entry Detail": {"insert_after": "cost_center", "label": "fieldname", "reqd": True},
+    "Expense Summary": {"insert_after": "project", "label": "label", "reqd": False},
+    "Expense Entry Template": {"insert_after": "project", "label": "label", "reqd": False},
+}
+
+COMPARED_PROPERTIES = ("label", "options", "reqd", "hidden", "module")
+
 
 def create_accounting_dimensions(doc, method):
     """
-        Create accounting Dimension fields in Expense Entry and Expense Entry Detail
+        Create accounting Dimension fields in Expense Entry, Expense Entry Detail,
+        Expense Summary and Expense Entry Template
     """
+    changes = sync_accounting_dimensions()
 
-    if doc.disabled:
-        return
+    if any(changes.values()):
+        frappe.msgprint(
+            _("Accounting Dimension <b>{0}</b> synced to Expense Entry").format(
+                doc.label
+            )
+        )
 
-    dimension_fieldname = frappe.scrub(doc.name)
-    dimension_doctype = doc.document_type
+    if changes["created"] and frappe.db.exists("Expense Entry", {"docstatus": 1}):
+        frappe.msgprint(
+            _("Existing Expense Entries have no {0} yet; use an Expense Dimension Backfill to fill it in.").format(
+                doc.label
+            )
+        )
 
-    if not dimension_doctype:
-        return
 
-    is_required = frappe.db.exists(
-        "Accounting Dimension Default",
-        {
-            "parent": doc.name,
-            "mandatory_for_pl": 1,
-        }
-    )
+@frappe.whitelist()
+def sync_accounting_dimension_fields():
+    """
+    Whitelisted entry point for a full dimension field sync.
+    """
+    frappe.only_for("System Manager")
+    return sync_accounting_dimensions()
 
-    custom_fields = {}
 
-    if not frappe.db.exists(
-        "Custom Field",
-        {"dt": "Expense Entry", "fieldname": dimension_fieldname},
-    ):
-        custom_fields.setdefault("Expense Entry", []).append(
-            {
-                "fieldname": dimension_fieldname,
-                "label": doc.label,
-                "fieldtype": "Link",
-                "options": dimension_doctype,
-                "insert_after": "project",
-                "reqd": 1 if is_required else 0,
-                "ignore_user_permissions": 1,
-            }
-        )
-    if not frappe.db.exists(
-        "Custom Field",
-        {"dt": "Expense Entry Detail", "fieldname": dimension_fieldname},
-    ):
-        custom_fields.setdefault("Expense Entry Detail", []).append(
-            {
-                "fieldname": dimension_fieldname,
-                "label": dimension_fieldname,
-                "fieldtype": "Link",
-                "options": dimension_doctype,
-                "insert_after": "cost_center",
-                "reqd": 1 if is_required else 0,
-                "ignore_user_permissions": 1,
-            }
+def sync_accounting_dimensions():
+    """
+    Diff every Accounting Dimension against the Custom Fields of the target
+    doctypes and create, update or remove fields in one batch.
+
+    Only the metas of doctypes that actually changed are invalidated.
+    Returns {"created": [...], "updated": [...], "removed": [...]} as "Doctype.fieldname".
+    """
+    desired = get_desired_dimension_fields()
+    existing = {
+        (f.dt, f.fieldname): f
+        for f in frappe.get_all(
+            "Custom Field",
+            filters={"dt": ["in", list(DIMENSION_TARGETS)]},
+            fields=["name", "dt", "fieldname", "fieldtype", *COMPARED_PROPERTIES],
         )
+    }
+
+    changes = {"created": [], "updated": [], "removed": []}
+    custom_fields = {}
+
+    for (dt, fieldname), df in desired.items():
+        current = existing.get((dt, fieldname))
+        if not current:
+            changes["created"].append(f"{dt}.{fieldname}")
+        elif any((current.get(k) or 0) != (df[k] or 0) for k in COMPARED_PROPERTIES):
+            changes["updated"].append(f"{dt}.{fieldname}")
+        else:
+            continue
+        custom_fields.setdefault(dt, []).append(df)
+
+    # fields of deleted dimensions; only fields this sync created are touched
+    stale = [
+        f for key, f in existing.items()
+        if key not in desired and f.fieldtype == "Link" and f.module == "Journal Plus"
+    ]
 
     if custom_fields:
+        # clears the cache of each touched doctype only
         create_custom_fields(custom_fields, update=True)
-        frappe.clear_cache()
 
-        frappe.msgprint(
-            _("Accounting Dimension <b>{0}</b> synced to Expense Entry").format(
-                doc.label
-            )
-        )
\ No newline at end of file
+    for f in stale:
+        frappe.delete_doc("Custom Field", f.name, ignore_permissions=True)
+        changes["removed"].append(f"{f.dt}.{f.fieldname}")
+
+    for dt in {f.dt for f in stale}:
+        frappe.clear_cache(doctype=dt)
+
+    return changes
+
+
+def get_desired_dimension_fields():
+    """
+    {(doctype, fieldname): custom field dict} for every Accounting Dimension.
+    Disabled dimensions keep their (hidden, optional) fields so posted values survive.
+    """
+    dimensions = frappe.get_all(
+        "Accounting Dimension",
+        fields=["name", "label", "fieldname", "document_type", "disabled"],
+    )
+    mandatory = set(
+        frappe.get_all(
+            "Accounting Dimension Default",
+            filters={"parenttype": "Accounting Dimension", "mandatory_for_pl": 1},
+            pluck="parent",
+            distinct=True,
+        )
+    )
+
+    fields = {}
+    for dim in dimensions:
+        if not dim.document_type:
+            continue
+
+        fieldname = dim.fieldname or frappe.scrub(dim.name)
+        for dt, target in DIMENSION_TARGETS.items():
+            fields[(dt, fieldname)] = {
+                "fieldname": fieldname,
+                "label": dim.label if target["label"] == "label" else fieldname,
+                "fieldtype": "Link",
+                "options": dim.document_type,
+                "insert_after": target["insert_after"],
+                "reqd": 1 if target["reqd"] and dim.name in mandatory and not dim.disabled else 0,
+                "hidden": 1 if dim.disabled else 0,
+                "ignore_user_permissions": 1,
+                "module": "Journal Plus",
+            }
+    return fields
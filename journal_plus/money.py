@@ -0,0 +1,143 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+import frappe
+from frappe import _
+from frappe.utils import flt, get_number_format_info, getdate
+
+DEFAULT_PRECISION = 2
+EXCHANGE_RATE_CACHE_SIZE = 4096
+# bumped whenever a Currency Exchange changes; part of every cached lookup's key so
+# every worker process stops using its old rates, not only the one that saved
+EXCHANGE_RATE_VERSION_KEY = "journal_plus_exchange_rate_version"
+
+
+def get_currency_precision(currency):
+    """
+    Number of decimal places of `currency`, taken from the Currency master:
+    fraction_units (100 -> 2, 1000 -> 3, 1 -> 0) or, failing that, its number format.
+    """
+    if not currency:
+        return DEFAULT_PRECISION
+
+    values = frappe.get_cached_value("Currency", currency, ["fraction_units", "number_format"], as_dict=True)
+    if not values:
+        return DEFAULT_PRECISION
+
+    units = frappe.utils.cint(values.fraction_units)
+    if units > 0 and 10 ** (len(str(units)) - 1) == units:
+        return len(str(units)) - 1
+
+    if values.number_format:
+        return get_number_format_info(values.number_format)[2]
+
+    return DEFAULT_PRECISION
+
+
+def get_exchange_rate(from_currency, to_currency, date):
+    """
+    Rate converting `from_currency` into `to_currency` on `date`, from the latest
+    Currency Exchange on or before that date (or the inverse of the reverse pair).
+    Lookups are kept in a bounded in-process LRU cache per site and rate version.
+    """
+    if not from_currency or not to_currency or from_currency == to_currency:
+        return 1.0
+    version = frappe.cache().get_value(EXCHANGE_RATE_VERSION_KEY) or 0
+    return _lookup_exchange_rate(frappe.local.site, version, from_currency, to_currency, getdate(date))
+
+
+@lru_cache(maxsize=EXCHANGE_RATE_CACHE_SIZE)
+def _lookup_exchange_rate(site, version, from_currency, to_currency, date):
+    rate = _get_latest_rate(from_currency, to_currency, date)
+    if rate:
+        return rate
+
+    inverse = _get_latest_rate(to_currency, from_currency, date)
+    if inverse:
+        return 1 / inverse
+
+    frappe.throw(
+        _("No Currency Exchange from {0} to {1} on or before {2}").format(from_currency, to_currency, date),
+        title=_("Missing Exchange Rate"),
+    )
+
+
+def _get_latest_rate(from_currency, to_currency, date):
+    rates = frappe.get_all(
+        "Currency Exchange",
+        filters={"from_currency": from_currency, "to_currency": to_currency, "date": ["<=", date]},
+        pluck="exchange_rate",
+        order_by="date desc",
+        limit=1,
+    )
+    return flt(rates[0]) if rates else None
+
+
+def clear_exchange_rate_cache(doc=None, method=None):
+    """
+    doc_events handler for Currency Exchange. A new version in the site cache
+    retires the cached rates of every process; this one's are dropped as well.
+    """
+    frappe.cache().set_value(EXCHANGE_RATE_VERSION_KEY, frappe.generate_hash(length=8))
+    _lookup_exchange_rate.cache_clear()
+
+
+class MoneyEngine:
+    """
+    Integer minor-unit arithmetic for one currency.
+
+    Amounts are converted to minor units (e.g. cents) once on the way in, kept as
+    ints while running debit/credit totals are maintained, and turned into floats
+    only when a GL entry is written out.
+    """
+
+    __slots__ = ("credit", "currency", "debit", "precision", "quantum")
+
+    def __init__(self, currency, precision=None):
+        self.currency = currency
+        self.precision = get_currency_precision(currency) if precision is None else precision
+        self.quantum = Decimal(1).scaleb(-self.precision)
+        self.debit = 0
+        self.credit = 0
+
+    def to_minor(self, value):
+        """
+        Convert a float/str/Decimal amount to an int of minor units (half up).
+        Invalid or empty values count as zero.
+        """
+        try:
+            amount = Decimal(str(value or 0))
+        except (InvalidOperation, ValueError):
+            return 0
+        return int(amount.quantize(self.quantum, rounding=ROUND_HALF_UP).scaleb(self.precision))
+
+    def convert(self, value, rate):
+        """
+        Convert an amount of another currency into minor units of this one.
+        """
+        try:
+            amount = Decimal(str(value or 0)) * Decimal(str(rate or 0))
+        except (InvalidOperation, ValueError):
+            return 0
+        return self.to_minor(amount)
+
+    def to_float(self, minor):
+        """
+        Convert minor units back to a float at the GL boundary.
+        """
+        return float(Decimal(minor).scaleb(-self.precision))
+
+    def add_debit(self, minor):
+        self.debit += minor
+        return minor
+
+    def add_credit(self, minor):
+        self.credit += minor
+        return minor
+
+    @property
+    def difference(self):
+        """
+        Debit minus credit, in minor units.
+        """
+        return self.debit - self.credit
@@ -0,0 +1,5 @@
+import frappe
+
+
+def execute():
+    frappe.db.add_index("Expense Entry", ["account_paid_from", "clearance_date", "posting_date"])
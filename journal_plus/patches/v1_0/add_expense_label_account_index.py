@@ -0,0 +1,5 @@
+import frappe
+
+
+def execute():
+    frappe.db.add_index("Expense Label Account", ["company", "parent", "account"])
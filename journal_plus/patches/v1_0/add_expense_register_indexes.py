@@ -0,0 +1,11 @@
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import (
+    on_doctype_update as add_expense_entry_indexes,
+)
+from journal_plus.journal_plus.doctype.expense_entry_detail.expense_entry_detail import (
+    on_doctype_update as add_expense_entry_detail_indexes,
+)
+
+
+def execute():
+    add_expense_entry_indexes()
+    add_expense_entry_detail_indexes()
@@ -0,0 +1,53 @@
+import frappe
+from frappe.query_builder import Case
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import (
+    get_duplicate_fingerprint,
+    on_doctype_update,
+)
+from journal_plus.money import get_currency_precision
+
+CHUNK_SIZE = 5000
+
+
+def execute():
+    """
+    Fingerprint every existing Expense Entry, walking the table by name and
+    writing each chunk back with a single UPDATE.
+    """
+    on_doctype_update()
+
+    ee = frappe.qb.DocType("Expense Entry")
+    precisions = {}
+    after = ""
+
+    while True:
+        rows = (
+            frappe.qb.from_(ee)
+            .select(ee.name, ee.company, ee.payment_to, ee.currency, ee.total)
+            .where(ee.name > after)
+            .orderby(ee.name)
+            .limit(CHUNK_SIZE)
+        ).run(as_dict=True)
+        if not rows:
+            break
+
+        fingerprint = Case()
+        for row in rows:
+            if row.currency not in precisions:
+                precisions[row.currency] = get_currency_precision(row.currency)
+            fingerprint = fingerprint.when(
+                ee.name == row.name,
+                get_duplicate_fingerprint(
+                    row.company, row.payment_to, row.currency, row.total, precisions[row.currency]
+                ),
+            )
+
+        (
+            frappe.qb.update(ee)
+            .set(ee.duplicate_fingerprint, fingerprint)
+            .where(ee.name.isin([row.name for row in rows]))
+        ).run()
+        frappe.db.commit()
+
+        after = rows[-1].name
@@ -0,0 +1,5 @@
+from journal_plus.install import make_custom_fields
+
+
+def execute():
+    make_custom_fields()
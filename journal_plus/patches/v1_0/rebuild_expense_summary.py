@@ -0,0 +1,9 @@
+from journal_plus.journal_plus.doctype.expense_summary.expense_summary import rebuild_expense_summary
+
+
+def execute():
+    """
+    Summary keys now leave out empty dimensions and amounts are kept in the
+    company currency; recompute every row.
+    """
+    rebuild_expense_summary()
@@ -0,0 +1,16 @@
+import frappe
+
+
+def execute():
+    """
+    Fill status / posted_to_gl on Expense Entries created before the fields existed.
+    """
+    ee = frappe.qb.DocType("Expense Entry")
+    for docstatus, status, posted in ((0, "Draft", 0), (1, "Submitted", 1), (2, "Cancelled", 0)):
+        (
+            frappe.qb.update(ee)
+            .set(ee.status, status)
+            .set(ee.posted_to_gl, posted)
+            .where(ee.docstatus == docstatus)
+            .where((ee.status.isnull()) | (ee.status == "") | (ee.status == "Draft"))
+        ).run()
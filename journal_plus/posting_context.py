@@ -0,0 +1,118 @@
+"""
+Per-company posting defaults shared by every Expense Entry of a request.
+
+Company defaults, rounding accounts, currency precision and accounting dimension
+metadata are loaded once per company into the site cache and wrapped in a
+PostingContext per (company, posting date) for the rest of the request. The site
+cache is cleared from doc_events when a Company, Accounting Dimension or Currency
+changes (see hooks.py).
+"""
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    get_accounting_dimensions,
+    get_checks_for_pl_and_bs_accounts,
+)
+from frappe.utils import cint, getdate, nowdate
+
+from journal_plus.money import get_currency_precision
+
+POSTING_CONTEXT_CACHE_KEY = "journal_plus_posting_context"
+
+
+class PostingContext:
+    """
+    Read-only posting defaults of one company on one posting date.
+    Build it through get_posting_context(), never directly.
+    """
+
+    __slots__ = (
+        "company",
+        "consolidate",
+        "default_currency",
+        "dimensions",
+        "mandatory_pl_dimensions",
+        "posting_date",
+        "precisions",
+        "round_off_cost_center",
+        "rounding_account",
+    )
+
+    def __init__(self, company, posting_date, values):
+        self.company = company
+        self.posting_date = posting_date
+        self.default_currency = values["default_currency"]
+        self.rounding_account = values["rounding_account"]
+        self.round_off_cost_center = values["round_off_cost_center"]
+        self.consolidate = values["consolidate"]
+        self.dimensions = tuple(values["dimensions"])
+        self.mandatory_pl_dimensions = frozenset(values["mandatory_pl_dimensions"])
+        self.precisions = dict(values["precisions"])
+
+    def get_precision(self, currency):
+        """
+        Decimal places of `currency`; the company currency is preloaded.
+        """
+        if currency not in self.precisions:
+            self.precisions[currency] = get_currency_precision(currency)
+        return self.precisions[currency]
+
+    def has_posting_permission(self, doc):
+        """
+        Whether the session user may post `doc`. Checked for every document:
+        shares and User Permissions on its links differ between documents, even
+        of the same owner and company.
+        """
+        return bool(frappe.has_permission(doc.doctype, ptype="write", doc=doc))
+
+
+def get_posting_context(company, posting_date=None):
+    """
+    Memoised PostingContext for (company, posting_date): one object per request,
+    backed by the site cache across requests.
+    """
+    posting_date = getdate(posting_date or nowdate())
+
+    if frappe.flags.journal_plus_posting_contexts is None:
+        frappe.flags.journal_plus_posting_contexts = {}
+
+    contexts = frappe.flags.journal_plus_posting_contexts
+    key = (company, posting_date)
+    if key not in contexts:
+        values = frappe.cache().hget(
+            POSTING_CONTEXT_CACHE_KEY, company, lambda: _load_company_values(company)
+        )
+        contexts[key] = PostingContext(company, posting_date, values)
+    return contexts[key]
+
+
+def _load_company_values(company):
+    company_doc = frappe.get_cached_doc("Company", company)
+    default_currency = company_doc.default_currency
+
+    return {
+        "default_currency": default_currency,
+        "rounding_account": company_doc.get("rounding_account") or company_doc.get("round_off_account"),
+        "round_off_cost_center": company_doc.get("round_off_cost_center"),
+        "consolidate": cint(company_doc.get("consolidate_expense_gl_entries")),
+        "dimensions": list(get_accounting_dimensions()),
+        "mandatory_pl_dimensions": [
+            d.fieldname
+            for d in get_checks_for_pl_and_bs_accounts()
+            if d.mandatory_for_pl and d.company == company
+        ],
+        "precisions": {default_currency: get_currency_precision(default_currency)} if default_currency else {},
+    }
+
+
+def clear_posting_context(doc=None, method=None):
+    """
+    doc_events handler: drop cached contexts. A Company change only clears that
+    company; dimension and currency changes clear every company.
+    """
+    if doc is not None and doc.doctype == "Company":
+        frappe.cache().hdel(POSTING_CONTEXT_CACHE_KEY, doc.name)
+    else:
+        frappe.cache().delete_key(POSTING_CONTEXT_CACHE_KEY)
+
+    frappe.flags.journal_plus_posting_contexts = None
@@ -0,0 +1,190 @@
+import time
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    get_accounting_dimensions,
+)
+from frappe.utils import create_batch, getdate, nowdate
+
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import get_account_details
+from journal_plus.journal_plus.doctype.expense_entry_template.expense_entry_template import (
+    DETAIL_FIELDS,
+    HEADER_FIELDS,
+    get_due_dates,
+    get_next_schedule_date,
+    make_expense_entry,
+)
+
+TEMPLATE_DOCTYPE = "Expense Entry Template"
+DEFAULT_CHUNK_SIZE = 200
+# stay well inside the long queue timeout; the rest of the run is re-enqueued
+TIME_BUDGET = 20 * 60
+SAVEPOINT = "journal_plus_recurring_expense"
+
+
+def generate_recurring_expense_entries(upto=None, after=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate (and optionally submit) every due Expense Entry of enabled templates.
+
+    Templates are walked by name in chunks; each chunk fetches its templates, their
+    rows, the entries already generated and the accounts they use in a handful of
+    queries, then commits. Dates that already have an Expense Entry for the template
+    are skipped, so re-runs never duplicate. If the run nears the job timeout the
+    remainder is queued as a follow-up job, one job per cursor, so overlapping
+    daily runs that reach the same template share a single follow-up.
+    """
+    requested_upto = upto
+    upto = getdate(upto or nowdate())
+    dimensions = get_accounting_dimensions()
+    started = time.monotonic()
+    stats = {"templates": 0, "generated": 0, "failed": 0}
+
+    while True:
+        templates = _get_due_templates(upto, after, chunk_size, dimensions)
+        if not templates:
+            break
+
+        rows = _get_template_rows([t.name for t in templates], dimensions)
+        existing = _get_generated_dates(
+            [t.name for t in templates], min(getdate(t.next_date or t.start_date) for t in templates), upto
+        )
+        _prefetch_accounts(templates, rows)
+
+        for template in templates:
+            generated = _generate_for_template(
+                template, rows.get(template.name, []), upto, existing.get(template.name, set()), dimensions
+            )
+            stats["templates"] += 1
+            if generated is None:
+                stats["failed"] += 1
+            else:
+                stats["generated"] += generated
+
+        frappe.db.commit()
+        after = templates[-1].name
+
+        if time.monotonic() - started > TIME_BUDGET:
+            frappe.enqueue(
+                generate_recurring_expense_entries,
+                queue="long",
+                job_id=f"journal_plus_recurring_expense_entries::{after}",
+                deduplicate=True,
+                # a follow-up of the scheduler's run generates up to the day it runs
+                upto=requested_upto,
+                after=after,
+                chunk_size=chunk_size,
+                enqueue_after_commit=True,
+            )
+            break
+
+    frappe.logger("journal_plus").info(f"Recurring Expense Entries generated: {stats}")
+    return stats
+
+
+def _get_due_templates(upto, after, limit, dimensions):
+    filters = {"enabled": 1, "next_date": ["<=", upto]}
+    if after:
+        filters["name"] = [">", after]
+
+    return frappe.get_all(
+        TEMPLATE_DOCTYPE,
+        filters=filters,
+        fields=[
+            "name", "frequency", "start_date", "end_date", "next_date", "auto_submit",
+            *HEADER_FIELDS, *dimensions,
+        ],
+        order_by="name asc",
+        limit=limit,
+    )
+
+
+def _get_template_rows(names, dimensions):
+    rows = {}
+    for row in frappe.get_all(
+        "Expense Entry Detail",
+        filters={"parenttype": TEMPLATE_DOCTYPE, "parent": ["in", names]},
+        fields=["parent", *DETAIL_FIELDS, *dimensions],
+        order_by="parent asc, idx asc",
+    ):
+        rows.setdefault(row.parent, []).append(row)
+    return rows
+
+
+def _get_generated_dates(names, since, upto):
+    """
+    {template: {posting_date, ...}} of Expense Entries that already exist
+    (draft or submitted) for the templates between the earliest date due and `upto`.
+    """
+    generated = {}
+    for name, posting_date in frappe.get_all(
+        "Expense Entry",
+        filters={
+            "expense_entry_template": ["in", names],
+            "docstatus": ["<", 2],
+            "posting_date": ["between", [since, upto]],
+        },
+        fields=["expense_entry_template", "posting_date"],
+        as_list=True,
+    ):
+        generated.setdefault(name, set()).add(getdate(posting_date))
+    return generated
+
+
+def _prefetch_accounts(templates, rows):
+    """
+    Warm the request-level account cache with every account the chunk posts to.
+    """
+    accounts = {t.account_paid_from for t in templates}
+    for template_rows in rows.values():
+        accounts.update(row.expense_account for row in template_rows)
+    accounts.discard(None)
+
+    for chunk in create_batch(list(accounts), 1000):
+        get_account_details(chunk)
+
+
+def _generate_for_template(template, rows, upto, generated, dimensions):
+    """
+    Create the entries of every due date of one template inside a savepoint and
+    move its next_date forward. Returns the number created, or None on failure
+    (the template keeps its next_date and is retried on the next run).
+    """
+    due_dates = get_due_dates(template, upto)
+    if not due_dates:
+        if template.end_date and getdate(template.next_date) > getdate(template.end_date):
+            # schedule ran out; stop picking the template up every day
+            frappe.db.set_value(TEMPLATE_DOCTYPE, template.name, "enabled", 0, update_modified=False)
+        return 0
+
+    created = 0
+    frappe.db.savepoint(SAVEPOINT)
+    try:
+        for posting_date in due_dates:
+            if posting_date in generated:
+                continue
+
+            entry = make_expense_entry(template, rows, posting_date, dimensions)
+            entry.insert()
+            if template.auto_submit:
+                entry.submit()
+            created += 1
+
+        frappe.db.set_value(
+            TEMPLATE_DOCTYPE,
+            template.name,
+            {
+                "next_date": get_next_schedule_date(template.start_date, template.frequency, due_dates[-1]),
+                "last_generated_on": due_dates[-1],
+                "last_error": None,
+            },
+            update_modified=False,
+        )
+        return created
+    except Exception:
+        frappe.db.rollback(save_point=SAVEPOINT)
+        frappe.db.set_value(
+            TEMPLATE_DOCTYPE, template.name, "last_error", frappe.get_traceback(), update_modified=False
+        )
+        return None
+    finally:
+        frappe.clear_messages()
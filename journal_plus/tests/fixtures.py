@@ -0,0 +1,244 @@
+"""
+Shared fixtures for the Journal Plus test suite.
+
+Each test worker gets its own company with a small chart of accounts, cost
+centers and Expense Labels, built on first use, committed so the per-test
+rollbacks keep it, found again by name on later runs and cached for the rest of
+the process. setUp then costs a dictionary lookup.
+
+Two accounting dimensions (a custom DocType each) are shared by every worker.
+Like ERPNext's own test records they are created once per site if missing and
+then left in place: they are optional for every company, so other suites only
+see two extra empty dimension fields.
+
+Workers are told apart by JOURNAL_PLUS_TEST_WORKER (or pytest-xdist's
+PYTEST_XDIST_WORKER), so parallel runs never post against the same company:
+
+    JOURNAL_PLUS_TEST_WORKER=2 bench --site test_site run-tests --app journal_plus
+"""
+
+import os
+import re
+
+import frappe
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
+    make_dimension_in_accounting_doctypes,
+)
+from erpnext.accounts.utils import FiscalYearError, get_fiscal_year
+from frappe.utils import get_first_day, get_last_day, getdate, nowdate
+from frappe.utils.synchronization import filelock
+
+WORKER_ENV_VARS = ("JOURNAL_PLUS_TEST_WORKER", "PYTEST_XDIST_WORKER")
+TEST_CURRENCY = "IDR"
+TEST_COUNTRY = "Indonesia"
+
+EXPENSE_ACCOUNTS = ("_JP Travel Expense", "_JP Meals Expense", "_JP Office Expense")
+COST_CENTERS = ("_JP Operations", "_JP Sales")
+# dimension doctype -> values
+DIMENSIONS = {
+    "_Test JP Region": ("_Test JP Region Jakarta", "_Test JP Region Surabaya"),
+    "_Test JP Channel": ("_Test JP Channel Online", "_Test JP Channel Store"),
+}
+# label title (suffixed with the worker) -> index into EXPENSE_ACCOUNTS
+EXPENSE_LABELS = {"_Test JP Travel": 0, "_Test JP Meals": 1, "_Test JP Office": 2}
+DIMENSIONS_LOCK = "journal_plus_test_dimensions"
+# altering every accounting doctype takes a while
+DIMENSIONS_LOCK_TIMEOUT = 600
+
+_fixtures = {}
+
+
+def get_worker_id():
+    for var in WORKER_ENV_VARS:
+        if os.environ.get(var):
+            return re.sub(r"\W", "", os.environ[var]) or "0"
+    return "0"
+
+
+def get_expense_fixtures():
+    """
+    The fixtures of this worker, built on first use:
+
+        company, abbr, currency, cash_account, expense_accounts, cost_centers,
+        dimensions ({fieldname: [values]}), labels ({expense label: account})
+    """
+    key = (frappe.local.site, get_worker_id())
+    if key not in _fixtures:
+        _fixtures[key] = make_expense_fixtures(key[1])
+    return _fixtures[key]
+
+
+def make_expense_fixtures(worker):
+    company = make_company(f"_Test Journal Plus {worker}", f"JPT{worker.upper()}")
+    make_fiscal_year()
+
+    expense_accounts = [make_account(company, name, "Expense") for name in EXPENSE_ACCOUNTS]
+    fixtures = frappe._dict(
+        company=company.name,
+        abbr=company.abbr,
+        currency=company.default_currency,
+        cash_account=make_account(company, "_JP Cash", "Asset", account_type="Cash"),
+        expense_accounts=expense_accounts,
+        cost_centers=[make_cost_center(company, name) for name in COST_CENTERS],
+        # committed on their own, under the dimension lock
+        dimensions=make_dimensions(),
+        labels={
+            make_expense_label(f"{title} {worker}", company.name, expense_accounts[idx]): expense_accounts[idx]
+            for title, idx in EXPENSE_LABELS.items()
+        },
+    )
+
+    frappe.db.commit()
+    return fixtures
+
+
+def make_company(company_name, abbr):
+    if not frappe.db.exists("Company", company_name):
+        frappe.get_doc({
+            "doctype": "Company",
+            "company_name": company_name,
+            "abbr": abbr,
+            "default_currency": TEST_CURRENCY,
+            "country": TEST_COUNTRY,
+            "create_chart_of_accounts_based_on": "Standard Template",
+            "chart_of_accounts": "Standard",
+        }).insert(ignore_permissions=True)
+    return frappe.get_cached_doc("Company", company_name)
+
+
+def make_fiscal_year():
+    """
+    Make sure today falls in a fiscal year (budgets and GL posting need one).
+    """
+    try:
+        get_fiscal_year(nowdate())
+    except FiscalYearError:
+        today = getdate()
+        frappe.get_doc({
+            "doctype": "Fiscal Year",
+            "year": f"_Test JP {today.year}",
+            "year_start_date": get_first_day(today.replace(month=1)),
+            "year_end_date": get_last_day(today.replace(month=12)),
+        }).insert(ignore_permissions=True)
+
+
+def make_account(company, account_name, root_type, account_type=None):
+    name = frappe.db.get_value("Account", {"company": company.name, "account_name": account_name})
+    if name:
+        return name
+
+    parent = frappe.db.get_value(
+        "Account", {"company": company.name, "root_type": root_type, "is_group": 1}, "name", order_by="lft asc"
+    )
+    return frappe.get_doc({
+        "doctype": "Account",
+        "account_name": account_name,
+        "company": company.name,
+        "parent_account": parent,
+        "account_type": account_type,
+        "account_currency": company.default_currency,
+    }).insert(ignore_permissions=True).name
+
+
+def make_cost_center(company, cost_center_name):
+    name = frappe.db.get_value("Cost Center", {"company": company.name, "cost_center_name": cost_center_name})
+    if name:
+        return name
+
+    parent = frappe.db.get_value(
+        "Cost Center", {"company": company.name, "is_group": 1}, "name", order_by="lft asc"
+    )
+    return frappe.get_doc({
+        "doctype": "Cost Center",
+        "cost_center_name": cost_center_name,
+        "company": company.name,
+        "parent_cost_center": parent,
+    }).insert(ignore_permissions=True).name
+
+
+def make_dimensions():
+    """
+    {fieldname: [values]} of the shared test dimensions. They are optional for
+    every company, so tests that do not set them are unaffected.
+
+    Each record is only inserted when missing, under a site-wide lock and
+    committed before it is released: adding the dimension fields alters tables,
+    which commits implicitly, so a worker must never see them half created.
+    """
+    with filelock(DIMENSIONS_LOCK, timeout=DIMENSIONS_LOCK_TIMEOUT):
+        dimensions = {doctype: make_dimension(doctype, values) for doctype, values in DIMENSIONS.items()}
+        frappe.db.commit()
+
+    frappe.flags.accounting_dimensions = None
+    frappe.flags.accounting_dimensions_details = None
+    return {dimensions[doctype]: list(values) for doctype, values in DIMENSIONS.items()}
+
+
+def make_dimension(doctype, values):
+    """
+    Dimension DocType, its values and the Accounting Dimension; returns the fieldname.
+    """
+    if not frappe.db.exists("DocType", doctype):
+        frappe.get_doc({
+            "doctype": "DocType",
+            "name": doctype,
+            "module": "Journal Plus",
+            "custom": 1,
+            "autoname": "Prompt",
+            "fields": [{"fieldname": "title", "fieldtype": "Data", "label": "Title"}],
+            "permissions": [{"role": "System Manager", "read": 1, "write": 1, "create": 1}],
+        }).insert(ignore_permissions=True)
+
+    for value in values:
+        if not frappe.db.exists(doctype, value):
+            frappe.get_doc({"doctype": doctype, "__newname": value, "title": value}).insert(
+                ignore_permissions=True
+            )
+
+    if not frappe.db.exists("Accounting Dimension", {"document_type": doctype}):
+        dimension = frappe.get_doc({"doctype": "Accounting Dimension", "document_type": doctype})
+        dimension.insert(ignore_permissions=True)
+        make_dimension_in_accounting_doctypes(doc=dimension)
+
+    return frappe.db.get_value("Accounting Dimension", {"document_type": doctype}, "fieldname")
+
+
+def make_expense_label(title, company, account):
+    if not frappe.db.exists("Expense Label", title):
+        frappe.get_doc({
+            "doctype": "Expense Label",
+            "title": title,
+            "accounts": [{"company": company, "account": account}],
+        }).insert(ignore_permissions=True)
+    return title
+
+
+def make_expense_entry(fixtures, rows=1, amount=1000, **values):
+    """
+    Unsaved Expense Entry of the fixture company with `rows` detail lines.
+    Lines cycle through the expense accounts, cost centers and dimension values,
+    so consecutive rows differ in every posting key. Header fields can be
+    overridden through `values`.
+    """
+    details = []
+    for idx in range(rows):
+        row = {
+            "expense_account": fixtures.expense_accounts[idx % len(fixtures.expense_accounts)],
+            "cost_center": fixtures.cost_centers[idx % len(fixtures.cost_centers)],
+            "amount": amount,
+            "remarks": f"Row {idx}",
+        }
+        for fieldname, dimension_values in fixtures.dimensions.items():
+            row[fieldname] = dimension_values[idx % len(dimension_values)]
+        details.append(row)
+
+    return frappe.get_doc({
+        "doctype": "Expense Entry",
+        "company": fixtures.company,
+        "currency": fixtures.currency,
+        "posting_date": nowdate(),
+        "remarks": "Testing Expense Entry",
+        "account_paid_from": fixtures.cash_account,
+        "details": details,
+        **values,
+    })
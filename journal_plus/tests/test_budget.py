@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+import frappe
+from frappe.utils import nowdate
+
+from journal_plus.budget import validate_expense_budget
+from journal_plus.journal_plus.doctype.expense_entry.expense_entry import process_gl_posting
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestBudget(ExpenseEntryTestCase):
+    def test_budget_is_checked_for_the_whole_document(self):
+        from erpnext.accounts.utils import FiscalYearError, get_fiscal_year
+
+        cost_center = frappe.get_cached_value("Company", self.company, "cost_center")
+        try:
+            fiscal_year = get_fiscal_year(nowdate(), company=self.company)[0]
+        except FiscalYearError:
+            self.skipTest("No fiscal year for today")
+        if not cost_center or frappe.db.exists(
+            "Budget", {"cost_center": cost_center, "fiscal_year": fiscal_year, "docstatus": ["<", 2]}
+        ):
+            self.skipTest("Company cost center missing or already budgeted")
+
+        budget = frappe.get_doc({
+            "doctype": "Budget",
+            "company": self.company,
+            "budget_against": "Cost Center",
+            "cost_center": cost_center,
+            "fiscal_year": fiscal_year,
+            "applicable_on_booking_actual_expenses": 1,
+            "action_if_annual_budget_exceeded": "Stop",
+            "action_if_accumulated_monthly_budget_exceeded": "Ignore",
+            "accounts": [{"account": self.expense_account, "budget_amount": 1000}],
+        })
+        budget.insert(ignore_permissions=True)
+        budget.submit()
+
+        expense = self._make_unsaved_expense_entry(rows=3, amount=400)
+        expense.cost_center = cost_center
+        expense.details[1].expense_account = self.cash_account
+
+        with patch("journal_plus.budget.get_actual_expenses", return_value={}):
+            # row 2 is not an expense line: 800 of 1000 used
+            validate_expense_budget(expense)
+
+            expense.details[1].expense_account = self.expense_account
+            with self.assertRaisesRegex(frappe.ValidationError, "Rows #1, #2, #3"):
+                validate_expense_budget(expense)
+
+    def _make_root_budget(self, amount):
+        """
+        Submitted "Stop" annual budget on the company's root cost center.
+        """
+        from erpnext.accounts.utils import get_fiscal_year
+
+        root = frappe.db.get_value("Cost Center", {"company": self.company, "is_group": 1}, "name", order_by="lft asc")
+        budget = frappe.get_doc({
+            "doctype": "Budget",
+            "company": self.company,
+            "budget_against": "Cost Center",
+            "cost_center": root,
+            "fiscal_year": get_fiscal_year(nowdate(), company=self.company)[0],
+            "applicable_on_booking_actual_expenses": 1,
+            "action_if_annual_budget_exceeded": "Stop",
+            "action_if_accumulated_monthly_budget_exceeded": "Ignore",
+            "accounts": [{"account": self.expense_account, "budget_amount": amount}],
+        })
+        budget.insert(ignore_permissions=True)
+        budget.submit()
+        return budget
+
+    def test_budget_on_parent_cost_center_counts_booked_child_expenses(self):
+        import erpnext.accounts.general_ledger as general_ledger
+
+        booked_in, posting_in = self.fixtures.cost_centers[:2]
+        self._make_root_budget(1000)
+
+        # 600 booked on a child of the budgeted cost center, without ERPNext's per-entry check
+        booked = self._make_unsaved_expense_entry(amount=600)
+        booked.cost_center = booked_in
+        booked.insert(ignore_permissions=True)
+        with patch("erpnext.accounts.general_ledger.validate_expense_against_budget") as per_entry_check:
+            booked.submit()
+            # swapped out for the Journal Plus posting only
+            self.assertIs(general_ledger.validate_expense_against_budget, per_entry_check)
+        per_entry_check.assert_not_called()
+
+        expense = self._make_unsaved_expense_entry(rows=2, amount=150)
+        expense.cost_center = posting_in
+        expense.set_header_defaults()
+        validate_expense_budget(expense)
+
+        expense.details[1].amount = 300
+        with self.assertRaisesRegex(frappe.ValidationError, "Rows #1, #2"):
+            validate_expense_budget(expense)
+
+    def test_background_posting_checks_budget_again(self):
+        self._make_root_budget(1200)
+        # 1000 passes on submit, but is only posted later
+        expense = self._make_background_posted_entry()
+
+        booked = self._make_unsaved_expense_entry(amount=300)
+        booked.insert(ignore_permissions=True)
+        booked.submit()
+
+        with patch.object(frappe.db, "commit"):
+            process_gl_posting(expense.name)
+
+        self.assertEqual(frappe.db.get_value("Expense Entry", expense.name, "status"), "Failed")
+        self.assertFalse(self._get_gl_entries("Expense Entry", expense.name))
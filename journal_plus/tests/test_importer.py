@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from journal_plus.importer import build_entries, group_rows, iter_file_rows
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestImporter(ExpenseEntryTestCase):
+    def test_importer_groups_lines_and_reports_row_errors(self):
+        content = (
+            "Entry Key,Posting Date,Account Paid From,Expense Label,Amount\n"
+            f"A,2026-01-05,{self.cash_account},Fuel,100\n"
+            f"A,2026-01-05,{self.cash_account},Parking,50\n"
+            f"B,2026-01-06,{self.cash_account},Unknown Label,75\n"
+            f"C,2026-13-45,{self.cash_account},Fuel,20\n"
+            f"D,2026-01-07,{self.cash_account},Fuel,twelve\n"
+            f"E,2026-01-08,{self.cash_account},Parking,\"1,250.50\"\n"
+        )
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+
+        errors = []
+        label_accounts = {"Fuel": self.expense_account, "Parking": self.expense_account}
+        entries = list(build_entries(
+            group_rows(iter_file_rows(f.name), "entry_key"), self.company, label_accounts, set(), errors
+        ))
+
+        # a bad date or amount fails its own group, not the import
+        self.assertEqual([(key, row_nos) for key, row_nos, _payload in entries], [("A", [2, 3]), ("E", [7])])
+        payload = entries[0][2]
+        self.assertEqual([d["amount"] for d in payload["details"]], [100, 50])
+        self.assertEqual(payload["details"][0]["expense_account"], self.expense_account)
+        self.assertEqual(entries[1][2]["details"][0]["amount"], 1250.5)
+        self.assertEqual([(e["row"], e["key"]) for e in errors], [(4, "B"), (5, "C"), (6, "D")])
@@ -0,0 +1,33 @@
+import frappe
+
+from journal_plus.money import MoneyEngine, clear_exchange_rate_cache, get_exchange_rate
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestMoney(ExpenseEntryTestCase):
+    def test_money_engine_rounds_half_up_in_minor_units(self):
+        money = MoneyEngine("IDR", precision=2)
+        self.assertEqual(money.to_minor("10.005"), 1001)
+        self.assertEqual(money.to_minor(None), 0)
+        self.assertEqual(money.to_minor("not a number"), 0)
+        self.assertEqual(money.to_float(money.add_debit(1001)), 10.01)
+        money.add_credit(1000)
+        self.assertEqual(money.difference, 1)
+
+    def test_exchange_rates_are_cached_per_currency_pair_and_date(self):
+        company_currency = frappe.get_cached_value("Company", self.company, "default_currency")
+        foreign = "EUR" if company_currency == "USD" else "USD"
+        frappe.get_doc({
+            "doctype": "Currency Exchange",
+            "date": "2020-01-01",
+            "from_currency": foreign,
+            "to_currency": company_currency,
+            "exchange_rate": 12345.5,
+        }).insert(ignore_permissions=True)
+        clear_exchange_rate_cache()
+        self.addCleanup(clear_exchange_rate_cache)
+
+        self.assertEqual(get_exchange_rate(foreign, company_currency, "2020-01-15"), 12345.5)
+        self.assertEqual(self._count_queries(lambda: get_exchange_rate(foreign, company_currency, "2020-01-15")), 0)
+        self.assertAlmostEqual(get_exchange_rate(company_currency, foreign, "2020-01-15"), 1 / 12345.5)
+        self.assertEqual(get_exchange_rate(company_currency, company_currency, "2020-01-15"), 1.0)
@@ -0,0 +1,24 @@
+import frappe
+from frappe.utils import nowdate
+
+from journal_plus.posting_context import clear_posting_context, get_posting_context
+from journal_plus.tests.utils import ExpenseEntryTestCase
+
+
+class TestPostingContext(ExpenseEntryTestCase):
+    def test_posting_context_is_memoised_until_invalidated(self):
+        clear_posting_context()
+        self.addCleanup(clear_posting_context)
+
+        context = get_posting_context(self.company, nowdate())
+        self.assertIs(get_posting_context(self.company, nowdate()), context)
+        self.assertEqual(context.default_currency, frappe.get_cached_value("Company", self.company, "default_currency"))
+
+        def build_twice():
+            for _i in range(2):
+                self._make_unsaved_expense_entry(rows=3).get_posting_context()
+
+        self.assertEqual(self._count_queries(build_twice), 0)
+
+        clear_posting_context(frappe.get_cached_doc("Company", self.company))
+        self.assertIsNot(get_posting_context(self.company, nowdate()), context)
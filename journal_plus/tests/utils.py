@@ -0,0 +1,100 @@
+"""
+Base test case for tests that build and post Expense Entries against the shared fixtures.
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from journal_plus.tests.fixtures import get_expense_fixtures
+
+
+class ExpenseEntryTestCase(FrappeTestCase):
+    def setUp(self):
+        # company, accounts and cost centers are built once per worker, dimensions once per site
+        self.fixtures = get_expense_fixtures()
+        self.company = self.fixtures.company
+        self.cash_account = self.fixtures.cash_account
+        self.expense_account = self.fixtures.expense_accounts[0]
+
+    def tearDown(self):
+        # keep the DB clean for other tests
+        frappe.db.rollback()
+
+    def _make_expense_entry(self, amount=100000):
+        """
+        Create (but do not submit) an Expense Entry doc with a single detail line.
+        """
+        doc = frappe.get_doc({
+            "doctype": "Expense Entry",
+            "company": self.company,
+            "posting_date": nowdate(),
+            "remarks": "Testing Expense Entry",
+            "account_paid_from": self.cash_account,
+            "details": [
+                {
+                    "expense_label": None,
+                    "expense_account": self.expense_account,
+                    "amount": amount,
+                    "remarks": "Biaya perjalanan test"
+                }
+            ]
+        })
+        doc.insert(ignore_permissions=True)
+        return doc
+
+    def _make_unsaved_expense_entry(self, rows=1, amount=1000):
+        """
+        Build an Expense Entry with `rows` detail lines without touching the database.
+        """
+        return frappe.get_doc({
+            "doctype": "Expense Entry",
+            "company": self.company,
+            "posting_date": nowdate(),
+            "remarks": "Testing Expense Entry",
+            "account_paid_from": self.cash_account,
+            "details": [
+                {
+                    "expense_account": self.expense_account,
+                    "amount": amount,
+                    "remarks": f"Row {i}",
+                }
+                for i in range(rows)
+            ]
+        })
+
+    def _count_queries(self, fn):
+        """
+        Run `fn` and return how many SQL statements it issued.
+        """
+        with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql:
+            fn()
+        return sql.call_count
+
+    def _set_settings(self, **values):
+        """
+        Override Journal Plus Settings for this test.
+        """
+        for fieldname, value in values.items():
+            frappe.db.set_single_value("Journal Plus Settings", fieldname, value)
+        frappe.clear_document_cache("Journal Plus Settings", "Journal Plus Settings")
+        self.addCleanup(frappe.clear_document_cache, "Journal Plus Settings", "Journal Plus Settings")
+
+    def _get_gl_entries(self, voucher_type, voucher_no):
+        """
+        Helper to retrieve GL Entry rows for a voucher.
+        """
+        return frappe.get_all(
+            "GL Entry",
+            filters={"voucher_type": voucher_type, "voucher_no": voucher_no},
+            fields=["account", "debit", "credit", "is_cancelled"]
+        )
+
+    def _make_background_posted_entry(self):
+        self._set_settings(async_posting_threshold=1)
+        expense = self._make_unsaved_expense_entry(rows=2, amount=500)
+        expense.insert(ignore_permissions=True)
+        expense.submit()
+        return expense